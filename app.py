@@ -2,37 +2,67 @@ import os
 import sys
 import time
 import threading
-import keyboard
-import webbrowser
-import requests
 from datetime import datetime, timedelta
 from collections import deque
 from configparser import ConfigParser
 
+import utils
 from detection import DetectionManager
+from history import EventStore, HISTORY_DB_FILENAME
+from stats import RollingStats, STATS_LONG_WINDOW, STATS_RARE_BIOME, format_duration
 from utils import (
     error_logging, load_config, save_config, load_logs, save_logs,
-    load_biome_data, load_auras_json, parse_session_time, format_session_time,
-    setup_locale, apply_roblox_fastflags, check_for_updates, download_update,
-    get_ps_link_for_user, APP_NAME
+    load_auras_json, parse_session_time, format_session_time,
+    setup_locale, apply_roblox_fastflags, check_for_updates,
+    get_ps_link_for_user, save_json_data, get_roblox_logs_dir, APP_NAME
 )
+from biomes import BIOMES
+from startup import StartupGraph
+from latency import LATENCY_STATS_FILENAME
+from liveness import LIVENESS_ALIVE, LIVENESS_STALE
+from metrics import REGISTRY as metrics, start_metrics_server, hit_ratio
+from tailer import RPC_RECORDS
 
 try:
-    from antiafk import AntiAFK
-    HAS_ANTIAFK = True
+    import keyboard
 except ImportError:
-    HAS_ANTIAFK = False
-    print("AntiAFK module not found or failed to import. Anti-AFK features disabled.")
-    AntiAFK = None
+    keyboard = None
+    print("keyboard module not found. Global hotkeys disabled.")
 
 APP_VERSION = "0.9.9.1-Stable"
+STARTUP_GUI_TASKS = ("config", "logs", "locale", "antiafk", "detection") # What GuiManager reads while building the window
+
+def _import_antiafk():
+    """Imports the optional AntiAFK module, which pulls in tkinter and pywin32. Returns the class or None."""
+    try:
+        from antiafk import AntiAFK
+        return AntiAFK
+    except ImportError:
+        print("AntiAFK module not found or failed to import. Anti-AFK features disabled.")
+        return None
 
 class MultiScopeApp:
-    def __init__(self, gui_manager_class=None):
+    def __init__(self, gui_manager_class=None, headless=False, roblox_logs_dir=None):
+        """Initialize the application.
+
+        Args:
+            gui_manager_class: GuiManager, or headless.HeadlessGuiManager when running without Tk.
+            headless: Skips Anti-AFK and global hotkeys, which need a desktop session.
+            roblox_logs_dir: Overrides the `roblox_logs_dir` config key and the LocalAppData default.
+        """
         self.version = APP_VERSION
         self.myappid = f"{APP_NAME}.App.{self.version}"
-        self.has_antiafk = HAS_ANTIAFK
+        self.headless = headless
+        self.has_antiafk = False
         self.antiafk = None
+        self.echo_logs = False
+        self.gui_manager = None
+        self.logs = []
+        self._logs_lock = threading.Lock() # append_log runs on startup task threads while the saved logs load
+        self.stale_clients_notified = set()
+        self.metrics_server = None
+        self.history = None # EventStore, opened by the "history" startup task
+        self.stats = RollingStats() # Rolling 1h/24h counts, fed by DetectionManager.record_event
 
         self.detection_running = False
         self.stop_event = threading.Event()
@@ -41,11 +71,55 @@ class MultiScopeApp:
         self.startup_timestamp = time.time() 
         self.program_start_time_iso = datetime.now().strftime("%Y-%m-%dT%H:%M:%S") 
 
-        self.biome_data = load_biome_data()
+        self.session_start_time = None
+        self.session_timer_thread = None
+        self.session_timer_stop_event = threading.Event()
+
+        # Independent I/O runs concurrently; the window is built as soon as the tasks it
+        # reads from are done and the rest (log scan, FastFlags, hotkeys...) finish behind it.
+        self._roblox_logs_dir_override = roblox_logs_dir
+        self.startup = StartupGraph(on_complete=self._on_startup_complete)
+        self.startup.add("biomes", self._load_biomes)
+        self.startup.add("auras", self._load_auras)
+        self.startup.add("logs", self._load_logs)
+        self.startup.add("locale", setup_locale)
+        self.startup.add("config", self._load_config, deps=("biomes",))
+        self.startup.add("antiafk", self._init_antiafk, deps=("config",))
+        self.startup.add("history", self._open_history, deps=("config",))
+        self.startup.add("detection", self._init_detection, deps=("config", "logs"))
+        self.startup.add("log_scan", self._scan_roblox_logs, deps=("detection",))
+        self.startup.add("metrics", self._init_metrics, deps=("detection",))
+        self.startup.add("fastflags", self._apply_fastflags_on_startup, deps=("config", "logs"))
+        self.startup.add("hotkeys", self._setup_hotkeys, deps=("config",))
+        self.startup.start()
+
+        if not self.startup.wait(STARTUP_GUI_TASKS):
+            failed = [name for name in STARTUP_GUI_TASKS if self.startup.tasks[name].error or self.startup.tasks[name].skipped]
+            raise RuntimeError(f"MultiScope failed to start (startup tasks failed: {', '.join(failed)})")
+
+        if gui_manager_class:
+            self.gui_manager = gui_manager_class(self)
+        else:
+
+            raise ValueError("GuiManager class must be provided to MultiScopeApp")
+
+        self._initialize_state(reset_detection=False)
+
+    def _load_biomes(self):
+        self.biome_data = BIOMES.data
+
+    def _load_auras(self):
         self.auras_data = load_auras_json()
+
+    def _load_logs(self):
+        loaded = load_logs()
+        with self._logs_lock:
+            self.logs = loaded + self.logs # Keep anything logged while loading
+
+    def _load_config(self):
         self.config = load_config(list(self.biome_data.keys())) 
-        self.logs = load_logs()
         self.accounts = self.config.get("accounts", [])
+        self.roblox_logs_dir = self._roblox_logs_dir_override or self.config.get("roblox_logs_dir") or get_roblox_logs_dir()
         self.biome_counts = self.config.get("biome_counts", {b: 0 for b in self.biome_data})
         self.active_accounts = set() 
 
@@ -56,31 +130,95 @@ class MultiScopeApp:
         self.merchant_jester_ping_config = self.config.get("merchant_jester_ping_config", {"id": "", "type": "None"})
         self.merchant_mari_ping_config = self.config.get("merchant_mari_ping_config", {"id": "", "type": "None"})
 
-        self.session_start_time = None
         self.saved_session_seconds = parse_session_time(self.config.get("session_time", "0:00:00"))
-        self.session_timer_thread = None
-        self.session_timer_stop_event = threading.Event()
 
-        if self.has_antiafk:
-             try:
-                 self.antiafk = AntiAFK(self, self.config) 
-             except Exception as e:
-                 error_logging(e, "Failed to initialize AntiAFK module")
-                 self.has_antiafk = False 
+    def _init_antiafk(self):
+        if self.headless:
+            return
+        AntiAFK = _import_antiafk()
+        if AntiAFK is None:
+            return
+        try:
+            self.antiafk = AntiAFK(self, self.config) 
+            self.has_antiafk = True
+        except Exception as e:
+            error_logging(e, "Failed to initialize AntiAFK module")
+            self.has_antiafk = False 
 
-        if gui_manager_class:
-            self.gui_manager = gui_manager_class(self)
-        else:
+    def _init_detection(self):
+        self.detection_manager = DetectionManager(self, scan_logs=False)
+        # Newer biomes.json files are fetched in the background and handed to the detection manager.
+        BIOMES.add_listener(self._on_biome_data_updated)
+        BIOMES.refresh_async()
 
-            raise ValueError("GuiManager class must be provided to MultiScopeApp")
+    def _open_history(self):
+        if not self.config.get("history_enabled", True):
+            return
+        try:
+            self.history = EventStore(os.path.join(utils.CONFIG_DIR, HISTORY_DB_FILENAME)).start()
+            # The detection loop waits for this task, so the rolling stats pick up the last day before any new event.
+            loaded = self.stats.load(self.history.iter_events(since=time.time() - STATS_LONG_WINDOW))
+            self.append_log(f"Debug: Loaded {loaded} events from the last day of history.")
+        except Exception as e:
+            error_logging(e, "Failed to open the event history database")
+            self.history = None
+
+    def _scan_roblox_logs(self):
+        self.detection_manager.update_log_array()
 
-        self.detection_manager = DetectionManager(self)
+    def _init_metrics(self):
+        self._register_metrics()
+        self.metrics_server = start_metrics_server(self.config)
 
-        setup_locale()
-        self._initialize_state()
-        self._setup_hotkeys()
+    def _apply_fastflags_on_startup(self):
+        if self.config.get("apply_feature_flags_on_startup", True):
+            apply_roblox_fastflags(self.append_log)
+
+    def _on_startup_complete(self, graph):
+        self.append_log(f"Debug: Startup tasks finished in {graph.summary()}")
+
+    def _resident_memory(self):
+        import psutil # Only needed when the metrics exporter is scraped
+        return psutil.Process().memory_info().rss
+
+    def _register_metrics(self):
+        """Registers the scrape-time gauges for the local metrics exporter."""
+        metrics.gauge_callback("multiscope_detection_running", "1 while detection is running.", lambda: int(self.detection_running))
+        metrics.gauge_callback("multiscope_log_entries", "Application log entries held in memory.", lambda: len(self.logs))
+        metrics.gauge_callback("multiscope_threads", "Live Python threads.", threading.active_count)
+        metrics.gauge_callback("multiscope_process_resident_memory_bytes", "Resident set size of the process.", self._resident_memory)
+        metrics.gauge_callback("multiscope_configured_accounts", "Accounts configured for detection.", lambda: len(self.accounts))
+        metrics.gauge_callback("multiscope_rpc_memo_hit_ratio", "Share of RPC records skipped by the per-account record memo.",
+                               lambda: hit_ratio(metrics.get("multiscope_rpc_memo_hits_total"), metrics.get("multiscope_rpc_memo_misses_total")))
+        metrics.gauge_callback("multiscope_rpc_record_cache_hit_ratio", "Share of RPC lines found in the decoded record cache (this process).",
+                               lambda: hit_ratio(RPC_RECORDS.hits, RPC_RECORDS.misses))
+        metrics.gauge_callback("multiscope_biomes_last_hour", "Biome starts in the last hour, by biome.",
+                               lambda: [({"biome": biome}, s["1h"]) for biome, s in self.stats.biome_summary().items()])
+        metrics.gauge_callback("multiscope_biomes_last_day", "Biome starts in the last 24 hours, by biome.",
+                               lambda: [({"biome": biome}, s["24h"]) for biome, s in self.stats.biome_summary().items()])
+        metrics.gauge_callback("multiscope_account_biomes_last_hour", "Biome starts in the last hour, by account.",
+                               lambda: [({"account": account}, s["1h"]) for account, s in self.stats.account_summary().items()])
+        metrics.gauge_callback("multiscope_biome_average_seconds", "Average length of the biomes that ended in the last 24 hours, by biome.",
+                               lambda: [({"biome": biome}, round(s["avg_seconds"], 1)) for biome, s in self.stats.biome_summary().items() if s["avg_seconds"] is not None])
+        metrics.gauge_callback("multiscope_seconds_since_glitched", f"Seconds since {STATS_RARE_BIOME} last started on any account (-1 if not seen).",
+                               self._seconds_since_rare_biome)
+        metrics.gauge_callback("multiscope_history_events_dropped", "Events not added to the history because its write queue was full.",
+                               lambda: self.history.dropped if self.history else 0)
+
+    def _seconds_since_rare_biome(self):
+        since = self.stats.seconds_since(STATS_RARE_BIOME)
+        return -1 if since is None else round(since)
+
+    def _on_biome_data_updated(self, biome_data):
+        """Called from the biome refresh thread when a newer biomes.json was fetched."""
+        self.biome_data = biome_data
+        self.detection_manager.reload_settings(biome_data)
+        for biome in biome_data:
+            if biome not in self.biome_counts:
+                self.biome_counts[biome] = 0
+        self.append_log(f"Biome catalogue updated ({len(biome_data)} biomes).")
 
-    def _initialize_state(self):
+    def _initialize_state(self, reset_detection=True):
         for biome in self.biome_data:
             if biome not in self.biome_counts:
                 self.biome_counts[biome] = 0
@@ -88,14 +226,58 @@ class MultiScopeApp:
 
         self.active_accounts = {acc.get("username", "").lower() for acc in self.accounts if acc.get("active") and acc.get("username")}
 
-        if self.config.get("apply_feature_flags_on_startup", True):
-             apply_roblox_fastflags(self.append_log)
+        if reset_detection:
+            # At startup these run as startup tasks instead.
+            if self.config.get("apply_feature_flags_on_startup", True):
+                 self.apply_fastflags_in_background()
 
-        self.detection_manager.reset_detection_states()
+            self.detection_manager.reset_detection_states()
 
         print(f"Initialized with {len(self.accounts)} accounts, {len(self.active_accounts)} active.")
 
+    def apply_fastflags_in_background(self, on_complete=None):
+        """Applies the Roblox FastFlags on a background thread so they don't hold up the GUI.
+
+        `on_complete(summary)` is called with the per-outcome counts when done.
+        """
+        def worker():
+            try:
+                summary = apply_roblox_fastflags(self.append_log)
+                self.append_log(f"Debug: FastFlags summary: {summary}")
+                if on_complete:
+                    on_complete(summary)
+            except Exception as e:
+                error_logging(e, "Error applying Roblox FastFlags")
+
+        thread = threading.Thread(target=worker, name="FastFlags", daemon=True)
+        thread.start()
+        return thread
+
+    def export_history_in_background(self, out_path, account=None, since=None, on_complete=None):
+        """Exports the event history (see export.export_events) on a background thread.
+
+        `on_complete(rows_written, error)` is called when done; `error` is None on success.
+        """
+        def worker():
+            try:
+                self.history.flush() # Include events still waiting in the write queue
+                from export import export_events
+                rows = export_events(self.history, out_path, account=account, since=since)
+                self.append_log(f"📤 Exported {rows} history events to {out_path}")
+                result = (rows, None)
+            except Exception as e:
+                error_logging(e, f"Error exporting event history to {out_path}")
+                result = (0, e)
+            if on_complete:
+                on_complete(*result)
+
+        thread = threading.Thread(target=worker, name="HistoryExport", daemon=True)
+        thread.start()
+        return thread
+
     def _setup_hotkeys(self):
+         if keyboard is None or self.headless:
+             return
          try:
              keyboard.add_hotkey('F1', self.start_detection)
              keyboard.add_hotkey('F2', self.stop_detection)
@@ -163,6 +345,7 @@ class MultiScopeApp:
 
             if self.detection_thread and self.detection_thread.is_alive():
                 self.detection_thread.join(timeout=2.0) 
+            self.detection_manager.shutdown()
             if self.session_timer_thread and self.session_timer_thread.is_alive():
                  self.session_timer_thread.join(timeout=1.0)
 
@@ -190,6 +373,8 @@ class MultiScopeApp:
     def _detection_loop(self):
         """The main background loop for running detection checks."""
         self.append_log("Detection loop started.")
+        if hasattr(self, 'startup'):
+            self.startup.wait(("history",)) # Don't mix live events into the stats while the last day is being loaded
         while not self.stop_event.is_set():
             try:
 
@@ -199,7 +384,8 @@ class MultiScopeApp:
                      self.save_state(periodic=True)
                      self.config_changed = False 
 
-                time.sleep(1.0) 
+                # Every POLL_MIN_INTERVAL, up to 1s when no account has a log file (see polling.py)
+                self.stop_event.wait(self.detection_manager.next_poll_delay())
 
             except Exception as e:
                  error_logging(e, "Error in detection loop cycle")
@@ -213,6 +399,12 @@ class MultiScopeApp:
              try:
                  if self.detection_running:
                      self.gui_manager.update_session_timer_display()
+                     if hasattr(self.gui_manager, 'update_latency_display') and self.gui_manager.root:
+                         self.gui_manager.root.after(0, self.gui_manager.update_latency_display)
+                     if hasattr(self.gui_manager, 'update_liveness_display') and self.gui_manager.root:
+                         self.gui_manager.root.after(0, self.gui_manager.update_liveness_display)
+                     if hasattr(self.gui_manager, 'update_rolling_stats_display') and self.gui_manager.root:
+                         self.gui_manager.root.after(0, self.gui_manager.update_rolling_stats_display)
                  time.sleep(1.0) 
              except Exception as e:
 
@@ -266,7 +458,9 @@ class MultiScopeApp:
                   error_logging(e, "Error saving AntiAFK configuration")
 
         save_config(self.config)
-        if not periodic: save_logs(self.logs)
+        if not periodic:
+            save_logs(self.logs)
+            self.export_latency_stats()
         self.config_changed = False 
         if not periodic: print("Application state saved.")
 
@@ -279,11 +473,18 @@ class MultiScopeApp:
 
              self.save_state()
 
-        try:
-            keyboard.unhook_all()
-            print("Global hotkeys unhooked.")
-        except Exception as e:
-            error_logging(e, "Error unhooking keyboard hotkeys")
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.history:
+            self.history.close()
+        BIOMES.remove_listener(self._on_biome_data_updated)
+
+        if keyboard is not None and not self.headless:
+            try:
+                keyboard.unhook_all()
+                print("Global hotkeys unhooked.")
+            except Exception as e:
+                error_logging(e, "Error unhooking keyboard hotkeys")
 
         if self.has_antiafk and self.antiafk and hasattr(self.antiafk, 'shutdown'):
              try:
@@ -301,14 +502,14 @@ class MultiScopeApp:
         """Appends a message to the application logs and optionally updates the GUI."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = {"timestamp": timestamp, "message": message}
-        self.logs.append(log_entry)
-
         max_mem_logs = 5000
-        if len(self.logs) > max_mem_logs:
-             self.logs = self.logs[-max_mem_logs:]
+        with self._logs_lock:
+            self.logs.append(log_entry)
+            if len(self.logs) > max_mem_logs:
+                 self.logs = self.logs[-max_mem_logs:]
 
         important_keywords = ["ERROR", "WARNING", "FATAL", "Starting detection", "Stopping detection", "Biome change", "PLAYER DETECTED", "Update found", "Webhook sent"]
-        if any(keyword in message for keyword in important_keywords):
+        if self.echo_logs or any(keyword in message for keyword in important_keywords):
              print(f"[{timestamp}] {message}")
 
         if hasattr(self.gui_manager, 'logs_text') and self.gui_manager.logs_text:
@@ -321,50 +522,63 @@ class MultiScopeApp:
                  print(f"Error updating GUI log: {e}") 
 
     def check_for_updates_on_startup(self):
-        """Checks for updates after the GUI has loaded."""
+        """Starts the update check in the background after the GUI has loaded."""
         if self.config.get("dont_ask_for_update", False):
             self.append_log("Update check skipped (disabled in config).")
             return
 
         self.append_log("Checking for updates...")
+        threading.Thread(target=self._check_for_updates_worker, name="UpdateCheck", daemon=True).start()
+
+    def _check_for_updates_worker(self):
+        release_info = check_for_updates(self.version)
+        if not release_info:
+            self.append_log("MultiScope is up to date.")
+            return
+        root = getattr(self.gui_manager, 'root', None)
+        if root:
+            # Dialogs must be opened from the Tk thread.
+            root.after(0, self._prompt_for_update, release_info)
+        else:
+            self.append_log(f"Update available: {release_info['parsed_tag_name']}")
+
+    def _prompt_for_update(self, release_info):
+        """Offers to download an available update. Runs on the Tk thread."""
         try:
-            release_info = check_for_updates(self.version)
-            if release_info:
-                latest_version = release_info['parsed_tag_name'] 
-                update_message = f"New update available: {latest_version}\n\nRelease Notes:\n{release_info.get('body', 'N/A')[:500]}...\n\nDo you want to download it now?"
-
-                if self.gui_manager.ask_yes_no("Update Available!", update_message):
-
-                    asset_url = None
-                    assets = release_info.get('assets', [])
-                    for asset in assets:
-                        if asset.get('browser_download_url', '').endswith('.exe'):
-                            asset_url = asset['browser_download_url']
-                            break
-                    if not asset_url and assets: 
-                        asset_url = assets[0].get('browser_download_url')
-
-                    if asset_url:
-                        self.append_log(f"Downloading update from: {asset_url}")
-                        save_path = download_update(asset_url, self.gui_manager.root)
-                        if save_path:
-                             if self.gui_manager.ask_yes_no("Download Complete", f"Update downloaded to:\\n{save_path}\\n\\nRun the new version now? (This will close the current app)"):
-                                 try:
-                                     os.startfile(save_path) 
-                                     self.on_close() 
-                                 except Exception as e:
-                                     error_logging(e, f"Failed to start downloaded update at {save_path}")
-                                     self.gui_manager.show_message_box("Error", f"Could not start the update automatically. Please run it manually from:\\n{save_path}", "error")
-                    else:
-                        self.gui_manager.show_message_box("No Download Link", "Could not find a download link for the update asset.", "warning")
+            latest_version = release_info['parsed_tag_name'] 
+            update_message = f"New update available: {latest_version}\n\nRelease Notes:\n{release_info.get('body', 'N/A')[:500]}...\n\nDo you want to download it now?"
+
+            if self.gui_manager.ask_yes_no("Update Available!", update_message):
+
+                asset_url = None
+                assets = release_info.get('assets', [])
+                for asset in assets:
+                    if asset.get('browser_download_url', '').endswith('.exe'):
+                        asset_url = asset['browser_download_url']
+                        break
+                if not asset_url and assets: 
+                    asset_url = assets[0].get('browser_download_url')
+
+                if asset_url:
+                    self.append_log(f"Downloading update from: {asset_url}")
+                    from gui_utils import download_update
+                    save_path = download_update(asset_url, self.gui_manager.root)
+                    if save_path:
+                         if self.gui_manager.ask_yes_no("Download Complete", f"Update downloaded to:\\n{save_path}\\n\\nRun the new version now? (This will close the current app)"):
+                             try:
+                                 os.startfile(save_path) 
+                                 self.on_close() 
+                             except Exception as e:
+                                 error_logging(e, f"Failed to start downloaded update at {save_path}")
+                                 self.gui_manager.show_message_box("Error", f"Could not start the update automatically. Please run it manually from:\\n{save_path}", "error")
                 else:
-
-                    if self.gui_manager.ask_yes_no("Skip Update", "Do you want to disable future update checks?"):
-                        self.config["dont_ask_for_update"] = True
-                        self.config_changed = True 
-                        self.append_log("Update checks disabled by user.")
+                    self.gui_manager.show_message_box("No Download Link", "Could not find a download link for the update asset.", "warning")
             else:
-                 self.append_log("MultiScope is up to date.")
+
+                if self.gui_manager.ask_yes_no("Skip Update", "Do you want to disable future update checks?"):
+                    self.config["dont_ask_for_update"] = True
+                    self.config_changed = True 
+                    self.append_log("Update checks disabled by user.")
         except Exception as e:
             error_logging(e, "Failed during startup update check")
 
@@ -397,7 +611,14 @@ class MultiScopeApp:
              {"name": "Active Accounts Monitored", "value": str(len(self.active_accounts)), "inline": True},
 
         ]
-
+        biome_stats = self.stats.biome_summary()
+        if biome_stats:
+            embed["fields"].extend([
+                {"name": "Biomes (1h / 24h)", "value": f"{sum(s['1h'] for s in biome_stats.values())} / {sum(s['24h'] for s in biome_stats.values())}", "inline": True},
+                {"name": f"Last {STATS_RARE_BIOME}", "value": format_duration(self.stats.seconds_since(STATS_RARE_BIOME)) + " ago" if STATS_RARE_BIOME in biome_stats else "Not in the last day", "inline": True},
+            ])
+
+        import requests # Only loaded once there is something to send
         for webhook_entry in webhooks_config:
              webhook_url = webhook_entry.get("url", "").strip()
              if not webhook_url: continue
@@ -409,15 +630,77 @@ class MultiScopeApp:
                      timeout=5 
                  )
                  response.raise_for_status()
+                 metrics.inc("multiscope_webhook_sends_total", labels={"kind": "status"})
 
              except Exception as e:
+                  metrics.inc("multiscope_webhook_failures_total", labels={"kind": "status"})
                   error_logging(e, f"Failed to send status webhook to ...{webhook_url[-10:]}")
 
+    def on_client_liveness_changed(self, username, old_state, new_state, idle_seconds):
+        """Called by the detection manager when an account's client goes stale or comes back."""
+        if self.gui_manager and hasattr(self.gui_manager, 'update_liveness_display') and self.gui_manager.root:
+            self.gui_manager.root.after(0, self.gui_manager.update_liveness_display)
+        if not self.config.get("stale_client_webhook_enabled", False):
+            return
+        # Only clients seen alive this session are reported, so accounts that were never started don't notify on launch.
+        if old_state == LIVENESS_ALIVE and new_state == LIVENESS_STALE:
+            self.stale_clients_notified.add(username)
+        elif new_state == LIVENESS_ALIVE and username in self.stale_clients_notified:
+            self.stale_clients_notified.discard(username)
+        else:
+            return
+        threading.Thread(target=self._send_client_liveness_webhook, args=(username, new_state, idle_seconds), daemon=True).start()
+
+    def _send_client_liveness_webhook(self, username, state, idle_seconds):
+        """Sends a low-priority (no ping) client stale/recovered embed to webhooks that follow the account."""
+        timestamp_unix = int(time.time())
+        if state == LIVENESS_STALE:
+            title = f"⚠️ Client Not Responding: {username}"
+            description = f"**Account:** `{username}`\n**No log activity for:** {int(idle_seconds // 60)} min\n"
+            color = 0x808080
+        else:
+            title = f"✅ Client Active Again: {username}"
+            description = f"**Account:** `{username}`\n"
+            color = 0x00FF00
+        description += f"**Time:** <t:{timestamp_unix}:F> (<t:{timestamp_unix}:R>)"
+        embed = {
+            "title": title,
+            "description": description,
+            "color": color,
+            "footer": {"text": f"MultiScope Status", "icon_url": "https://i.postimg.cc/mDzwFfX1/GLITCHED.png"},
+        }
+
+        import requests
+        for webhook_entry in self.config.get("webhooks", []):
+            webhook_url = webhook_entry.get("url", "").strip()
+            account_notifications = webhook_entry.get("account_notifications")
+            if not webhook_url: continue
+            if account_notifications and username.lower() not in [acc.lower() for acc in account_notifications]: continue
+            try:
+                response = requests.post(webhook_url, json={"embeds": [embed]}, headers={"Content-Type": "application/json"}, timeout=5)
+                response.raise_for_status()
+                metrics.inc("multiscope_webhook_sends_total", labels={"kind": "liveness"})
+            except Exception as e:
+                metrics.inc("multiscope_webhook_failures_total", labels={"kind": "liveness"})
+                error_logging(e, f"Failed to send client liveness webhook to ...{webhook_url[-10:]}")
+
+    def export_latency_stats(self):
+        """Writes the detection latency percentiles to latency_stats.json in the AppData directory."""
+        tracker = getattr(getattr(self, 'detection_manager', None), 'latency', None)
+        if not tracker or not tracker.recorded_traces:
+            return
+        save_json_data(LATENCY_STATS_FILENAME, tracker.summary())
+
     def get_ps_link_for_user(self, username):
          """Wrapper to use the utility function with the app's account list."""
 
          return get_ps_link_for_user(username, self.accounts, self.config.get("private_server_link", ""))
 
+    def reload_detection_settings(self):
+        """Applies changed biome/notification settings to the running detection without resetting it."""
+        self.detection_manager.reload_settings(self.biome_data)
+        self.append_log("Notification settings reloaded.")
+
     def reinitialize_detection_states(self):
          """Calls the detection manager's reinitialization."""
          self.detection_manager.reset_detection_states()
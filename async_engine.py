@@ -0,0 +1,234 @@
+"""Asyncio detection engine (`"detection_engine": "asyncio"` in config).
+
+One event loop, on its own thread, drives every account: tail reads are
+offloaded to a small thread pool, parsing and biome decisions run on the loop,
+and biome webhooks are delivered by an async dispatcher so a slow Discord
+response never holds up the next scan. aiohttp is used for delivery when it is
+installed; otherwise the blocking HTTP poster runs in the executor.
+DetectionManager's public API is unchanged, so the GUI doesn't know which engine
+is running.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from detection import http_post
+from metrics import REGISTRY as metrics
+from tailer import LogTailer, scan_log_tail, parse_biome_from_rpc
+from utils import error_logging
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+ASYNC_READ_WORKERS = 4
+ASYNC_CYCLE_TIMEOUT = 30.0
+ASYNC_WEBHOOK_TIMEOUT = 10
+ASYNC_STOP_TIMEOUT = 15.0
+WEBHOOK_SPACING = 0.3 # Pause between URLs of one notification, as in the thread engine
+
+class WebhookDeliveryError(Exception):
+    """A biome webhook that failed to send or got an error status."""
+
+class AsyncWebhookDispatcher:
+    """Queues biome webhooks and delivers them in order from the event loop,
+    honouring DetectionManager's adaptive rate limit with asyncio.sleep."""
+    def __init__(self, manager, loop, executor):
+        self.manager = manager
+        self.loop = loop
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.session = None
+        self.worker = None
+        self._loop_thread = None
+        # aiohttp would bypass a poster injected for replays and benchmarks.
+        self.use_aiohttp = aiohttp is not None and manager.http_post is http_post
+
+    async def start(self):
+        self._loop_thread = threading.current_thread()
+        if self.use_aiohttp:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=ASYNC_WEBHOOK_TIMEOUT))
+        self.worker = asyncio.ensure_future(self._deliver_forever())
+
+    def dispatch(self, username, biome, message_type, event_type, trace=None):
+        """Called by DetectionManager.handle_account_biome_detection; safe from any thread."""
+        metrics.inc("multiscope_webhook_queue_depth")
+        item = (username, biome, message_type, event_type, trace)
+        if threading.current_thread() is self._loop_thread:
+            self.queue.put_nowait(item)
+        else:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+    async def _deliver_forever(self):
+        while True:
+            item = await self.queue.get()
+            try:
+                await self._deliver(*item)
+            except Exception as e:
+                error_logging(e, f"Error delivering biome webhook for {item[0]}")
+            finally:
+                metrics.inc("multiscope_webhook_queue_depth", -1)
+                self.queue.task_done()
+
+    async def _post(self, webhook_url, payload):
+        """Returns the HTTP status code; raises WebhookDeliveryError, or the poster's OSError
+        (requests' exceptions are OSErrors), on network errors."""
+        if self.session is not None:
+            try:
+                async with self.session.post(webhook_url, json=payload) as response:
+                    return response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise WebhookDeliveryError(str(e))
+
+        def post():
+            return self.manager.http_post(webhook_url, json=payload, headers={"Content-Type": "application/json"}, timeout=ASYNC_WEBHOOK_TIMEOUT)
+        response = await self.loop.run_in_executor(self.executor, post)
+        return response.status_code
+
+    async def _deliver(self, username, biome, message_type, event_type, trace):
+        manager = self.manager
+        prepared = manager.prepare_account_webhook(username, biome, message_type, event_type, trace)
+        if not prepared:
+            manager.latency.record(trace)
+            return
+        original_username, deliveries = prepared
+
+        wait = manager.webhook_rate_limit_wait()
+        if wait > 0:
+            manager.app.append_log(f"⏳ Rate limiting webhook ({username}/{biome}), waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        manager.last_webhook_time = manager.clock.time()
+
+        sent_successfully_to_any = False
+        for webhook_url, payload in deliveries:
+            url_trace = trace.copy().mark("sent") if trace else None
+            status_code = None
+            try:
+                status_code = await self._post(webhook_url, payload)
+                if status_code >= 400:
+                    raise WebhookDeliveryError(f"{status_code} Error for url ...{webhook_url[-10:]}")
+                manager.webhook_delivered(original_username, biome, event_type, webhook_url, url_trace)
+                sent_successfully_to_any = True
+                await asyncio.sleep(WEBHOOK_SPACING)
+            except (WebhookDeliveryError, OSError) as e:
+                backoff = manager.webhook_failed(e, original_username, webhook_url, status_code)
+                if backoff:
+                    await asyncio.sleep(backoff)
+        manager.webhook_round_finished(sent_successfully_to_any)
+
+    async def close(self, timeout):
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.manager.app.append_log(f"Warning: {self.queue.qsize()} biome webhook(s) not delivered before shutdown.")
+        if self.worker:
+            self.worker.cancel()
+        if self.session is not None:
+            await self.session.close()
+
+class AsyncDetectionEngine:
+    """Runs detection cycles for DetectionManager on an asyncio event loop."""
+    def __init__(self, manager, read_workers=ASYNC_READ_WORKERS):
+        self.manager = manager
+        self.read_workers = read_workers
+        self.loop = None
+        self.thread = None
+        self.executor = None
+        self.dispatcher = None
+        self.previous_dispatcher = None
+        self.tailers = {}
+
+    def _ensure_started(self):
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="AsyncDetectionIO")
+        self.thread = threading.Thread(target=self.loop.run_forever, name="AsyncDetectionLoop", daemon=True)
+        self.thread.start()
+        self.dispatcher = AsyncWebhookDispatcher(self.manager, self.loop, self.executor)
+        asyncio.run_coroutine_threadsafe(self.dispatcher.start(), self.loop).result()
+        self.previous_dispatcher = self.manager.webhook_dispatcher
+        self.manager.webhook_dispatcher = self.dispatcher
+        self.manager.app.append_log(f"Debug: Async detection engine started (aiohttp: {self.dispatcher.use_aiohttp}).")
+
+    def _sync_tailers(self):
+        wanted = {}
+        for username in self.manager.accounts:
+            log_path = self.manager.username_log_map.get(username.lower())
+            if log_path:
+                wanted[username] = log_path
+        for username in list(self.tailers):
+            if wanted.get(username) != self.tailers[username].log_path:
+                del self.tailers[username]
+        for username, log_path in wanted.items():
+            if username not in self.tailers:
+                self.tailers[username] = LogTailer(log_path)
+
+    async def _scan_account(self, username, tailer):
+        manager = self.manager
+        # Reading and searching happen in the executor; only the matched records come back to the loop.
+        # The poll scheduler has already seen the change, so skip the tailer's own stat check.
+        scan = await self.loop.run_in_executor(self.executor, scan_log_tail, tailer, True, manager.clock.time)
+        if scan is None:
+            return
+        bytes_read, read_time, rpc_records, merchant_events, malformed_records = scan
+        metrics.inc("multiscope_log_bytes_read_total", bytes_read)
+        if malformed_records:
+            metrics.inc("multiscope_rpc_parse_failures_total", malformed_records)
+
+        for rpc, rpc_log_time, rpc_offset, rpc_payload in rpc_records: # Every change since the last scan, oldest first
+            if manager.rpc_record_seen(username, tailer.log_path, rpc, rpc_log_time):
+                continue
+            try:
+                biome = parse_biome_from_rpc(rpc_payload)
+            except ValueError as e:
+                metrics.inc("multiscope_rpc_parse_failures_total")
+                error_logging(e, "Error decoding JSON from RPC message")
+                biome = None
+            if biome:
+                trace = manager.latency.start_trace(username, rpc_log_time)
+                trace.mark("read", read_time).mark("parsed")
+                manager.handle_account_biome_detection(username, biome, trace=trace, source=(tailer.log_path, rpc_offset))
+
+        if merchant_events:
+            # Merchant webhooks are rare and still sent with the blocking poster, so keep them off the loop.
+            await self.loop.run_in_executor(self.executor, manager.dispatch_merchant_events, username, merchant_events, tailer.log_path)
+
+    async def _scan_all(self):
+        self._sync_tailers()
+        changed = self.manager.poll_due_accounts({username: tailer.log_path for username, tailer in self.tailers.items()})
+        results = await asyncio.gather(
+            *(self._scan_account(username, self.tailers[username]) for username in changed),
+            return_exceptions=True
+        )
+        for username, result in zip(changed, results):
+            if isinstance(result, Exception):
+                error_logging(result, f"Error in async scan for {username}")
+
+    def run_cycle(self):
+        """Scans every account once. Returns after reads and decisions; webhooks keep going in the background."""
+        self._ensure_started()
+        asyncio.run_coroutine_threadsafe(self._scan_all(), self.loop).result(ASYNC_CYCLE_TIMEOUT)
+
+    def reset(self):
+        """Drops the tailers so every account's next scan is a cold one."""
+        if self.loop is None:
+            self.tailers = {}
+        else:
+            self.loop.call_soon_threadsafe(self.tailers.clear)
+
+    def stop(self):
+        if self.loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.dispatcher.close(ASYNC_STOP_TIMEOUT), self.loop).result(ASYNC_STOP_TIMEOUT + 5)
+        except Exception as e:
+            error_logging(e, "Error stopping async detection engine")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5.0)
+        self.loop.close()
+        self.executor.shutdown(wait=False)
+        self.manager.webhook_dispatcher = self.previous_dispatcher
+        self.loop = self.thread = self.executor = self.dispatcher = self.previous_dispatcher = None
+        self.tailers = {}
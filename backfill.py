@@ -0,0 +1,212 @@
+"""Backfill of the event history from the Roblox logs already on disk.
+
+Live detection only follows logs written in the last couple of hours. This
+scans every player log in the Roblox logs directory on a process pool and adds
+the biome changes and merchant arrivals in them to history.db, with the time
+and file offset of the log line they came from.
+
+Each finished file is checkpointed in the `backfill_files` table together with
+its events, keyed by path, size and mtime: a later run (or one resumed after an
+interruption) skips files that haven't changed since. Logs still being written
+are scanned again once they grow; events already in the history are ignored.
+
+    python backfill.py
+    python backfill.py --logs-dir D:/RobloxLogs --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import utils
+from biomes import BIOMES
+from history import connect, create_schema, EVENT_COLUMNS, HISTORY_DB_FILENAME, EVENT_BIOME_START, EVENT_BIOME_END, EVENT_MERCHANT
+from latency import parse_log_line_timestamp
+from tailer import (
+    LOG_READ_SIZE, RPC_MARKER_BYTES, MERCHANT_MARKER_BYTES, extract_username, extract_rpc_record,
+    parse_biome_from_rpc, find_merchant_events
+)
+from utils import error_logging
+
+BACKFILL_READ_BLOCK = 1024 * 1024
+BACKFILL_MAX_LINE = 1024 * 1024 # Longer lines are skipped; no RPC or merchant line comes close
+BACKFILL_PROGRESS_EVERY = 50 # Files between progress lines
+
+BACKFILL_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS backfill_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        account TEXT,
+        events INTEGER NOT NULL,
+        scanned_at REAL NOT NULL
+    )""",
+)
+
+def list_player_logs(logs_dir):
+    """Paths of the Roblox player logs in `logs_dir`, oldest first."""
+    paths = []
+    for filename in os.listdir(logs_dir):
+        if not filename.endswith(".log") or "player" not in filename.lower():
+            continue
+        path = os.path.join(logs_dir, filename)
+        if os.path.isfile(path):
+            paths.append(path)
+    paths.sort(key=os.path.getmtime)
+    return paths
+
+def _marker_lines(data, marker, end):
+    """Yields (marker_index, line_start, line_end) for each line in data[:end] containing `marker`."""
+    pos = 0
+    while True:
+        index = data.find(marker, pos, end)
+        if index == -1:
+            return
+        line_start = data.rfind(b"\n", 0, index) + 1
+        line_end = data.find(b"\n", index, end)
+        yield index, line_start, line_end
+        pos = line_end + 1
+
+def scan_log_file(log_path, biome_names):
+    """Extracts the history events from one player log. Runs in a backfill worker process.
+
+    Biome changes are found the way live detection finds them: a start (and the
+    end of the previous biome) whenever an RPC record names a different biome in
+    `biome_names`. Returns (log_path, size, mtime_ns, username, events, malformed_records),
+    with events as history rows (EVENT_COLUMNS order) and no events for logs without a username.
+    """
+    st = os.stat(log_path)
+    events, malformed = [], 0
+    with open(log_path, "rb") as file:
+        username = extract_username(file.read(LOG_READ_SIZE).decode("utf-8", errors="ignore"))
+        if username is None:
+            return log_path, st.st_size, st.st_mtime_ns, None, events, malformed
+        file.seek(0)
+        biome = None
+        offset = 0 # File offset of data[0]
+        carry = b""
+        remaining = st.st_size # Lines appended after the stat are left for the next run
+        while remaining > 0:
+            block = file.read(min(BACKFILL_READ_BLOCK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            data = carry + block
+            complete = data.rfind(b"\n") + 1 # Only complete lines; the rest waits for the next block
+            if complete == 0:
+                carry = data
+                if len(carry) > BACKFILL_MAX_LINE:
+                    offset += len(carry)
+                    carry = b""
+                continue
+
+            for index, line_start, line_end in _marker_lines(data, RPC_MARKER_BYTES, complete):
+                line = data[line_start:line_end]
+                try:
+                    rpc = extract_rpc_record(line, index - line_start)
+                    found_biome = parse_biome_from_rpc(rpc[1]) if rpc else None
+                except ValueError:
+                    malformed += 1
+                    continue
+                if not found_biome or found_biome == biome or found_biome not in biome_names:
+                    continue
+                log_time = parse_log_line_timestamp(line, index - line_start)
+                if log_time is None:
+                    continue
+                if biome:
+                    events.append((log_time, username, biome, EVENT_BIOME_END, log_path, offset + line_start))
+                events.append((log_time, username, found_biome, EVENT_BIOME_START, log_path, offset + line_start))
+                biome = found_biome
+
+            for _, line_start, line_end in _marker_lines(data, MERCHANT_MARKER_BYTES, complete):
+                for name, event_time_utc, _ in find_merchant_events(data[line_start:line_end]):
+                    events.append((event_time_utc.timestamp(), username, name, EVENT_MERCHANT, log_path, offset + line_start))
+
+            carry = data[complete:]
+            offset += complete
+    return log_path, st.st_size, st.st_mtime_ns, username, events, malformed
+
+def run_backfill(logs_dir, db_path, workers=None, rescan=False, log=print):
+    """Scans the player logs in `logs_dir` that changed since their checkpoint into the history at `db_path`.
+
+    Returns a summary dict (files, skipped, scanned, failed, events_found, events_added, seconds).
+    """
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    connection = connect(db_path)
+    summary = {"files": 0, "skipped": 0, "scanned": 0, "failed": 0, "malformed_records": 0, "events_found": 0, "events_added": 0}
+    try:
+        create_schema(connection)
+        with connection:
+            for statement in BACKFILL_SCHEMA:
+                connection.execute(statement)
+        checkpoints = {path: (size, mtime_ns) for path, size, mtime_ns in connection.execute("SELECT path, size, mtime_ns FROM backfill_files")}
+
+        pending = []
+        for path in list_player_logs(logs_dir):
+            summary["files"] += 1
+            st = os.stat(path)
+            if not rescan and checkpoints.get(path) == (st.st_size, st.st_mtime_ns):
+                summary["skipped"] += 1
+            else:
+                pending.append(path)
+        log(f"Backfill: {summary['files']} player logs in {logs_dir}, {len(pending)} to scan ({summary['skipped']} unchanged since the last run).")
+        if not pending:
+            return summary
+
+        biome_names = frozenset(BIOMES.data)
+        insert = f"INSERT OR IGNORE INTO events ({', '.join(EVENT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)"
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scan_log_file, path, biome_names): path for path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    path, size, mtime_ns, username, events, malformed = future.result()
+                except Exception as e:
+                    summary["failed"] += 1
+                    error_logging(e, f"Error backfilling {futures[future]}")
+                    continue
+                # The events and the checkpoint commit together, so an interrupted run resumes at this file.
+                with connection:
+                    before = connection.total_changes
+                    connection.executemany(insert, events)
+                    summary["events_added"] += connection.total_changes - before
+                    connection.execute(
+                        "INSERT OR REPLACE INTO backfill_files (path, size, mtime_ns, account, events, scanned_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, size, mtime_ns, username, len(events), time.time())
+                    )
+                summary["scanned"] += 1
+                summary["events_found"] += len(events)
+                summary["malformed_records"] += malformed
+                if done % BACKFILL_PROGRESS_EVERY == 0 or done == len(pending):
+                    log(f"Backfill: {done}/{len(pending)} logs scanned, {summary['events_added']} new events.")
+        return summary
+    finally:
+        connection.close()
+        summary["seconds"] = round(time.perf_counter() - started, 2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Add the biome and merchant events in existing Roblox logs to MultiScope's history.")
+    parser.add_argument("--logs-dir", help="Roblox player logs directory (default: LocalAppData/Roblox/logs)")
+    parser.add_argument("--config-dir", help="MultiScope config directory holding the history (default: AppData/MultiScope)")
+    parser.add_argument("--db", help=f"history database (default: {HISTORY_DB_FILENAME} in the config directory)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--rescan", action="store_true", help="scan every log again, ignoring the checkpoints")
+    args = parser.parse_args(argv)
+
+    if args.config_dir:
+        utils.set_config_dir(args.config_dir)
+    logs_dir = args.logs_dir or utils.get_roblox_logs_dir()
+    if not os.path.isdir(logs_dir):
+        print(f"Roblox logs directory not found: {logs_dir}")
+        return 1
+    db_path = args.db or os.path.join(utils.CONFIG_DIR, HISTORY_DB_FILENAME)
+
+    summary = run_backfill(logs_dir, db_path, args.workers, args.rescan)
+    print(json.dumps(summary, indent=4))
+    return 0 if not summary["failed"] else 1
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    raise SystemExit(main())
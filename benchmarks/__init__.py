@@ -0,0 +1,6 @@
+"""Benchmarks for MultiScope's detection pipeline.
+
+Run the scripts as modules from the repository root, e.g.
+`python -m benchmarks.detection_throughput --accounts 50`. Saved results live in
+`benchmarks/baselines/` so later runs can be compared against them.
+"""
@@ -0,0 +1,136 @@
+"""Detection throughput benchmark.
+
+Generates growing synthetic logs for N accounts and runs DetectionManager's
+cycle against them with a stub app, reporting cycle time, CPU, memory and
+detection latency.
+
+    python -m benchmarks.detection_throughput --accounts 50 --duration 30
+    python -m benchmarks.detection_throughput --accounts 50 --save-baseline
+    python -m benchmarks.detection_throughput --accounts 50 --compare --fail-on-regression
+    python -m benchmarks.detection_throughput --accounts 50 --idle-accounts 40 --interval 0
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.harness import (
+    StubApp, WebhookSink, ResourceSampler, percentiles,
+    save_baseline, compare_to_baseline, DEFAULT_REGRESSION_THRESHOLD
+)
+from benchmarks.loggen import SyntheticLogGenerator
+
+BASELINE_NAME = "detection_throughput"
+WARMUP_TIMEOUT = 30.0
+IO_METRICS = ("multiscope_log_stat_checks_total", "multiscope_log_reads_total", "multiscope_log_bytes_read_total")
+COMPARED_KEYS = (
+    "cycle_ms.p50", "cycle_ms.p95", "resources.cpu_percent", "resources.peak_rss_mb",
+    "latency_seconds.p50", "latency_seconds.p95",
+)
+
+def run(accounts=20, duration=20.0, interval=1.0, rate=4096, biome_interval=10.0, merchant_interval=60.0,
+        initial_bytes=1024 * 1024, webhooks=False, seed=0, engine="threads", idle_accounts=0):
+    """`interval` 0 paces cycles with DetectionManager.next_poll_delay(), like the app's detection loop."""
+    from detection import DetectionManager
+    from metrics import REGISTRY as metrics
+
+    logs_dir = tempfile.mkdtemp(prefix="multiscope_bench_")
+    sink = WebhookSink().start() if webhooks else None
+    try:
+        generator = SyntheticLogGenerator(logs_dir, accounts, rate, biome_interval, merchant_interval, seed,
+                                          idle_accounts=idle_accounts)
+        generator.setup(initial_bytes)
+        app = StubApp(generator.usernames, logs_dir, [sink.url] if sink else None, engine=engine)
+        manager = DetectionManager(app)
+
+        # Warm-up: registers the initial biome per account (first notification is skipped by design).
+        # Engines that scan in the background may need a few cycles before every account has reported.
+        warmup_deadline = time.perf_counter() + WARMUP_TIMEOUT
+        manager.check_all_accounts_biomes()
+        while not all(manager.account_biomes.get(name) for name in generator.usernames) and time.perf_counter() < warmup_deadline:
+            time.sleep(0.1)
+            manager.check_all_accounts_biomes()
+        manager.latency.reset()
+        changes_before = app.detected_changes()
+        written_before = len(generator.events("biome"))
+        io_before = {name: metrics.get(name) for name in IO_METRICS}
+
+        sampler = ResourceSampler().start()
+        cycle_times = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            generator.tick()
+            started = time.perf_counter()
+            manager.check_all_accounts_biomes()
+            elapsed = time.perf_counter() - started
+            cycle_times.append(elapsed * 1000.0)
+            sampler.sample()
+            time.sleep(max(0.0, interval - elapsed) if interval > 0 else manager.next_poll_delay())
+        resources = sampler.stop()
+        manager.shutdown()
+        io = {name: metrics.get(name) - io_before[name] for name in IO_METRICS}
+
+        latency = manager.latency.stage_percentiles()
+        total = latency.get("total", {})
+        written = len(generator.events("biome")) - written_before
+        detected = app.detected_changes() - changes_before
+        return {
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "params": {
+                "accounts": accounts, "duration": duration, "interval": interval, "rate": rate,
+                "biome_interval": biome_interval, "initial_bytes": initial_bytes, "webhooks": webhooks,
+                "engine": engine, "idle_accounts": idle_accounts,
+            },
+            "cycles": len(cycle_times),
+            "cycle_ms": {k: round(v, 2) for k, v in percentiles(cycle_times).items() if v is not None},
+            "resources": resources,
+            "log_stat_checks": io["multiscope_log_stat_checks_total"],
+            "log_reads": io["multiscope_log_reads_total"],
+            "bytes_read_mb": round(io["multiscope_log_bytes_read_total"] / 1024 / 1024, 2),
+            "bytes_written_mb": round(sum(a.bytes_written for a in generator.accounts) / 1024 / 1024, 2),
+            "biome_changes_written": written,
+            "biome_changes_detected": detected,
+            "latency_seconds": {k: round(total[k], 3) for k in ("p50", "p95", "p99") if k in total},
+            "latency_stages": latency,
+            "webhooks_received": len(sink.received) if sink else 0,
+        }
+    finally:
+        if sink:
+            sink.stop()
+        shutil.rmtree(logs_dir, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DetectionManager against synthetic logs.")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between detection cycles (0: adaptive, as in the app)")
+    parser.add_argument("--rate", type=int, default=4096, help="log bytes per second per account")
+    parser.add_argument("--biome-interval", type=float, default=10.0)
+    parser.add_argument("--merchant-interval", type=float, default=60.0)
+    parser.add_argument("--initial-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--idle-accounts", type=int, default=0, help="accounts (of --accounts) whose logs stop growing after setup")
+    parser.add_argument("--webhooks", action="store_true", help="deliver webhooks to a local sink")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=("threads", "sharded", "asyncio"), default="threads", help="detection engine to benchmark")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.accounts, args.duration, args.interval, args.rate, args.biome_interval,
+                  args.merchant_interval, args.initial_bytes, args.webhooks, args.seed, args.engine, args.idle_accounts)
+    print(json.dumps(results, indent=4))
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results)
+    if args.compare:
+        regressions = compare_to_baseline(BASELINE_NAME, results, COMPARED_KEYS, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
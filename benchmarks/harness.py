@@ -0,0 +1,167 @@
+"""Shared pieces for the benchmark scripts: a GUI-less stand-in for MultiScopeApp,
+a local webhook sink, resource sampling and baseline storage."""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+class StubApp:
+    """The subset of MultiScopeApp that DetectionManager uses, without Tk, hotkeys or AppData state."""
+    def __init__(self, usernames, logs_dir, webhook_urls=None, keep_logs=5000, engine="threads"):
+        self.version = "bench"
+        self.roblox_logs_dir = logs_dir
+        self.accounts = [{"username": name, "ps_link": "", "active": True} for name in usernames]
+        self.config = {
+            "accounts": self.accounts,
+            "webhooks": [{"url": url} for url in (webhook_urls or [])],
+            "merchant_webhook_url": (webhook_urls or [""])[0],
+            "detection_engine": engine,
+        }
+        self.biome_counts = {}
+        self.config_changed = False
+        self.logs = []
+        self.keep_logs = keep_logs
+        self.gui_manager = None
+
+    def append_log(self, message):
+        # Mirrors the cost of MultiScopeApp.append_log without touching a GUI.
+        self.logs.append({"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "message": message})
+        if len(self.logs) > self.keep_logs:
+            self.logs = self.logs[-self.keep_logs:]
+
+    def get_ps_link_for_user(self, username):
+        return ""
+
+    def detected_changes(self):
+        return sum(self.biome_counts.values())
+
+class WebhookSink:
+    """A local HTTP server that accepts webhook POSTs and records when they arrived."""
+    def __init__(self, status=204):
+        self.status = status
+        self.received = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                with sink._lock:
+                    sink.received.append((time.time(), self.path, body))
+                self.send_response(sink.status)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/webhook"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+class ResourceSampler:
+    """Samples process CPU time and RSS between start() and stop()."""
+    def __init__(self):
+        self.process = psutil.Process()
+        self.peak_rss = 0
+
+    def start(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.rss_start = self.process.memory_info().rss
+        self.peak_rss = self.rss_start
+        return self
+
+    def sample(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def stop(self):
+        self.sample()
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        return {
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(100.0 * cpu / wall, 1) if wall else 0.0,
+            "rss_start_mb": round(self.rss_start / 1024 / 1024, 1),
+            "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1),
+        }
+
+def percentiles(samples, pcts=(50, 95, 99)):
+    if not samples:
+        return {f"p{p}": None for p in pcts}
+    ordered = sorted(samples)
+    return {f"p{p}": ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))] for p in pcts}
+
+def baseline_path(name):
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+def save_baseline(name, results):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Saved baseline to {baseline_path(name)}")
+
+def load_baseline(name):
+    try:
+        with open(baseline_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def compare_to_baseline(name, results, keys, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Prints how `results` compare to the saved baseline. Returns the keys that regressed.
+
+    `keys` are dotted paths into the results dict where larger values are worse.
+    """
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"No baseline saved for '{name}'. Run with --save-baseline to create one.")
+        return []
+
+    def lookup(data, dotted):
+        for part in dotted.split("."):
+            if not isinstance(data, dict) or part not in data:
+                return None
+            data = data[part]
+        return data
+
+    regressions = []
+    print(f"\nComparison with baseline ({baseline.get('recorded_at', 'unknown date')}):")
+    for key in keys:
+        old, new = lookup(baseline, key), lookup(results, key)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            continue
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- REGRESSION"
+            regressions.append(key)
+        print(f"  {key:<36} {old:>12.4g} -> {new:>12.4g}  ({change:+.1%}){flag}")
+    return regressions
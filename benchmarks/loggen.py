@@ -0,0 +1,189 @@
+"""Synthetic Roblox player log generator.
+
+Writes logs that look like the ones Roblox produces while Sol's RNG is running:
+a header containing the `Players.<name>.PlayerGui` reference, `[BloxstrapRPC]`
+rich presence updates carrying the biome in `largeImage.hoverText`, merchant
+arrival lines and plenty of filler noise. Each account's log grows at a
+configurable rate so the detection loop can be exercised under load.
+
+    python -m benchmarks.loggen OUT_DIR --accounts 10 --duration 60 --rate 4096
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+ASSETS_BIOMES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "biomes.json")
+DEFAULT_BIOMES = ["NORMAL", "WINDY", "RAINY", "SNOWY", "SAND STORM", "HELL", "STARFALL", "CORRUPTION", "NULL", "GLITCHED"]
+MERCHANTS = ("Jester", "Mari")
+
+FILLER_TEMPLATES = (
+    "[FLog::Output] ExpChat/mountClientApp: Message received from {user} in RBXGeneral",
+    "[FLog::Network] Replicator: received {n} bytes of physics data",
+    "[FLog::Graphics] FrameRateManager: average frame time {ms}ms, render {ms}ms",
+    "[DFLog::HttpTraceLight] HttpResponse(#{n}) time:{ms}ms (net {ms}ms) status:200 OK bodySize:{n}",
+    "[FLog::Warning] Warning: Script 'Workspace.Map.Aura{n}', Line {n} - Infinite yield possible",
+    "[FLog::Output] ExpChat/mountClientApp: {user} has rolled an aura (1 in {n})",
+)
+
+def load_biome_names():
+    """Returns the biome names from assets/biomes.json, or a built-in list if it can't be read."""
+    try:
+        with open(ASSETS_BIOMES_PATH, "r", encoding="utf-8") as f:
+            names = [name for name in json.load(f) if not name.startswith("_")]
+        return names or list(DEFAULT_BIOMES)
+    except (OSError, ValueError):
+        return list(DEFAULT_BIOMES)
+
+def format_log_timestamp(epoch):
+    """Formats an epoch time the way Roblox prefixes its log lines (millisecond UTC ISO-8601)."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+def rpc_line(epoch, biome, uptime=0.0):
+    payload = {
+        "command": "SetRichPresence",
+        "data": {
+            "details": "Rolling for auras",
+            "state": f"In {biome}",
+            "timeStart": int(epoch),
+            "largeImage": {"assetId": 17445238470, "hoverText": biome},
+            "smallImage": {"assetId": 17445301380, "hoverText": "Sol's RNG"},
+        },
+    }
+    return f"{format_log_timestamp(epoch)},{uptime:.6f},6f3c,6 [FLog::Output] [BloxstrapRPC] {json.dumps(payload, separators=(',', ':'))}\n"
+
+def merchant_line(epoch, merchant, uptime=0.0):
+    return f"{format_log_timestamp(epoch)},{uptime:.6f},6f3c,6 [FLog::Output] [Merchant]: {merchant} has arrived on the island\n"
+
+class SyntheticAccountLog:
+    """A single account's growing player log."""
+    def __init__(self, logs_dir, username, rng, biomes, biome_interval=30.0, merchant_interval=300.0):
+        self.username = username
+        self.rng = rng
+        self.biomes = biomes
+        self.biome_interval = biome_interval
+        self.merchant_interval = merchant_interval
+        self.started = time.time()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.path = os.path.join(logs_dir, f"0.662.0.6620700_{stamp}_Player_{rng.randrange(16**5):05X}_last.log")
+        self.current_biome = None
+        self.next_biome_change = 0.0
+        self.next_merchant = self.started + rng.uniform(0.5, 1.0) * merchant_interval
+        self.bytes_written = 0
+        self.events = [] # (kind, name, epoch) for every biome change and merchant arrival written
+
+    def _uptime(self, now):
+        return now - self.started
+
+    def write_header(self, initial_bytes=0):
+        now = time.time()
+        lines = [
+            f"{format_log_timestamp(now)},0.000000,6f3c,6 [FLog::Output] ! Joining game '5bf1a3c1' place 15532962292 at 10.0.0.1\n",
+            f"{format_log_timestamp(now)},0.512000,6f3c,6 [FLog::Output] Players.{self.username}.PlayerGui.MainUI: loaded\n",
+        ]
+        self._write("".join(lines))
+        if initial_bytes:
+            self.append(initial_bytes, now)
+
+    def _filler_line(self, now):
+        template = self.rng.choice(FILLER_TEMPLATES)
+        body = template.format(user=self.username, n=self.rng.randrange(1, 100000), ms=self.rng.randrange(1, 60))
+        return f"{format_log_timestamp(now)},{self._uptime(now):.6f},6f3c,6 {body}\n"
+
+    def append(self, nbytes, now=None):
+        """Appends roughly `nbytes` of log output, inserting biome and merchant events when they are due."""
+        now = time.time() if now is None else now
+        chunks = []
+        size = 0
+        if now >= self.next_biome_change:
+            biome = self.rng.choice([b for b in self.biomes if b != self.current_biome] or self.biomes)
+            chunks.append(rpc_line(now, biome, self._uptime(now)))
+            self.current_biome = biome
+            self.next_biome_change = now + self.rng.uniform(0.5, 1.5) * self.biome_interval
+            self.events.append(("biome", biome, now))
+        if now >= self.next_merchant:
+            merchant = self.rng.choice(MERCHANTS)
+            chunks.append(merchant_line(now, merchant, self._uptime(now)))
+            self.next_merchant = now + self.rng.uniform(0.5, 1.5) * self.merchant_interval
+            self.events.append(("merchant", merchant, now))
+        size = sum(len(c) for c in chunks)
+        while size < nbytes:
+            line = self._filler_line(now)
+            chunks.append(line)
+            size += len(line)
+        self._write("".join(chunks))
+
+    def _write(self, text):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+        self.bytes_written += len(text)
+
+class SyntheticLogGenerator:
+    """Drives a set of SyntheticAccountLogs at a fixed byte rate per account."""
+    def __init__(self, logs_dir, accounts=10, bytes_per_second=4096, biome_interval=30.0,
+                 merchant_interval=300.0, seed=0, username_prefix="BenchUser", idle_accounts=0):
+        os.makedirs(logs_dir, exist_ok=True)
+        self.logs_dir = logs_dir
+        self.bytes_per_second = bytes_per_second
+        self.rng = random.Random(seed)
+        biomes = load_biome_names()
+        self.accounts = [
+            SyntheticAccountLog(logs_dir, f"{username_prefix}{i}", random.Random(self.rng.random()), biomes,
+                                biome_interval, merchant_interval)
+            for i in range(accounts)
+        ]
+        # The last `idle_accounts` logs only get their initial history, like a client that stopped writing.
+        self.active_accounts = self.accounts[:max(0, accounts - idle_accounts)]
+        self.last_tick = None
+
+    @property
+    def usernames(self):
+        return [account.username for account in self.accounts]
+
+    def setup(self, initial_bytes=256 * 1024):
+        """Writes each account's header plus `initial_bytes` of history."""
+        for account in self.accounts:
+            account.write_header(initial_bytes)
+        self.last_tick = time.time()
+
+    def tick(self):
+        """Appends the bytes accrued since the previous tick to every active account's log."""
+        now = time.time()
+        elapsed = now - (self.last_tick or now)
+        self.last_tick = now
+        nbytes = int(self.bytes_per_second * elapsed)
+        for account in self.active_accounts:
+            account.append(nbytes, now)
+        return nbytes * len(self.active_accounts)
+
+    def events(self, kind=None):
+        return [(account.username, event) for account in self.accounts for event in account.events
+                if kind is None or event[0] == kind]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Roblox player logs.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to keep the logs growing")
+    parser.add_argument("--rate", type=int, default=4096, help="bytes per second per account")
+    parser.add_argument("--biome-interval", type=float, default=30.0)
+    parser.add_argument("--merchant-interval", type=float, default=300.0)
+    parser.add_argument("--initial-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    generator = SyntheticLogGenerator(args.out_dir, args.accounts, args.rate, args.biome_interval,
+                                      args.merchant_interval, args.seed)
+    generator.setup(args.initial_bytes)
+    deadline = time.time() + args.duration
+    while time.time() < deadline:
+        time.sleep(0.25)
+        generator.tick()
+    print(f"Wrote {len(generator.accounts)} logs to {args.out_dir} "
+          f"({sum(a.bytes_written for a in generator.accounts) / 1024 / 1024:.1f} MB, "
+          f"{len(generator.events('biome'))} biome changes, {len(generator.events('merchant'))} merchants)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""RPC record extraction benchmark on pathological log tails.
+
+Runs the previous extraction (rfind the last `[BloxstrapRPC]`, find `}}}` in the
+rest of the tail, json.loads the result) and tailer.find_last_rpc (bounded
+raw_decode) over 2 MB tails built to hurt: a record cut off by a partial write,
+payloads whose nesting doesn't end in `}}}`, a flood of markers with no JSON,
+and deeply nested payloads. Reports time per call and what each extractor
+returned: the record, the previous complete record, nothing, or a decode error
+(which the detection loop used to send through error_logging every cycle).
+
+    python -m benchmarks.rpc_extract
+    python -m benchmarks.rpc_extract --save-baseline
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.harness import percentiles, save_baseline, compare_to_baseline, DEFAULT_REGRESSION_THRESHOLD
+from benchmarks.loggen import rpc_line
+from tailer import LOG_TAIL_READ_BYTES, find_last_rpc, parse_biome_from_rpc
+
+BASELINE_NAME = "rpc_extract"
+FILLER_LINE = "2026-01-01T00:00:00.000Z,1.000000,6f3c,6 [FLog::Output] ExpChat/mountClientApp: Message received in RBXGeneral\n"
+COMPARED_KEYS = tuple(f"cases.{case}.bounded_us.p50" for case in ("normal", "truncated", "unbalanced", "marker_flood", "deep_nesting"))
+
+def legacy_find_last_rpc(content):
+    """The extraction used before the bounded extractor."""
+    start = content.rfind("[BloxstrapRPC]")
+    if start == -1:
+        return None
+    stop = content.find("}}}", start)
+    if stop == -1:
+        return None
+    return content[start:stop + 3]
+
+def filler(nbytes):
+    return FILLER_LINE * (nbytes // len(FILLER_LINE))
+
+def build_cases(tail_bytes=LOG_TAIL_READ_BYTES):
+    """{case: tail text}. Each tail has a valid NORMAL record well before the interesting part."""
+    now = time.time()
+    good = rpc_line(now, "NORMAL")
+    half = filler(tail_bytes // 2)
+    latest = rpc_line(now, "GLITCHED")
+    return {
+        "normal": half + good + half + latest,
+        # Roblox is mid-way through writing the latest record.
+        "truncated": half + good + half + latest[:len(latest) // 2],
+        # A SetLaunchData-style payload that closes with `"}` instead of `}}}`, followed by a megabyte of log.
+        "unbalanced": half + good + '2026-01-01T00:00:00.000Z,1.0,6f3c,6 [BloxstrapRPC] {"command":"SetLaunchData","data":"x"}\n' + half,
+        # Markers with no payload at all.
+        "marker_flood": half + good + "[FLog::Output] [BloxstrapRPC] \n" * (tail_bytes // 64),
+        # A payload nested far deeper than any real one, never closed.
+        "deep_nesting": half + good + '[BloxstrapRPC] {"data":' + "[" * (tail_bytes // 4) + "\n" + half,
+    }
+
+def describe(rpc, parse):
+    if rpc is None:
+        return "none"
+    try:
+        return f"biome {parse(rpc)}"
+    except (ValueError, RecursionError) as e:
+        return f"error ({type(e).__name__})"
+
+def time_calls(func, content, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {k: round(v, 1) for k, v in percentiles(samples).items() if v is not None}
+
+def run(repeat=50, tail_bytes=LOG_TAIL_READ_BYTES):
+    results = {"params": {"repeat": repeat, "tail_bytes": tail_bytes}, "cases": {}}
+    for case, content in build_cases(tail_bytes).items():
+        legacy = legacy_find_last_rpc(content)
+        bounded = find_last_rpc(content)[0]
+        results["cases"][case] = {
+            "legacy_us": time_calls(lambda text: describe(legacy_find_last_rpc(text), parse_biome_from_rpc), content, repeat),
+            "legacy_result": describe(legacy, parse_biome_from_rpc),
+            "bounded_us": time_calls(lambda text: describe(find_last_rpc(text)[0], parse_biome_from_rpc), content, repeat),
+            "bounded_result": describe(bounded, parse_biome_from_rpc),
+        }
+    return results
+
+def print_report(results):
+    print(f"{'case':<14} {'legacy p50 us':>14} {'legacy result':<22} {'bounded p50 us':>15} {'bounded result':<22}")
+    for case, stats in results["cases"].items():
+        print(f"{case:<14} {stats['legacy_us'].get('p50', 0):>14.1f} {stats['legacy_result']:<22} "
+              f"{stats['bounded_us'].get('p50', 0):>15.1f} {stats['bounded_result']:<22}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RPC record extraction on pathological log tails.")
+    parser.add_argument("--repeat", type=int, default=50, help="calls timed per case and extractor")
+    parser.add_argument("--tail-bytes", type=int, default=LOG_TAIL_READ_BYTES)
+    parser.add_argument("--json", action="store_true", help="print the full results as JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.tail_bytes)
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results)
+    if args.compare:
+        regressions = compare_to_baseline(BASELINE_NAME, results, COMPARED_KEYS, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Startup import cost benchmark.
+
+Imports each MultiScope module in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time of the module itself and of the heaviest
+dependencies it pulls in, so regressions on the cold-start path are visible.
+
+    python -m benchmarks.startup_imports
+    python -m benchmarks.startup_imports --modules utils detection --repeat 5
+    python -m benchmarks.startup_imports --save-baseline
+    python -m benchmarks.startup_imports --compare --fail-on-regression
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks.harness import REPO_ROOT, save_baseline, compare_to_baseline, DEFAULT_REGRESSION_THRESHOLD
+
+BASELINE_NAME = "startup_imports"
+DEFAULT_MODULES = ("utils", "clock", "latency", "metrics", "detection", "app", "headless", "gui_utils", "main")
+WATCHED_DEPENDENCIES = ("tkinter", "ttkbootstrap", "PIL", "requests", "psutil", "keyboard", "webbrowser", "winreg", "locale")
+TOP_DEPENDENCIES = 8
+
+def parse_importtime(stderr):
+    """Returns {module: (self_us, cumulative_us)} from `-X importtime` output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return timings
+
+def measure_module(module):
+    """Imports `module` in a fresh interpreter. Returns (timings, error)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # Only import; main.py guards app startup behind __name__ == "__main__".
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=120
+    )
+    timings = parse_importtime(proc.stderr)
+    error = None
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["import failed"])[-1]
+    return timings, error
+
+def run(modules=DEFAULT_MODULES, repeat=3):
+    results = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "modules": {},
+    }
+    for module in modules:
+        best = None
+        error = None
+        for _ in range(repeat):
+            timings, error = measure_module(module)
+            if error or module not in timings:
+                break
+            if best is None or timings[module][1] < best[module][1]:
+                best = timings
+        if best is None:
+            results["modules"][module] = {"error": error or "module not reported by -X importtime"}
+            continue
+
+        dependencies = sorted(
+            ((name, cumulative) for name, (_, cumulative) in best.items() if name != module and "." not in name),
+            key=lambda item: item[1], reverse=True
+        )
+        results["modules"][module] = {
+            "cumulative_ms": round(best[module][1] / 1000.0, 2),
+            "self_ms": round(best[module][0] / 1000.0, 2),
+            "loaded": sorted(dep for dep in WATCHED_DEPENDENCIES if dep in best),
+            "heaviest": {name: round(cumulative / 1000.0, 2) for name, cumulative in dependencies[:TOP_DEPENDENCIES]},
+        }
+    return results
+
+def print_report(results):
+    print(f"{'module':<12} {'import ms':>10}  heavy modules loaded")
+    for module, data in results["modules"].items():
+        if "error" in data:
+            print(f"{module:<12} {'-':>10}  error: {data['error']}")
+            continue
+        print(f"{module:<12} {data['cumulative_ms']:>10.1f}  {', '.join(data['loaded']) or '-'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import cost of MultiScope modules.")
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module; the fastest run is kept")
+    parser.add_argument("--json", action="store_true", help="print the full results as JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, max(1, args.repeat))
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results)
+    if args.compare:
+        keys = [f"modules.{module}.cumulative_ms" for module in args.modules]
+        regressions = compare_to_baseline(BASELINE_NAME, results, keys, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
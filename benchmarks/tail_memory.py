@@ -0,0 +1,209 @@
+"""Log tail read memory benchmark.
+
+Compares the text tail read (a new decoded `str` per read, searched as text)
+with the pooled-buffer read (readinto a reused bytearray, searched in place,
+only matched records copied out) and the cold scan a LogTailer makes of a log
+it hasn't seen before (reading backwards to the latest RPC record) on growing
+synthetic logs. Reads run on a thread per account, as in the default detection
+engine. The initial history is written as if logged over time at
+HISTORY_BYTES_PER_SECOND, so it contains biome and merchant events.
+
+Reports peak RSS growth while reading, cycle time, bytes read per read, and the memory allocated
+per read (tracemalloc peak of a read done on its own) together with the
+resulting allocation rate. Each mode runs in a fresh interpreter so memory the
+allocator kept from one mode doesn't hide the other's growth.
+
+    python -m benchmarks.tail_memory --accounts 20 --cycles 20
+    python -m benchmarks.tail_memory --accounts 4 --initial-bytes 104857600
+    python -m benchmarks.tail_memory --accounts 20 --save-baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.harness import (
+    REPO_ROOT, ResourceSampler, percentiles, save_baseline, compare_to_baseline, DEFAULT_REGRESSION_THRESHOLD
+)
+from benchmarks.loggen import SyntheticLogGenerator
+
+BASELINE_NAME = "tail_memory"
+MODES = ("text", "buffer", "cold")
+RSS_SAMPLE_INTERVAL = 0.005
+HISTORY_BYTES_PER_SECOND = 4096
+HISTORY_CHUNK_BYTES = 64 * 1024
+COMPARED_KEYS = (
+    "modes.buffer.rss_growth_mb", "modes.buffer.alloc_kb_per_read", "modes.buffer.cycle_ms.p50",
+    "modes.cold.kb_read_per_read", "modes.cold.cycle_ms.p50",
+)
+
+def read_text(log_path):
+    """The text path: decode the whole tail, then search it."""
+    from tailer import read_log_tail, find_last_rpc, find_merchant_events
+    from latency import parse_log_line_timestamp
+    content = read_log_tail(log_path)
+    rpc, rpc_index = find_last_rpc(content)
+    log_time = parse_log_line_timestamp(content, rpc_index) if rpc else None
+    find_merchant_events(content)
+    return len(content)
+
+def read_buffer(log_path):
+    """The buffer path: readinto a pooled bytearray and search it in place."""
+    from tailer import TAIL_BUFFERS, read_tail_into, find_last_rpc, find_merchant_events
+    from latency import parse_log_line_timestamp
+    with TAIL_BUFFERS.borrow() as buffer:
+        length = read_tail_into(log_path, buffer)
+        rpc, rpc_index = find_last_rpc(buffer, length)
+        log_time = parse_log_line_timestamp(buffer, rpc_index) if rpc else None
+        find_merchant_events(buffer, length)
+        return length
+
+def read_cold(log_path):
+    """The first scan of a log: backwards to the latest RPC record, merchants from the last tail's worth."""
+    from tailer import LogTailer, scan_log_tail
+    return scan_log_tail(LogTailer(log_path))[0]
+
+READERS = {"text": read_text, "buffer": read_buffer, "cold": read_cold}
+
+class RssWatcher:
+    """Samples RSS on a background thread so short-lived peaks inside a cycle are seen."""
+    def __init__(self, sampler):
+        self.sampler = sampler
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self.sampler.sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def run_mode(mode, generator, cycles, workers, append_bytes):
+    reader = READERS[mode]
+    paths = [account.path for account in generator.accounts]
+    reader(paths[0]) # Warm up imports and, for the buffer path, the first pooled buffer
+
+    sampler = ResourceSampler().start()
+    cycle_times = []
+    bytes_read = []
+    with RssWatcher(sampler), ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in range(cycles):
+            for account in generator.accounts:
+                account.append(append_bytes)
+            started = time.perf_counter()
+            bytes_read.extend(executor.map(reader, paths))
+            cycle_times.append((time.perf_counter() - started) * 1000.0)
+    resources = sampler.stop()
+
+    tracemalloc.start()
+    allocated = []
+    for path in paths:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        reader(path)
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    alloc_per_read = sum(allocated) / len(allocated)
+    reads_per_second = len(paths) * len(cycle_times) / (sum(cycle_times) / 1000.0)
+    return {
+        "cycle_ms": {k: round(v, 2) for k, v in percentiles(cycle_times).items() if v is not None},
+        "peak_rss_mb": resources["peak_rss_mb"],
+        "rss_growth_mb": round(resources["peak_rss_mb"] - resources["rss_start_mb"], 1),
+        "kb_read_per_read": round(sum(bytes_read) / len(bytes_read) / 1024, 1),
+        "alloc_kb_per_read": round(alloc_per_read / 1024, 1),
+        "alloc_mb_per_s": round(alloc_per_read * reads_per_second / 1024 / 1024, 1),
+    }
+
+def run_single_mode(mode, accounts, cycles, workers, initial_bytes, append_bytes, seed):
+    logs_dir = tempfile.mkdtemp(prefix="multiscope_tailmem_")
+    try:
+        generator = SyntheticLogGenerator(logs_dir, accounts, seed=seed, biome_interval=60.0, merchant_interval=300.0)
+        generator.setup(0)
+        history_start = time.time() - initial_bytes / HISTORY_BYTES_PER_SECOND
+        for account in generator.accounts:
+            account.next_merchant = history_start
+            for offset in range(0, initial_bytes, HISTORY_CHUNK_BYTES):
+                account.append(HISTORY_CHUNK_BYTES, history_start + offset / HISTORY_BYTES_PER_SECOND)
+        return run_mode(mode, generator, cycles, workers or accounts, append_bytes)
+    finally:
+        shutil.rmtree(logs_dir, ignore_errors=True)
+
+def run(accounts=20, cycles=20, workers=None, initial_bytes=4 * 1024 * 1024, append_bytes=4096, seed=0, modes=MODES):
+    args = ["--accounts", str(accounts), "--cycles", str(cycles), "--initial-bytes", str(initial_bytes),
+            "--append-bytes", str(append_bytes), "--seed", str(seed)]
+    if workers:
+        args += ["--workers", str(workers)]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    results = {
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "params": {"accounts": accounts, "cycles": cycles, "workers": workers or accounts,
+                   "initial_bytes": initial_bytes, "append_bytes": append_bytes},
+        "modes": {},
+    }
+    for mode in modes:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.tail_memory", "--mode", mode] + args,
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        results["modes"][mode] = json.loads(proc.stdout)
+    return results
+
+def print_report(results):
+    print(f"{'mode':<8} {'cycle p50 ms':>12} {'RSS growth MB':>14} {'KB read':>10} {'KB alloc':>10} {'alloc MB/s':>11}")
+    for mode, stats in results["modes"].items():
+        print(f"{mode:<8} {stats['cycle_ms'].get('p50', 0):>12.1f} {stats['rss_growth_mb']:>14.1f} "
+              f"{stats['kb_read_per_read']:>10.1f} {stats['alloc_kb_per_read']:>10.1f} {stats['alloc_mb_per_s']:>11.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the cost of text, pooled-buffer and cold log tail reads.")
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="concurrent reads (default: one per account)")
+    parser.add_argument("--initial-bytes", type=int, default=4 * 1024 * 1024, help="log size before the first cycle")
+    parser.add_argument("--append-bytes", type=int, default=4096, help="bytes appended to each log per cycle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=MODES, help="run a single mode in this process and print its JSON")
+    parser.add_argument("--json", action="store_true", help="print the full results as JSON")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        stats = run_single_mode(args.mode, args.accounts, args.cycles, args.workers, args.initial_bytes,
+                                args.append_bytes, args.seed)
+        print(json.dumps(stats))
+        return
+
+    results = run(args.accounts, args.cycles, args.workers, args.initial_bytes, args.append_bytes, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print_report(results)
+
+    if args.save_baseline:
+        save_baseline(BASELINE_NAME, results)
+    if args.compare:
+        regressions = compare_to_baseline(BASELINE_NAME, results, COMPARED_KEYS, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Shared biome catalogue.
+
+The catalogue is built from the local copies only (hardcoded fallback, bundled
+assets/biomes.json, the last remote copy cached in AppData and the user's
+biomes_data.json customizations), so startup never waits on the network. The
+remote biomes.json is refreshed in a background thread with a conditional GET
+and swapped in atomically; listeners are told when the catalogue changes.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from utils import error_logging, load_json_data, save_json_data, BIOMES_DATA_FILENAME
+
+BIOMES_REMOTE_URL = "https://raw.githubusercontent.com/cresqnt-sys/MultiScope/refs/heads/main/assets/biomes.json"
+BIOMES_REMOTE_CACHE_FILENAME = "biomes_remote_cache.json"
+BIOMES_REMOTE_TIMEOUT = 10
+CUSTOMIZABLE_BIOME_FIELDS = ("emoji", "color", "thumbnail_url")
+
+# Hardcoded fallback defaults (minimal set in case all else fails)
+FALLBACK_BIOMES = {
+    "WINDY": {"emoji": "🌀", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/WINDY.png"},
+    "RAINY": {"emoji": "🌧️", "color": "0x55925F", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/RAINY.png"},
+    "SNOWY": {"emoji": "❄️", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/SNOWY.png"},
+    "SAND STORM": {"emoji": "🏜️", "color": "0xFFA500", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/SAND%20STORM.png"},
+    "HELL": {"emoji": "🔥", "color": "0xFB4F29", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/HELL.png"},
+    "STARFALL": {"emoji": "🌠", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/STARFALL.png"},
+    "CORRUPTION": {"emoji": "🌑", "color": "0x800080", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/CORRUPTION.png"},
+    "NULL": {"emoji": "🌫️", "color": "0x808080", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/NULL.png"},
+    "GLITCHED": {"emoji": "⚠️", "color": "0xFFFF00", "thumbnail_url": "https://i.postimg.cc/mDzwFfX1/GLITCHED.png", "force_notify": True, "ping_everyone": True},
+    "DREAMSPACE": {"emoji": "💤", "color": "0xFF00FF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/DREAMSPACE.png", "force_notify": True, "ping_everyone": True},
+    "CYBERSPACE": {"emoji": "🤖", "color": "0x00FFFF", "thumbnail_url": "https://raw.githubusercontent.com/cresqnt-sys/MultiScope/refs/heads/main/assets/cyberspace.png"},
+    "NORMAL": {"emoji": "🌳", "color": "0x00FF00", "thumbnail_url": "", "never_notify": True}
+}
+
+def _get_assets_biomes_path():
+    """Get the path to the biomes.json file in the assets folder."""
+    try:
+        # For PyInstaller bundled app
+        base_path = sys._MEIPASS
+    except AttributeError:
+        # For development - use the script's directory
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "assets", "biomes.json")
+
+def _load_assets_biomes():
+    path = _get_assets_biomes_path()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding='utf-8') as f:
+            data = json.load(f)
+        print(f"Loaded {len(data)} biomes from local assets/biomes.json")
+        return data
+    except json.JSONDecodeError as e:
+        error_logging(e, "Error parsing local assets/biomes.json.")
+    except Exception as e:
+        error_logging(e, "Error reading local assets/biomes.json.")
+    return {}
+
+def _normalize_biome_info(info):
+    """Ensures emoji, color (0xRRGGBB string) and thumbnail_url are present and well formed."""
+    if not info.get("emoji"):
+        info["emoji"] = "🌍" # Default emoji for unknown biomes
+
+    color = info.get("color", "0xFFFFFF")
+    if isinstance(color, str):
+        if not color.startswith("0x"):
+            try:
+                info["color"] = f"0x{int(color):06X}"
+            except (ValueError, TypeError):
+                info["color"] = "0xFFFFFF"
+    elif isinstance(color, int):
+        info["color"] = f"0x{color:06X}"
+    else:
+        info["color"] = "0xFFFFFF"
+
+    if "thumbnail_url" not in info:
+        info["thumbnail_url"] = ""
+
+def build_biome_data(remote_data=None, local_data=None):
+    """Merges the biome sources. Priority: remote > local assets > fallback defaults, then the
+    user's customizations from biomes_data.json. New biomes are added to biomes_data.json."""
+    data = {biome: info.copy() for biome, info in FALLBACK_BIOMES.items()}
+    for source in (local_data or {}, remote_data or {}):
+        for biome, info in source.items():
+            if biome.startswith("_"): # Skip comment keys
+                continue
+            data[biome] = info.copy()
+
+    appdata_biomes = load_json_data(BIOMES_DATA_FILENAME, {}, [BIOMES_DATA_FILENAME])
+    new_biomes = [biome for biome in data if biome not in appdata_biomes]
+
+    for biome, info in appdata_biomes.items():
+        if biome in data:
+            for key in CUSTOMIZABLE_BIOME_FIELDS:
+                if key in info and info[key]:
+                    data[biome][key] = info[key]
+
+    for info in data.values():
+        _normalize_biome_info(info)
+
+    # Only rewrite biomes_data.json when the catalogue gained biomes the user's copy doesn't have.
+    if new_biomes:
+        print(f"Adding new biome(s) {', '.join(new_biomes)} to user's biome data configuration.")
+        save_json_data(BIOMES_DATA_FILENAME, data)
+
+    return data
+
+class BiomeRegistry:
+    """Holds the current biome catalogue. Reads of `data` never block on the network."""
+    def __init__(self, remote_url=BIOMES_REMOTE_URL, cache_filename=BIOMES_REMOTE_CACHE_FILENAME):
+        self.remote_url = remote_url
+        self.cache_filename = cache_filename
+        self.last_refresh = None
+        self._data = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self.load()
+        return self._data
+
+    def load(self):
+        """Builds the catalogue from local sources and the cached remote copy. Returns the new data."""
+        cache = load_json_data(self.cache_filename, {})
+        data = build_biome_data(cache.get("biomes"), _load_assets_biomes())
+        with self._lock:
+            self._data = data
+        return data
+
+    def add_listener(self, callback):
+        """`callback(data)` is called from the refresh thread after a new catalogue is swapped in."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def refresh_async(self):
+        """Starts a background refresh unless one is already running. Returns the thread."""
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return self._refresh_thread
+            self._refresh_thread = threading.Thread(target=self.refresh, name="BiomeRefresh", daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    def refresh(self):
+        """Fetches the remote biomes.json if it changed since the cached copy and swaps it in.
+        Returns True if the catalogue changed."""
+        import requests
+        cache = load_json_data(self.cache_filename, {})
+        headers = {}
+        if cache.get("biomes") and cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("biomes") and cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+        try:
+            response = requests.get(self.remote_url, headers=headers, timeout=BIOMES_REMOTE_TIMEOUT)
+            self.last_refresh = time.time()
+            if response.status_code == 304:
+                print("Remote biomes unchanged since last fetch.")
+                return False
+            response.raise_for_status()
+            remote_data = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Failed to fetch remote biomes: {e}")
+            return False
+        except ValueError as e:
+            print(f"Failed to parse remote biomes JSON: {e}")
+            return False
+        except Exception as e:
+            error_logging(e, "Error fetching remote biomes")
+            return False
+
+        print(f"Fetched {len(remote_data)} biomes from remote URL")
+        save_json_data(self.cache_filename, {
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "biomes": remote_data,
+        })
+        if remote_data == cache.get("biomes"):
+            return False
+
+        data = build_biome_data(remote_data, _load_assets_biomes())
+        with self._lock:
+            changed = data != self._data
+            if changed:
+                self._data = data
+            listeners = list(self._listeners)
+        if not changed:
+            return False
+
+        for callback in listeners:
+            try:
+                callback(data)
+            except Exception as e:
+                error_logging(e, "Error in biome catalogue listener")
+        return True
+
+BIOMES = BiomeRegistry()
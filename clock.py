@@ -0,0 +1,52 @@
+import threading
+import time
+from datetime import datetime
+
+class SystemClock:
+    """Wall-clock time. The default clock used by the detection pipeline."""
+    def time(self):
+        return time.time()
+
+    def now(self, tz=None):
+        return datetime.now(tz)
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class ReplayClock:
+    """A virtual clock for replaying recorded logs.
+
+    Time only moves when `advance()` or `sleep()` is called. With `speed` > 0 a
+    sleep also waits `seconds / speed` of real time, so replays run at N× real
+    time; with `speed` == 0 sleeps return immediately and the replay runs as fast
+    as the detector can keep up.
+    """
+    def __init__(self, start, speed=0.0):
+        self._now = float(start)
+        self.speed = speed
+        self._lock = threading.Lock()
+
+    def time(self):
+        with self._lock:
+            return self._now
+
+    def now(self, tz=None):
+        return datetime.fromtimestamp(self.time(), tz)
+
+    def advance(self, seconds):
+        with self._lock:
+            self._now += max(0.0, seconds)
+            return self._now
+
+    def set(self, timestamp):
+        with self._lock:
+            self._now = max(self._now, float(timestamp))
+            return self._now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        if self.speed > 0:
+            time.sleep(seconds / self.speed)
+        self.advance(seconds)
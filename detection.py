@@ -1,33 +1,93 @@
 import os
-import re
 import time
 import json
-import requests
 import concurrent.futures
-import psutil
-from datetime import datetime, timedelta
 
-from utils import error_logging, get_log_files, load_biome_data, ROBLOX_LOGS_DIR, compare_versions
+from utils import error_logging, get_log_files, get_roblox_logs_dir, compare_versions
+from biomes import BIOMES
+from latency import LatencyTracker
+from metrics import REGISTRY as metrics
+from clock import SystemClock
+from polling import AdaptivePollScheduler, POLL_MIN_INTERVAL
+from liveness import LivenessTracker, LIVENESS_ALIVE, LIVENESS_STALE, LIVENESS_CHECK_INTERVAL
+from history import EVENT_BIOME_START, EVENT_BIOME_END, EVENT_MERCHANT
+from tailer import (
+    LOG_READ_SIZE, LogTailer, ReverseLogReader, scan_log_tail, extract_username,
+    parse_biome_from_rpc, find_merchant_events, RpcRecordMemo
+)
 
 DEFAULT_WEBHOOK_RATE_LIMIT = 1.0 
-RPC_CACHE_MAX_SIZE = 200
-LOG_READ_SIZE = 1048576
-LOG_TAIL_READ_BYTES = 2 * 1024 * 1024
-LOG_READ_CHUNK_SIZE = 2000 
-ACTIVE_LOG_THRESHOLD = 300 
-STALE_LOG_THRESHOLD = 300 
 LOG_ARRAY_UPDATE_INTERVAL = 60 
+DETECTION_LOOP_MAX_DELAY = 1.0 # Keeps log array refreshes and periodic saves on time while every account is idle
+
+def compile_notification_policy(biome_data, config):
+    """Precomputes, per biome, the message type for its start and end notifications.
+
+    Returns {biome: (start_message_type, end_message_type)} where None means no notification.
+    force_notify biomes always notify (ping_everyone turns the start into a Ping), never_notify
+    biomes never do, and other biomes follow `biome_notifier`/`biome_notification_enabled`.
+    """
+    notifier = config.get("biome_notifier", {})
+    enabled_map = config.get("biome_notification_enabled", {})
+    policy = {}
+    for biome, info in biome_data.items():
+        start_type = end_type = notifier.get(biome, "Message")
+        enabled = enabled_map.get(biome, True)
+        if info.get("force_notify", False):
+            enabled = True
+            end_type = "Message"
+            if info.get("ping_everyone", False):
+                start_type = "Ping"
+        elif info.get("never_notify", False):
+            enabled = False
+        policy[biome] = (
+            start_type if enabled and start_type != "None" else None,
+            end_type if enabled and end_type != "None" else None,
+        )
+    return policy
+
+class SyncWebhookDispatcher:
+    """Delivers biome webhooks on the calling detection thread. Engines can swap in their own
+    dispatcher (same `dispatch` signature) to deliver asynchronously."""
+    def __init__(self, manager):
+        self.manager = manager
+
+    def dispatch(self, username, biome, message_type, event_type, trace=None):
+        metrics.inc("multiscope_webhook_queue_depth")
+        try:
+            self.manager.send_account_webhook(username, biome, message_type, event_type, trace=trace)
+        finally:
+            metrics.inc("multiscope_webhook_queue_depth", -1)
+
+def http_post(*args, **kwargs):
+    """requests.post, importing requests on the first webhook rather than at startup."""
+    import requests
+    return requests.post(*args, **kwargs)
 
 class DetectionManager:
-    def __init__(self, app_instance):
+    def __init__(self, app_instance, scan_logs=True):
         """Initialize the Detection Manager.
 
         Args:
             app_instance: The main application instance (e.g., MultiScopeApp)
                           to access shared state like config, accounts, logs etc.
+            scan_logs: Build the username -> log map now. The app passes False and
+                       runs update_log_array() as a background startup task.
         """
         self.app = app_instance 
-        self.biome_data = load_biome_data() 
+        self.biome_data = getattr(app_instance, 'biome_data', None) or BIOMES.data
+        self.logs_dir = getattr(app_instance, 'roblox_logs_dir', None) or get_roblox_logs_dir()
+        # Injectable so recorded logs can be replayed on a virtual clock with webhooks going to a recording sink
+        self.clock = getattr(app_instance, 'clock', None) or SystemClock()
+        self.http_post = getattr(app_instance, 'http_post', None) or http_post
+        self.max_workers = getattr(app_instance, 'detection_max_workers', None)
+        self.webhook_dispatcher = SyncWebhookDispatcher(self)
+        self.poll_scheduler = AdaptivePollScheduler(self.clock)
+        self.log_tailers = {} # username -> LogTailer, for the threads engine
+        self.rpc_memo = RpcRecordMemo()
+        self.liveness = LivenessTracker()
+        self.last_liveness_check = 0
+        self.engine = self._create_engine()
 
         self.log_arrays = []
         self.username_log_map = {}
@@ -40,21 +100,64 @@ class DetectionManager:
         self.account_last_sent_webhook = {} 
         self.sent_webhooks_cache = set() 
         self.first_detection_skipped = {} 
+        self.latency = LatencyTracker(clock=self.clock) # Per-stage timings from log line to webhook ack
 
-        # Merchant detection attributes
-        self.merchant_webhook_url = self.app.config.get("merchant_webhook_url", "")
-        self.merchant_notification_enabled = self.app.config.get("merchant_notification_enabled", True)
-        self.merchant_jester_enabled = self.app.config.get("merchant_jester_enabled", True)
-        self.merchant_mari_enabled = self.app.config.get("merchant_mari_enabled", True)
-        self.merchant_jester_ping_config = self.app.config.get("merchant_jester_ping_config", {"id": "", "type": "None"})
-        self.merchant_mari_ping_config = self.app.config.get("merchant_mari_ping_config", {"id": "", "type": "None"})
+        # Merchant detection attributes (settings and notification policy come from reload_settings)
+        self.reload_settings()
         self.account_last_merchant_log_line = {} # Stores the full log line of the last notified event
         self.last_merchant_webhook_time = 0 # For rate limiting merchant webhooks specifically
         self.account_merchant_cooldown = {} # Per-account cooldown to prevent duplicate notifications (30s)
 
         self.first_merchant_scan_completed_for_user = set() # Tracks users for whom initial merchant scan is done
 
-        self._initialize_account_states()
+        self._initialize_account_states(scan_logs)
+
+    def _create_engine(self):
+        """Returns the alternative engine selected by the `detection_engine` config key, or None for threads."""
+        engine_name = self.app.config.get("detection_engine", "threads")
+        if engine_name == "asyncio":
+            from async_engine import AsyncDetectionEngine
+            return AsyncDetectionEngine(self)
+        if engine_name == "sharded":
+            from sharding import ShardedDetectionEngine
+            return ShardedDetectionEngine(self, self.app.config.get("detection_shards", 0))
+        if engine_name != "threads":
+            self.app.append_log(f"Warning: Unknown detection_engine '{engine_name}', using threads.")
+        return None
+
+    def next_poll_delay(self):
+        """Seconds the detection loop should wait before calling check_all_accounts_biomes() again."""
+        if self.engine is not None and hasattr(self.engine, "next_poll_delay"):
+            return self.engine.next_poll_delay()
+        return min(DETECTION_LOOP_MAX_DELAY, max(POLL_MIN_INTERVAL / 5, self.poll_scheduler.next_due_in()))
+
+    def poll_due_accounts(self, log_paths):
+        """Stats the due accounts in `log_paths` ({username: log_path}) and returns those whose log changed."""
+        scheduler = self.poll_scheduler
+        scheduler.forget(log_paths)
+        checks_before = scheduler.stat_checks
+        changed = [username for username in scheduler.due(log_paths) if scheduler.check(username, log_paths[username])]
+        for username in changed:
+            self.liveness.observe(username, scheduler.last_mtime(username))
+        metrics.inc("multiscope_log_stat_checks_total", scheduler.stat_checks - checks_before)
+        metrics.inc("multiscope_log_reads_total", len(changed))
+        return changed
+
+    def check_liveness(self):
+        """Marks accounts alive or stale from when their log last changed and reports transitions to the app."""
+        for username, old_state, new_state, idle in self.liveness.evaluate(self.accounts):
+            if new_state == LIVENESS_STALE:
+                self.app.append_log(f"⚠️ No log activity from {username}'s client for {int(idle // 60)} min, it may be frozen or disconnected.")
+            elif new_state == LIVENESS_ALIVE and old_state == LIVENESS_STALE:
+                self.app.append_log(f"✅ {username}'s client is writing to its log again.")
+            if hasattr(self.app, 'on_client_liveness_changed'):
+                self.app.on_client_liveness_changed(username, old_state, new_state, idle)
+        metrics.set("multiscope_accounts_stale", sum(1 for state, _ in self.liveness.status().values() if state == LIVENESS_STALE))
+
+    def shutdown(self):
+        """Stops engine workers. Detection can be started again afterwards."""
+        if self.engine is not None:
+            self.engine.stop()
 
     def reset_detection_states(self):
         """Resets the detection states, typically called when accounts change."""
@@ -62,20 +165,39 @@ class DetectionManager:
         self.accounts = [acc.get("username") for acc in self.app.accounts if acc.get("username")] 
         self.first_detection_skipped = {} 
 
-        # Reset merchant related states
-        self.merchant_webhook_url = self.app.config.get("merchant_webhook_url", "")
-        self.merchant_notification_enabled = self.app.config.get("merchant_notification_enabled", True)
-        self.merchant_jester_enabled = self.app.config.get("merchant_jester_enabled", True)
-        self.merchant_mari_enabled = self.app.config.get("merchant_mari_enabled", True)
-        self.merchant_jester_ping_config = self.app.config.get("merchant_jester_ping_config", {"id": "", "type": "None"})
-        self.merchant_mari_ping_config = self.app.config.get("merchant_mari_ping_config", {"id": "", "type": "None"})
+        # Re-read merchant and notification settings
+        self.reload_settings()
         self.account_last_merchant_log_line = {} # Reset this
 
         self.first_merchant_scan_completed_for_user = set() # Reset this as well
+        self.poll_scheduler.reset()
+        self.log_tailers = {} # Next scans are cold, so the current biomes are detected again
+        self.rpc_memo.reset()
+        if self.engine is not None and hasattr(self.engine, "reset"):
+            self.engine.reset()
 
         self._initialize_account_states()
 
-    def _initialize_account_states(self):
+    def reload_settings(self, biome_data=None):
+        """Applies a new biome catalogue and the current notification/merchant settings in place.
+
+        Per-account detection state is kept and no logs are rescanned, so this is safe to
+        call while detection is running (e.g. after saving biome settings or a biomes.json refresh).
+        """
+        if biome_data is not None:
+            self.biome_data = biome_data
+        config = self.app.config
+        self.merchant_webhook_url = config.get("merchant_webhook_url", "")
+        self.merchant_notification_enabled = config.get("merchant_notification_enabled", True)
+        self.merchant_jester_enabled = config.get("merchant_jester_enabled", True)
+        self.merchant_mari_enabled = config.get("merchant_mari_enabled", True)
+        self.merchant_jester_ping_config = config.get("merchant_jester_ping_config", {"id": "", "type": "None"})
+        self.merchant_mari_ping_config = config.get("merchant_mari_ping_config", {"id": "", "type": "None"})
+        # Swapped last: handle_account_biome_detection reads the policy once per detection.
+        self.notification_policy = compile_notification_policy(self.biome_data, config)
+        self.app.append_log(f"Debug: Notification policy compiled for {len(self.notification_policy)} biomes.")
+
+    def _initialize_account_states(self, scan_logs=True):
         """Initialize detection state for accounts present in the app config."""
         if not hasattr(self.app, 'accounts'):
             self.app.append_log("Debug: App instance has no 'accounts' attribute during init.")
@@ -89,22 +211,24 @@ class DetectionManager:
                 self.account_last_merchant_log_line[username] = {}
             if username not in self.account_merchant_cooldown:
                 self.account_merchant_cooldown[username] = 0
-        self.update_log_array()
+        if scan_logs:
+            self.update_log_array()
 
     def update_log_array(self):
         """Updates self.log_arrays to have new log files in an array, newest first."""
         try:
-            self.app.append_log(f"Debug: Updating log array from {ROBLOX_LOGS_DIR}")
-            now = datetime.now().timestamp()
+            logs_dir = self.logs_dir
+            self.app.append_log(f"Debug: Updating log array from {logs_dir}")
+            now = self.clock.time()
 
             timeThreshold = 7200
             files = [
-                f for f in os.listdir(ROBLOX_LOGS_DIR)
-                if os.path.isfile(os.path.join(ROBLOX_LOGS_DIR, f)) and
-                now - os.path.getmtime(os.path.join(ROBLOX_LOGS_DIR, f)) <= timeThreshold
+                f for f in os.listdir(logs_dir)
+                if os.path.isfile(os.path.join(logs_dir, f)) and
+                now - os.path.getmtime(os.path.join(logs_dir, f)) <= timeThreshold
             ]
-            files_sorted = sorted(files, key=lambda f: os.path.getmtime(os.path.join(ROBLOX_LOGS_DIR, f)), reverse=True)
-            self.log_arrays = [os.path.join(ROBLOX_LOGS_DIR, f) for f in files_sorted]
+            files_sorted = sorted(files, key=lambda f: os.path.getmtime(os.path.join(logs_dir, f)), reverse=True)
+            self.log_arrays = [os.path.join(logs_dir, f) for f in files_sorted]
             self.app.append_log(f"Debug: Found {len(self.log_arrays)} log files: {self.log_arrays[:5]}...") 
 
             # Rebuild the username_log_map
@@ -124,9 +248,11 @@ class DetectionManager:
             self.app.append_log(f"Error: Failed to update log array/map: {e}")
 
     def check_all_accounts_biomes(self):
-        """Main loop function to check biomes for all configured accounts using multithreading."""
+        """Main loop function to check biomes for all configured accounts with the configured engine."""
         try:
-            now = time.time()
+            now = self.clock.time()
+            cycle_start = time.perf_counter()
+            bytes_before = metrics.get("multiscope_log_bytes_read_total")
             if now - self.last_log_array_update_time > LOG_ARRAY_UPDATE_INTERVAL:
                 self.app.append_log("Debug: Log array update interval reached, refreshing...")
                 self.update_log_array()
@@ -137,42 +263,76 @@ class DetectionManager:
                 self.app.append_log("Debug: No configured accounts to check.")
                 return
 
-            # Set max_workers based on the total number of accounts configured in the app
-            total_configured_accounts = len(self.app.accounts) # This is used for max_workers
-            max_workers = total_configured_accounts if total_configured_accounts > 0 else 1
-            
-            self.app.append_log(f"Debug: Checking biomes for {len(self.accounts)} configured accounts. Max workers: {max_workers}")
-
-            # Process all configured accounts concurrently
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_username = {
-                    executor.submit(self.check_single_account_log, username): username
-                    for username in self.accounts # Iterate over all configured accounts
-                }
-
-                completed_count = 0
-                for future in concurrent.futures.as_completed(future_to_username):
-                    username = future_to_username[future]
-                    try:
-                        future.result()
-                    except Exception as e:
-                        error_logging(e, f"Error in thread processing log for {username}")
+            if self.engine is not None:
+                self.engine.run_cycle()
+            else:
+                self._check_accounts_threaded()
+
+            cycle_seconds = time.perf_counter() - cycle_start
+            metrics.inc("multiscope_detection_cycles_total")
+            metrics.set("multiscope_detection_cycle_seconds", round(cycle_seconds, 6))
+            metrics.inc("multiscope_detection_cycle_seconds_total", cycle_seconds)
+            metrics.set("multiscope_accounts_scanned", len(self.accounts))
+            metrics.inc("multiscope_accounts_scanned_total", len(self.accounts))
+            metrics.set("multiscope_cycle_bytes_read", metrics.get("multiscope_log_bytes_read_total") - bytes_before)
+
+            if now - self.last_liveness_check >= LIVENESS_CHECK_INTERVAL:
+                self.check_liveness()
+                self.last_liveness_check = now
 
         except Exception as e:
             error_logging(e, "Error in check_all_accounts_biomes")
 
+    def _check_accounts_threaded(self):
+        """Checks every configured account on a thread per account (the default "threads" engine)."""
+        # Set max_workers based on the total number of accounts configured in the app
+        total_configured_accounts = len(self.app.accounts) # This is used for max_workers
+        max_workers = total_configured_accounts if total_configured_accounts > 0 else 1
+        if self.max_workers:
+            max_workers = min(max_workers, self.max_workers)
+        
+        # Only accounts whose log changed since their last check are read
+        changed = self.poll_due_accounts({username: self.username_log_map.get(username.lower()) for username in self.accounts})
+        if not changed:
+            return
+        self.app.append_log(f"Debug: Checking biomes for {len(changed)} of {len(self.accounts)} configured accounts. Max workers: {max_workers}")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(changed))) as executor:
+            future_to_username = {
+                executor.submit(self.check_single_account_log, username): username
+                for username in changed
+            }
+
+            completed_count = 0
+            for future in concurrent.futures.as_completed(future_to_username):
+                username = future_to_username[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    error_logging(e, f"Error in thread processing log for {username}")
+
+    def rpc_record_seen(self, username, log_path, rpc_message, rpc_log_time):
+        """Returns True if this RPC record is the last one handled from its log for the account, so its
+        parse and the notification policy can be skipped. Counts memo hits and misses for the metrics."""
+        if self.rpc_memo.seen(username, log_path, rpc_message, rpc_log_time):
+            metrics.inc("multiscope_rpc_memo_hits_total")
+            return True
+        metrics.inc("multiscope_rpc_memo_misses_total")
+        return False
+
     def get_last_rpc_msg(self, log_path):
         """Gets the latest RPC Message from the specific log path."""
-        path_content = ""
         self.app.append_log(f"Debug: Entering get_last_rpc_msg for {log_path}") 
         if os.path.exists(log_path):
             try:
-                self.app.append_log(f"Debug: Reading file content for RPC from {log_path}")
-                with open(log_path,"r", encoding='utf-8', errors='ignore') as file:
-                    # Read the whole file for simplicity now, can optimize later if needed
-                    path_content = file.read()
-                self.app.append_log(f"Debug: Read {len(path_content)} bytes for RPC from {log_path}")
-                return self.get_rpc_from_content(path_content, log_path) # Call new refactored method
+                # Walks the log backwards from the end, so only the blocks after the latest RPC record are read
+                reader = ReverseLogReader(log_path)
+                rpc_message = reader.find_latest_rpc()[0]
+                metrics.inc("multiscope_log_bytes_read_total", reader.bytes_read)
+                self.app.append_log(f"Debug: Read {reader.bytes_read} of {reader.file_size} bytes for RPC from {log_path}")
+                if rpc_message is None:
+                    self.app.append_log(f"Debug: No complete [BloxstrapRPC] record in {log_path}")
+                return rpc_message
             except Exception as e:
                 error_logging(e, f"Error reading file for RPC from {log_path}")
                 self.app.append_log(f"Error: Exception in get_last_rpc_msg for {log_path}: {e}")
@@ -181,32 +341,6 @@ class DetectionManager:
             self.app.append_log(f"Debug: Path does not exist in get_last_rpc_msg: {log_path}")
             return None
 
-    def get_rpc_from_content(self, log_content, log_path_for_debug=""): # New method
-        """Gets the latest RPC Message from the given log content."""
-        self.app.append_log(f"Debug: Entering get_rpc_from_content for log: {log_path_for_debug}")
-        if not log_content:
-            self.app.append_log(f"Debug: Empty log content provided to get_rpc_from_content for {log_path_for_debug}")
-            return None
-        try:
-            rpc_start_index = log_content.rfind("[BloxstrapRPC]")
-            if rpc_start_index == -1:
-                self.app.append_log(f"Debug: [BloxstrapRPC] marker not found in content from {log_path_for_debug}")
-                return None
-
-            rpc = log_content[rpc_start_index:]
-            end_marker_index = rpc.find("}}}")
-            if end_marker_index == -1:
-                self.app.append_log(f"Debug: RPC end marker '}}}}' not found in content from {log_path_for_debug}")
-                return None
-
-            rpc = rpc[:end_marker_index+3]
-            self.app.append_log(f"Debug: Successfully extracted RPC msg (length {len(rpc)}) from content of {log_path_for_debug}")
-            return rpc
-        except Exception as e:
-            error_logging(e, f"Error processing RPC from content of {log_path_for_debug}")
-            self.app.append_log(f"Error: Exception in get_rpc_from_content for {log_path_for_debug}: {e}")
-            return None
-
     def get_username(self, log_path):
         path_content = ""
         self.app.append_log(f"Debug: Attempting to get username from {log_path}") 
@@ -214,10 +348,9 @@ class DetectionManager:
             try:
                 with open(log_path,"r", encoding='utf-8', errors='ignore') as file:
                     path_content = file.read(LOG_READ_SIZE)
-                # Updated pattern to use PlayerGui reference for more reliable username extraction
-                username_match = re.search(r"Players\.([^.]+)\.PlayerGui", path_content)
-                if username_match:
-                    username = username_match.group(1)
+                # Uses the PlayerGui reference for more reliable username extraction
+                username = extract_username(path_content)
+                if username:
                     self.app.append_log(f"Debug: Extracted username '{username}' from {log_path}") 
                     return username
                 else:
@@ -242,7 +375,7 @@ class DetectionManager:
         return log_path
 
     def check_single_account_log(self, username):
-        """Checks a single log file (tail only) for biome and merchant updates for a specific account."""
+        """Checks what a single log file gained since its last check for biome and merchant updates for a specific account."""
         self.app.append_log(f"Debug: Checking log for account: {username}")
         try:
             log_path = self.get_log_from_user(username)
@@ -251,60 +384,67 @@ class DetectionManager:
                 return
             self.app.append_log(f"Debug: Using log path {log_path} for {username}")
 
-            # Read log content - TAIL ONLY
-            log_content = None
-            if os.path.exists(log_path):
-                try:
-                    file_size = os.path.getsize(log_path)
-                    # Determine the actual amount to read, ensuring it's not more than the file size
-                    read_amount = min(file_size, LOG_TAIL_READ_BYTES) 
-                    
-                    with open(log_path, "r", encoding='utf-8', errors='ignore') as file:
-                        if file_size > LOG_TAIL_READ_BYTES:
-                            # Seek from the end of the file backwards by LOG_TAIL_READ_BYTES
-                            # file.seek(0, os.SEEK_END) # Go to end
-                            # file.seek(file.tell() - LOG_TAIL_READ_BYTES) # Go back by LOG_TAIL_READ_BYTES
-                            # A simpler way for positive offsets from start:
-                            file.seek(file_size - LOG_TAIL_READ_BYTES)
-                        log_content = file.read(LOG_TAIL_READ_BYTES) # Read up to LOG_TAIL_READ_BYTES
-                    self.app.append_log(f"Debug: Read last {len(log_content)} bytes (target: {LOG_TAIL_READ_BYTES}) from {log_path} for {username}")
-                except FileNotFoundError:
-                    self.app.append_log(f"Warning: FileNotFoundError for {log_path} (race condition after os.path.exists?). Skipping {username}.")
-                    return # Skip if file disappeared
-                except Exception as e:
-                    error_logging(e, f"Error reading log file tail {log_path} for {username}")
-                    self.app.append_log(f"Error: Could not read log tail {log_path} for {username}: {e}")
-                    return
-            else:
+            if not os.path.exists(log_path):
                 self.app.append_log(f"Debug: Log path {log_path} does not exist (check_single_account_log). Should have been caught by get_log_from_user map logic if map is fresh.")
                 return
 
-            if not log_content:
-                self.app.append_log(f"Debug: Empty log content for {username} from {log_path}, skipping.")
-                return
+            tailer = self.log_tailers.get(username)
+            if tailer is None or tailer.log_path != log_path:
+                tailer = self.log_tailers[username] = LogTailer(log_path)
 
-            # Process for Biomes (RPC)
-            rpc_message = self.get_rpc_from_content(log_content, log_path)
-            if rpc_message:
-                biome = self.get_biome_from_rpc(rpc_message)
+            # The first scan walks back to the latest RPC record; later ones read only what was appended since
+            # and return every RPC record in it, so a biome that started and ended between checks is still seen
+            try:
+                scan = scan_log_tail(tailer, force=True, time_func=self.clock.time) # The poll scheduler has already seen the change
+            except FileNotFoundError:
+                self.app.append_log(f"Warning: FileNotFoundError for {log_path} (race condition after os.path.exists?). Skipping {username}.")
+                return # Skip if file disappeared
+            except Exception as e:
+                error_logging(e, f"Error reading log file {log_path} for {username}")
+                self.app.append_log(f"Error: Could not read log {log_path} for {username}: {e}")
+                return
+            if scan is None:
+                self.app.append_log(f"Debug: Log {log_path} for {username} is gone or unchanged, skipping.")
+                return
+            bytes_read, read_time, rpc_records, merchant_events, malformed_records = scan
+            metrics.inc("multiscope_log_bytes_read_total", bytes_read)
+            self.app.append_log(f"Debug: Read {bytes_read} bytes from {log_path} for {username}")
+            if malformed_records:
+                metrics.inc("multiscope_rpc_parse_failures_total", malformed_records)
+                self.app.append_log(f"Debug: Skipped {malformed_records} malformed RPC record(s) in {log_path} for {username}")
+
+            # Process for Biomes (RPC), in log order
+            if not rpc_records:
+                self.app.append_log(f"Debug: No new RPC message in {log_path} for {username}, skipping biome check.")
+            for rpc_message, rpc_log_time, rpc_offset, rpc_payload in rpc_records:
+                if self.rpc_record_seen(username, log_path, rpc_message, rpc_log_time):
+                    self.app.append_log(f"Debug: RPC record for {username} already handled, skipping.")
+                    continue
+                biome = self.get_biome_from_rpc(rpc_payload)
                 if biome:
                     self.app.append_log(f"Debug: Extracted biome '{biome}' for {username}")
-                    self.handle_account_biome_detection(username, biome)
+                    trace = self.latency.start_trace(username, rpc_log_time)
+                    trace.mark("read", read_time).mark("parsed")
+                    self.handle_account_biome_detection(username, biome, trace=trace, source=(log_path, rpc_offset))
                 else:
                     self.app.append_log(f"Debug: Could not extract biome from RPC for {username} in {log_path}")
-            else:
-                self.app.append_log(f"Debug: No RPC message found in {log_path} for {username}, skipping biome check.")
 
-            # Process for Merchants
-            self.process_merchant_events(username, log_content, log_path)
+            # Process for Merchants (recorded in the history even when notifications are off)
+            self.dispatch_merchant_events(username, merchant_events, log_path)
 
         except Exception as e:
             error_logging(e, f"Error in check_single_account_log for {username}")
             self.app.append_log(f"Error: check_single_account_log failed for {username}: {e}")
 
-    def handle_account_biome_detection(self, username, biome):
-        """Handles the logic when a new biome is detected for an account."""
-        if not username or not biome or biome not in self.biome_data:
+    def handle_account_biome_detection(self, username, biome, trace=None, source=None):
+        """Handles the logic when a new biome is detected for an account.
+
+        `trace` is an optional LatencyTrace carrying the timestamps of the earlier
+        pipeline stages; it is completed here and in send_account_webhook.
+        `source` is the (log_path, offset) of the RPC record, kept in the event history.
+        """
+        policy = self.notification_policy
+        if not username or not biome or biome not in policy:
             print(f"Warning: Invalid arguments for handle_account_biome_detection ({username}, {biome})")
             return
 
@@ -314,7 +454,9 @@ class DetectionManager:
             return
         self.app.append_log(f"🌍 Biome change for {username}: {previous_biome or 'None'} -> {biome}")
         self.account_biomes[username] = biome
-        now = datetime.now()
+        now = self.clock.now()
+        if trace: trace.mark("decided")
+        self.record_biome_change(username, previous_biome, biome, trace, source)
 
         if username not in self.account_last_sent_webhook: self.account_last_sent_webhook[username] = {}
         self.account_last_sent_webhook[username][biome] = now 
@@ -328,112 +470,136 @@ class DetectionManager:
         if username not in self.first_detection_skipped:
             self.first_detection_skipped[username] = True
             self.app.append_log(f"⏭️ Skipping first biome notification for {username} to prevent false positives")
+            self.latency.record(trace)
             return
 
-        message_type = self.app.config.get("biome_notifier", {}).get(biome, "Message")
-        notification_enabled = self.app.config.get("biome_notification_enabled", {}).get(biome, True)
-
-        # Check biome data for force_notify, never_notify, and ping_everyone flags
-        biome_info = self.biome_data.get(biome, {})
-        if biome_info.get("force_notify", False):
-            notification_enabled = True
-            if biome_info.get("ping_everyone", False):
-                message_type = "Ping"
-        elif biome_info.get("never_notify", False):
-            notification_enabled = False
-
+        start_message_type = policy[biome][0]
         webhook_tasks = []
 
-        if previous_biome and previous_biome in self.biome_data:
-            prev_message_type = self.app.config.get("biome_notifier", {}).get(previous_biome, "Message")
-            prev_notification_enabled = self.app.config.get("biome_notification_enabled", {}).get(previous_biome, True)
-            prev_biome_info = self.biome_data.get(previous_biome, {})
-            if prev_biome_info.get("force_notify", False):
-                prev_message_type = "Message"
-                prev_notification_enabled = True
-            elif prev_biome_info.get("never_notify", False):
-                prev_notification_enabled = False
-
-            if prev_message_type != "None" and prev_notification_enabled:
-                webhook_tasks.append(("end", previous_biome, prev_message_type))
+        if previous_biome in policy:
+            end_message_type = policy[previous_biome][1]
+            if end_message_type:
+                webhook_tasks.append(("end", previous_biome, end_message_type))
 
-        if message_type != "None" and notification_enabled:
-            webhook_tasks.append(("start", biome, message_type))
+        if start_message_type:
+            webhook_tasks.append(("start", biome, start_message_type))
 
-        for event_type, biome_name, msg_type in webhook_tasks:
-             self.send_account_webhook(username, biome_name, msg_type, event_type)
+        if not webhook_tasks:
+            self.latency.record(trace)
+            return
 
-    def get_biome_from_rpc(self, rpc_message):
-        """Extract biome name (largeImage hoverText) from Bloxstrap RPC msg using JSON parsing."""
+        task_traces = [trace.copy().mark("enqueued") if trace else None for _ in webhook_tasks]
+        for (event_type, biome_name, msg_type), task_trace in zip(webhook_tasks, task_traces):
+             self.webhook_dispatcher.dispatch(username, biome_name, msg_type, event_type, task_trace)
+
+    def record_event(self, timestamp, username, name, event_type, log_path=None, log_offset=None):
+        """Adds a detected event to the app's rolling stats and event history, when it has them."""
+        for sink in (getattr(self.app, 'stats', None), getattr(self.app, 'history', None)):
+            if sink is not None:
+                sink.record(timestamp, username, name, event_type, log_path, log_offset)
+
+    def record_biome_change(self, username, previous_biome, biome, trace=None, source=None):
+        """Records the end of the previous biome and the start of the new one at the log line's time."""
+        event_time = trace.stamps.get("log") if trace else None
+        if event_time is None:
+            event_time = self.clock.time()
+        log_path, log_offset = source or (None, None)
+        if previous_biome:
+            self.record_event(event_time, username, previous_biome, EVENT_BIOME_END, log_path, log_offset)
+        self.record_event(event_time, username, biome, EVENT_BIOME_START, log_path, log_offset)
+
+    def get_biome_from_rpc(self, rpc):
+        """Extract biome name (largeImage hoverText) from a Bloxstrap RPC record's decoded payload (or its message)."""
         self.app.append_log(f"Debug: Entering get_biome_from_rpc")
         try:
-            if not isinstance(rpc_message, str) or not rpc_message:
-                self.app.append_log(f"Debug: get_biome_from_rpc received invalid input (type: {type(rpc_message)}, empty: {not rpc_message})")
-                return None
-
-            json_start_index = rpc_message.find('{')
-            if json_start_index == -1:
-                self.app.append_log("Debug: RPC message does not contain JSON start '{'")
-                return None
-
-            json_data_str = rpc_message[json_start_index:]
-
-            rpc_data = json.loads(json_data_str)
-            self.app.append_log("Debug: Successfully parsed RPC JSON.")
-
-            large_image_data = rpc_data.get('data', {}).get('largeImage')
-            if not large_image_data or not isinstance(large_image_data, dict):
-                self.app.append_log("Debug: 'largeImage' data not found or not a dictionary in RPC.")
-
-                return None
-
-            found_biome = large_image_data.get('hoverText')
-            if not found_biome or not isinstance(found_biome, str):
-                self.app.append_log("Debug: 'hoverText' not found or not a string within largeImage.")
-
+            found_biome = parse_biome_from_rpc(rpc)
+            if not found_biome:
+                self.app.append_log("Debug: No largeImage hoverText found in RPC message.")
                 return None
 
             self.app.append_log(f"Debug: Successfully extracted biome hoverText: {found_biome}")
             return found_biome
 
         except json.JSONDecodeError as json_e:
+            metrics.inc("multiscope_rpc_parse_failures_total")
             error_logging(json_e, "Error decoding JSON from RPC message")
-            self.app.append_log(f"Error: Failed to decode JSON in get_biome_from_rpc: {json_e}. RPC (start): {rpc_message[:200]}...")
+            self.app.append_log(f"Error: Failed to decode JSON in get_biome_from_rpc: {json_e}. RPC (start): {str(rpc)[:200]}...")
             return None
         except Exception as e:
             error_logging(e, "Error parsing biome from RPC")
-            self.app.append_log(f"Error: Unexpected exception in get_biome_from_rpc: {e}. RPC (start): {rpc_message[:200]}...")
+            self.app.append_log(f"Error: Unexpected exception in get_biome_from_rpc: {e}. RPC (start): {str(rpc)[:200]}...")
             return None
 
-    def send_account_webhook(self, username, biome, message_type, event_type):
+    def send_account_webhook(self, username, biome, message_type, event_type, trace=None):
         """Sends a webhook notification for a specific account's biome event."""
+        prepared = self.prepare_account_webhook(username, biome, message_type, event_type, trace)
+        if not prepared:
+            self.latency.record(trace)
+            return
+        original_username, deliveries = prepared
+
+        wait = self.webhook_rate_limit_wait()
+        if wait > 0:
+            self.app.append_log(f"⏳ Rate limiting webhook ({username}/{biome}), waiting {wait:.2f}s")
+            self.clock.sleep(wait)
+        self.last_webhook_time = self.clock.time() 
+
+        import requests
+        sent_successfully_to_any = False
+        for webhook_url, payload in deliveries:
+            url_trace = trace.copy().mark("sent") if trace else None
+            response = None
+            try:
+                response = self.http_post(
+                    webhook_url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=10
+                )
+                response.raise_for_status()
+                self.webhook_delivered(original_username, biome, event_type, webhook_url, url_trace)
+                sent_successfully_to_any = True
+
+                self.clock.sleep(0.3)
+            except requests.exceptions.RequestException as e:
+                backoff = self.webhook_failed(e, original_username, webhook_url, response.status_code if response is not None else None)
+                if backoff:
+                    self.clock.sleep(backoff)
+            except Exception as e:
+                 error_logging(e, f"Unexpected error sending webhook for {original_username} to URL ending in ...{webhook_url[-10:]}")
+
+        self.webhook_round_finished(sent_successfully_to_any)
+
+    def prepare_account_webhook(self, username, biome, message_type, event_type, trace=None):
+        """Builds the Discord payloads for a biome event.
+
+        The event is timed by the log line it came from when `trace` carries it, so changes
+        processed together in one scan keep their own times. Returns (display_username,
+        [(webhook_url, payload)]), or None when nothing should be sent (no webhooks configured,
+        message type "None" or a duplicate of an event sent moments ago).
+        """
         webhooks_config = self.app.config.get("webhooks", [])
-        if not webhooks_config: return
-        if message_type == "None": return
+        if not webhooks_config or message_type == "None":
+            return None
 
-        notification_key = f"{username.lower()}_{biome}_{event_type}_{int(time.time() // 2)}" 
+        event_time = trace.stamps.get("log") if trace else None
+        if event_time is None:
+            event_time = self.clock.time()
+        notification_key = f"{username.lower()}_{biome}_{event_type}_{int(event_time // 2)}" 
         if notification_key in self.sent_webhooks_cache:
-             return
+             return None
         self.sent_webhooks_cache.add(notification_key)
 
         if len(self.sent_webhooks_cache) > 100:
              self.sent_webhooks_cache = set(list(self.sent_webhooks_cache)[-100:])
 
-        current_time = time.time()
-        time_since_last = current_time - self.last_webhook_time
-        if time_since_last < self.webhook_rate_limit:
-            sleep_time = self.webhook_rate_limit - time_since_last
-            self.app.append_log(f"⏳ Rate limiting webhook ({username}/{biome}), waiting {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        self.last_webhook_time = time.time() 
-
         biome_info = self.biome_data.get(biome, {})
         try:
             biome_color = int(biome_info.get("color", "0xFFFFFF").replace("0x", ""), 16)
         except ValueError:
              biome_color = 0xFFFFFF 
 
-        unix_timestamp = int(time.time())
+        unix_timestamp = int(event_time)
         timestamp_full = f"<t:{unix_timestamp}:F>"
         timestamp_relative = f"<t:{unix_timestamp}:R>"
         icon_url = biome_info.get("thumbnail_url") or "https://i.postimg.cc/mDzwFfX1/GLITCHED.png" 
@@ -447,14 +613,10 @@ class DetectionManager:
         ps_link = self.app.get_ps_link_for_user(username) 
 
         content = ""
-        user_id_to_ping = None
         if event_type == "start":
              if biome in ["GLITCHED", "DREAMSPACE"]:
                  content = "@everyone"
 
-             elif message_type == "Ping":
-                  pass
-
         biome_emoji = biome_info.get("emoji", "🌍")
         title = f"{biome_emoji} {biome} Biome Started" if event_type == "start" else f"{biome_emoji} {biome} Biome Ended"
 
@@ -482,47 +644,47 @@ class DetectionManager:
         if icon_url:
             embed["thumbnail"] = {"url": icon_url}
 
-        sent_successfully_to_any = False
-        sent_urls = set()
+        deliveries = []
+        target_urls = set()
         for webhook_entry in webhooks_config:
             webhook_url = webhook_entry.get("url", "").strip()
-            if not webhook_url or webhook_url in sent_urls: continue
+            if not webhook_url or webhook_url in target_urls: continue
 
             account_notifications = webhook_entry.get("account_notifications") 
             notify_all = account_notifications is None or not account_notifications
 
             if notify_all or (username.lower() in [acc.lower() for acc in account_notifications]):
-                try:
-                    ping_content = content
-                    webhook_user_id = webhook_entry.get("user_id") 
-                    if message_type == "Ping" and webhook_user_id and not ping_content.startswith("@everyone"):
-                         ping_content = f"<@{webhook_user_id}> {ping_content}".strip()
-
-                    response = requests.post(
-                        webhook_url,
-                        json={
-                            "content": ping_content,
-                            "embeds": [embed]
-                        },
-                        headers={"Content-Type": "application/json"},
-                        timeout=10
-                    )
-                    response.raise_for_status()
-                    self.app.append_log(f"✅ Webhook sent for {original_username}/{biome}/{event_type} to URL ending in ...{webhook_url[-10:]}")
-                    sent_successfully_to_any = True
-                    sent_urls.add(webhook_url)
-
-                    time.sleep(0.3)
-                except requests.exceptions.RequestException as e:
-                    error_logging(e, f"Failed to send webhook for {original_username} to URL ending in ...{webhook_url[-10:]}")
-
-                    if response is not None and response.status_code == 429:
-                        self.webhook_rate_limit = min(self.webhook_rate_limit + 0.5, 5.0)
-                        self.app.append_log(f"Discord rate limit hit. Increased delay to {self.webhook_rate_limit:.1f}s")
-                        time.sleep(1.5) 
-                except Exception as e:
-                     error_logging(e, f"Unexpected error sending webhook for {original_username} to URL ending in ...{webhook_url[-10:]}")
-
+                ping_content = content
+                webhook_user_id = webhook_entry.get("user_id") 
+                if message_type == "Ping" and webhook_user_id and not ping_content.startswith("@everyone"):
+                     ping_content = f"<@{webhook_user_id}> {ping_content}".strip()
+                deliveries.append((webhook_url, {"content": ping_content, "embeds": [embed]}))
+                target_urls.add(webhook_url)
+
+        return original_username, deliveries
+
+    def webhook_rate_limit_wait(self):
+        """Seconds to wait before the next biome webhook to respect the adaptive rate limit."""
+        return max(0.0, self.webhook_rate_limit - (self.clock.time() - self.last_webhook_time))
+
+    def webhook_delivered(self, original_username, biome, event_type, webhook_url, url_trace=None):
+        if url_trace: self.latency.record(url_trace.mark("acked"))
+        metrics.inc("multiscope_webhook_sends_total", labels={"kind": "biome"})
+        self.app.append_log(f"✅ Webhook sent for {original_username}/{biome}/{event_type} to URL ending in ...{webhook_url[-10:]}")
+
+    def webhook_failed(self, error, original_username, webhook_url, status_code=None):
+        """Records a failed biome webhook. Returns extra seconds to back off (after a 429), or 0."""
+        error_logging(error, f"Failed to send webhook for {original_username} to URL ending in ...{webhook_url[-10:]}")
+        metrics.inc("multiscope_webhook_failures_total", labels={"kind": "biome"})
+
+        if status_code == 429:
+            metrics.inc("multiscope_webhook_rate_limited_total")
+            self.webhook_rate_limit = min(self.webhook_rate_limit + 0.5, 5.0)
+            self.app.append_log(f"Discord rate limit hit. Increased delay to {self.webhook_rate_limit:.1f}s")
+            return 1.5
+        return 0
+
+    def webhook_round_finished(self, sent_successfully_to_any):
         if sent_successfully_to_any and self.webhook_rate_limit > DEFAULT_WEBHOOK_RATE_LIMIT:
              self.webhook_rate_limit = max(DEFAULT_WEBHOOK_RATE_LIMIT, self.webhook_rate_limit - 0.1)
 
@@ -538,6 +700,7 @@ class DetectionManager:
             "color": 0x00FF00, 
             "footer": {"text": f"MultiScope Test"}
         }
+        import requests
         try:
             response = requests.post(
                 webhook_url,
@@ -571,37 +734,24 @@ class DetectionManager:
 
         self.app.append_log(f"Debug: Processing merchant events for {username} from {log_path_for_debug}")
         
-        merchant_pattern = re.compile(
-            r"^(?P<full_line>" 
-            r"(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z)," 
-            r".*?" 
-            r"\[Merchant\]: (?P<merchant_name>Jester|Mari) has arrived on the island" 
-            r".*)$" 
-            , re.MULTILINE 
-        )
+        self.dispatch_merchant_events(username, find_merchant_events(log_content), log_path_for_debug)
 
-        found_merchants_in_current_scan = []
-        for match in merchant_pattern.finditer(log_content):
-            try:
-                full_log_line = match.group("full_line").strip() 
-                timestamp_str = match.group("timestamp")
-                merchant_name = match.group("merchant_name")
-                event_time_utc = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                
-                found_merchants_in_current_scan.append({
-                    "name": merchant_name, 
-                    "time": event_time_utc, 
-                    "log_path": log_path_for_debug,
-                    "log_line": full_log_line 
-                })
-            except Exception as e:
-                error_logging(e, f"Error parsing merchant event for {username} from {log_path_for_debug}")
-                self.app.append_log(f"Error: Could not parse merchant line for {username}: {match.group(0)[:100]}... Error: {e}")
+    def dispatch_merchant_events(self, username, merchant_events, log_path_for_debug=""):
+        """Applies the initial-scan suppression and duplicate checks to parsed merchant events.
 
-        if not found_merchants_in_current_scan:
+        `merchant_events` is find_merchant_events() output: [(name, event_time_utc, log_line)], oldest first.
+        Every event is added to the stats and event history, whether or not notifications are enabled.
+        """
+        if not merchant_events:
             return
-
-        found_merchants_in_current_scan.sort(key=lambda x: x["time"])
+        for name, event_time_utc, _ in merchant_events:
+            self.record_event(event_time_utc.timestamp(), username, name, EVENT_MERCHANT, log_path_for_debug or None)
+        if not self.merchant_notification_enabled:
+            return
+        found_merchants_in_current_scan = [
+            {"name": name, "time": event_time_utc, "log_path": log_path_for_debug, "log_line": log_line}
+            for name, event_time_utc, log_line in merchant_events
+        ]
 
         # Ensure the per-user, per-merchant structure exists (it should from _initialize_account_states)
         if username not in self.account_last_merchant_log_line:
@@ -678,14 +828,14 @@ class DetectionManager:
             return
 
         # Basic rate limiting for merchant webhooks (separate from biome webhooks)
-        current_time = time.time()
+        current_time = self.clock.time()
         time_since_last = current_time - self.last_merchant_webhook_time
         # Using the same rate limit variable for now, can be separated if needed
         if time_since_last < self.webhook_rate_limit: 
             sleep_time = self.webhook_rate_limit - time_since_last
             self.app.append_log(f"⏳ Rate limiting merchant webhook ({username}/{merchant_name}), waiting {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        self.last_merchant_webhook_time = time.time()
+            self.clock.sleep(sleep_time)
+        self.last_merchant_webhook_time = self.clock.time()
 
         original_username = username
         for account in self.app.accounts:
@@ -763,8 +913,10 @@ class DetectionManager:
                 return
         self.account_merchant_cooldown[username] = current_time
 
+        import requests
+        response = None
         try:
-            response = requests.post(
+            response = self.http_post(
                 self.merchant_webhook_url,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -772,6 +924,7 @@ class DetectionManager:
             )
             response.raise_for_status()
             self.app.append_log(f"✅ Merchant webhook sent for {original_username}/{merchant_name} to URL ending in ...{self.merchant_webhook_url[-10:]}")
+            metrics.inc("multiscope_webhook_sends_total", labels={"kind": "merchant"})
 
             # Adjust rate limit similar to biome webhooks
             if self.webhook_rate_limit > DEFAULT_WEBHOOK_RATE_LIMIT:
@@ -779,9 +932,11 @@ class DetectionManager:
 
         except requests.exceptions.RequestException as e:
             error_logging(e, f"Failed to send merchant webhook for {original_username} to URL ending in ...{self.merchant_webhook_url[-10:]}")
+            metrics.inc("multiscope_webhook_failures_total", labels={"kind": "merchant"})
             if response is not None and response.status_code == 429: # Check if response exists before accessing status_code
+                metrics.inc("multiscope_webhook_rate_limited_total")
                 self.webhook_rate_limit = min(self.webhook_rate_limit + 0.5, 5.0) # Use existing rate limit var
                 self.app.append_log(f"Discord rate limit hit for merchant. Increased delay to {self.webhook_rate_limit:.1f}s")
-                time.sleep(1.5)
+                self.clock.sleep(1.5)
         except Exception as e:
             error_logging(e, f"Unexpected error sending merchant webhook for {original_username} to ...{self.merchant_webhook_url[-10:]}")
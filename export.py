@@ -0,0 +1,171 @@
+"""Export of the biome and merchant event history to CSV or Parquet.
+
+Rows are read from history.db in chunks and written as they arrive, so memory
+stays flat however large the history is. Parquet needs pyarrow
+(`pip install pyarrow`); CSV works everywhere. The output is written to a
+temporary file next to the destination and renamed into place when complete.
+
+    python export.py history.csv --since 7d --account MyAlt
+    python export.py history.parquet --since 2026-10-01 --until 2026-10-08 --event-type biome_start
+"""
+import argparse
+import csv
+import importlib.util
+import os
+import re
+import time
+from datetime import datetime, timezone
+from itertools import islice
+
+import utils
+from history import EventStore, HISTORY_DB_FILENAME, EVENT_BIOME_START, EVENT_BIOME_END, EVENT_MERCHANT
+from utils import error_logging
+
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_COLUMNS = ("time_utc", "timestamp", "account", "name", "event_type", "log_path", "log_offset")
+EVENT_TYPES = (EVENT_BIOME_START, EVENT_BIOME_END, EVENT_MERCHANT)
+_RELATIVE_TIME_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_RELATIVE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+def parquet_available():
+    """Whether pyarrow is installed. It is only imported for a Parquet export; most users never export."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+def parse_time(value, now=None):
+    """Unix time for a CLI time argument: a Unix timestamp, an ISO date/datetime (UTC
+    unless it has an offset) or a duration before now such as 90m, 24h or 7d."""
+    if value is None or value == "":
+        return None
+    value = value.strip()
+    match = _RELATIVE_TIME_RE.match(value)
+    if match:
+        return (time.time() if now is None else now) - float(match.group(1)) * _RELATIVE_UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def format_for_path(path, fmt=None):
+    """The export format: `fmt` if given, else from the file extension (CSV unless .parquet/.pq)."""
+    if fmt:
+        return fmt
+    return "parquet" if os.path.splitext(path)[1].lower() in (".parquet", ".pq") else "csv"
+
+def _chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _export_rows(chunk):
+    for timestamp, account, name, event_type, log_path, log_offset in chunk:
+        time_utc = datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        yield (time_utc, timestamp, account, name, event_type, log_path, log_offset)
+
+def _write_csv(chunks, out_path, progress):
+    written = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(_export_rows(chunk))
+            written += len(chunk)
+            if progress: progress(written)
+    return written
+
+def _write_parquet(chunks, out_path, progress):
+    import pyarrow
+    import pyarrow.parquet
+    schema = pyarrow.schema([
+        ("time_utc", pyarrow.timestamp("ms", tz="UTC")),
+        ("timestamp", pyarrow.float64()),
+        ("account", pyarrow.string()),
+        ("name", pyarrow.string()),
+        ("event_type", pyarrow.string()),
+        ("log_path", pyarrow.string()),
+        ("log_offset", pyarrow.int64()),
+    ])
+    written = 0
+    with pyarrow.parquet.ParquetWriter(out_path, schema) as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            arrays = [pyarrow.array([int(t * 1000) for t in columns[0]], pyarrow.int64()).cast(schema.field("time_utc").type)]
+            arrays += [pyarrow.array(column, field.type) for column, field in zip(columns, list(schema)[1:])]
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+            written += len(chunk)
+            if progress: progress(written)
+    return written
+
+def export_events(store, out_path, fmt=None, account=None, since=None, until=None, event_types=None,
+                  chunk_size=EXPORT_CHUNK_ROWS, progress=None):
+    """Writes the matching history events to `out_path` oldest first and returns the number of rows.
+
+    `store` is an EventStore or the path of a history database. `account` is one
+    account or a list; `since`/`until` are Unix times (`until` exclusive).
+    `progress(rows_written)` is called after each chunk.
+    """
+    fmt = format_for_path(out_path, fmt)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of: {', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+    if not isinstance(store, EventStore):
+        if not os.path.exists(store):
+            raise FileNotFoundError(f"No event history at {store}")
+        store = EventStore(store)
+
+    rows = store.iter_events(account=account, event_types=event_types, since=since, until=until, chunk_size=chunk_size)
+    chunks = _chunks(rows, chunk_size)
+    tmp_path = f"{out_path}.tmp"
+    try:
+        writer = _write_parquet if fmt == "parquet" else _write_csv
+        written = writer(chunks, tmp_path, progress)
+        os.replace(tmp_path, out_path)
+        return written
+    finally:
+        rows.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export MultiScope's biome and merchant history to CSV or Parquet.")
+    parser.add_argument("out", help="output file; .parquet/.pq writes Parquet, anything else CSV")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="override the format chosen from the file extension")
+    parser.add_argument("--db", help=f"history database (default: {HISTORY_DB_FILENAME} in the config directory)")
+    parser.add_argument("--config-dir", help="MultiScope config directory (default: AppData/MultiScope)")
+    parser.add_argument("--since", help="start time: ISO date/datetime (UTC), Unix timestamp, or a duration ago such as 24h or 7d")
+    parser.add_argument("--until", help="end time (exclusive), in the same forms as --since")
+    parser.add_argument("--account", action="append", help="only this account (repeat for several)")
+    parser.add_argument("--event-type", action="append", choices=EVENT_TYPES, help="only this event type (repeat for several)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_ROWS, help="rows read and written at a time")
+    args = parser.parse_args(argv)
+
+    if args.config_dir:
+        utils.set_config_dir(args.config_dir)
+    db_path = args.db or os.path.join(utils.CONFIG_DIR, HISTORY_DB_FILENAME)
+    try:
+        since, until = parse_time(args.since), parse_time(args.until)
+    except ValueError as e:
+        parser.error(f"invalid time: {e}")
+
+    started = time.perf_counter()
+    try:
+        written = export_events(db_path, args.out, args.format, args.account, since, until, args.event_type, args.chunk_size)
+    except (FileNotFoundError, RuntimeError, ValueError) as e:
+        print(f"Export failed: {e}")
+        return 1
+    except Exception as e:
+        error_logging(e, f"Error exporting event history to {args.out}")
+        print(f"Export failed: {e}")
+        return 1
+    print(f"Exported {written} events to {args.out} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
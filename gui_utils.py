@@ -0,0 +1,158 @@
+"""Tk helpers shared by the GUI: tooltips and the update download dialog.
+
+Kept apart from utils so detection and the headless service never import Tk.
+"""
+import os
+import tkinter as tk
+import ttkbootstrap as ttk
+from tkinter import filedialog, messagebox
+
+from utils import error_logging, APP_NAME
+
+def download_update(download_url, root_window):
+    """Downloads an update file, showing progress."""
+    import requests
+    try:
+
+        file_name = os.path.basename(download_url)
+        if not file_name or not file_name.endswith(('.exe', '.zip', '.msi')): 
+            file_name = f'{APP_NAME}_Update.exe' 
+
+        save_path = filedialog.asksaveasfilename(
+            defaultextension=".exe", 
+            filetypes=[("Executable files", "*.exe"), ("Zip archives", "*.zip"), ("All files", "*.*")],
+            initialfile=file_name,
+            title="Save MultiScope Update As"
+        )
+
+        if not save_path:
+            print("Update download cancelled by user.")
+            return None 
+
+        print(f"Downloading update to: {save_path}")
+
+        progress_window = ttk.Toplevel(root_window)
+        progress_window.title("Downloading Update")
+        progress_window.geometry("350x150")
+        progress_window.transient(root_window) 
+        progress_window.grab_set() 
+        progress_window.resizable(False, False)
+
+        ttk.Label(progress_window, text="Downloading update...").pack(pady=10)
+        progress_bar = ttk.Progressbar(progress_window, length=300, mode='determinate')
+        progress_bar.pack(pady=10)
+        size_label = ttk.Label(progress_window, text="0 MB / 0 MB (0%)")
+        size_label.pack(pady=5)
+        progress_window.update_idletasks() 
+
+        response = requests.get(download_url, stream=True, timeout=30) 
+        response.raise_for_status()
+
+        total_size = int(response.headers.get('content-length', 0))
+        downloaded_size = 0
+        block_size = 8192 
+
+        with open(save_path, 'wb') as f:
+            for data in response.iter_content(block_size):
+                f.write(data)
+                downloaded_size += len(data)
+
+                if total_size > 0:
+                    percentage = (downloaded_size / total_size) * 100
+                    progress_bar['value'] = percentage
+                    size_label.config(text=f"{downloaded_size/1024/1024:.1f} MB / {total_size/1024/1024:.1f} MB ({percentage:.1f}%)")
+                else: 
+                     progress_bar['mode'] = 'indeterminate'
+                     progress_bar.start()
+                     size_label.config(text=f"{downloaded_size/1024/1024:.1f} MB downloaded")
+
+                progress_window.update() 
+
+        progress_window.destroy()
+        print("Update downloaded successfully.")
+        return save_path 
+
+    except requests.exceptions.RequestException as e:
+        messagebox.showerror("Download Failed", f"Failed to download update: {str(e)}", parent=root_window)
+        error_logging(e, "Failed to download update")
+        if 'progress_window' in locals() and progress_window.winfo_exists(): progress_window.destroy()
+        return None
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred during download: {str(e)}", parent=root_window)
+        error_logging(e, "Error downloading update")
+        if 'progress_window' in locals() and progress_window.winfo_exists(): progress_window.destroy()
+        return None
+
+class ToolTip:
+    """
+    Create a tooltip for a given widget.
+    """
+    def __init__(self, widget, text='widget info'):
+        self.widget = widget
+        self.text = text
+        self.tooltip_window = None
+        self.id = None
+        self.x = self.y = 0
+        self.widget.bind("<Enter>", self.enter)
+        self.widget.bind("<Leave>", self.leave)
+        self.widget.bind("<ButtonPress>", self.leave) 
+
+    def enter(self, event=None):
+        self.schedule()
+
+    def leave(self, event=None):
+        self.unschedule()
+        self.hidetip()
+
+    def schedule(self):
+        self.unschedule()
+        self.id = self.widget.after(500, self.showtip) 
+
+    def unschedule(self):
+        id_ = self.id
+        self.id = None
+        if id_:
+            self.widget.after_cancel(id_)
+
+    def showtip(self, event=None):
+        x, y, _, _ = self.widget.bbox("insert") 
+        x += self.widget.winfo_rootx() + 25 
+        y += self.widget.winfo_rooty() + 20
+
+        self.tooltip_window = tk.Toplevel(self.widget)
+
+        self.tooltip_window.wm_overrideredirect(True)
+        self.tooltip_window.wm_geometry(f"+{x}+{y}")
+
+        try:
+            style = ttk.Style.get_instance()
+            bg = style.lookup('Tooltip.TLabel', 'background', default='lightyellow')
+            fg = style.lookup('Tooltip.TLabel', 'foreground', default='black')
+            relief = style.lookup('Tooltip.TLabel', 'relief', default='solid')
+            borderwidth = style.lookup('Tooltip.TLabel', 'borderwidth', default=1)
+            font = style.lookup('Tooltip.TLabel', 'font') 
+
+            label = ttk.Label(self.tooltip_window, text=self.text, justify='left',
+                              background=bg, foreground=fg, relief=relief, borderwidth=borderwidth,
+                              padding=(5, 2), font=font)
+        except: 
+             label = tk.Label(self.tooltip_window, text=self.text, justify='left',
+                             background="#ffffe0", relief='solid', borderwidth=1,
+                             font=("tahoma", "8", "normal"))
+
+        label.pack(ipadx=1)
+
+    def hidetip(self):
+        tw = self.tooltip_window
+        self.tooltip_window = None
+        if tw:
+            tw.destroy()
+
+def create_tooltip(widget, text):
+    """Factory function to easily create tooltips."""
+
+    if not hasattr(widget, "_tooltip_handler"):
+         widget._tooltip_handler = ToolTip(widget, text)
+    else:
+
+         widget._tooltip_handler.text = text
@@ -0,0 +1,90 @@
+"""Headless MultiScope service.
+
+Runs detection, webhooks and persistence without loading Tk, Anti-AFK or global
+hotkeys, so MultiScope can run as a background service on a server.
+
+    python headless.py --config-dir /srv/multiscope --logs-dir /srv/roblox/logs
+    python headless.py --config /etc/multiscope/config.json --verbose
+
+The config file has the same format as the GUI's config.json (set
+"apply_feature_flags_on_startup": false on machines without Roblox). Directories can
+also be set with the MULTISCOPE_CONFIG_DIR and MULTISCOPE_ROBLOX_LOGS_DIR
+environment variables.
+"""
+import argparse
+import multiprocessing
+import signal
+import sys
+import threading
+
+import utils
+
+class HeadlessGuiManager:
+    """Stands in for GuiManager when running without a window."""
+    def __init__(self, app_instance):
+        self.app = app_instance
+        self.root = None
+        self.logs_text = None
+        self.stop_event = threading.Event()
+
+    def setup_gui(self):
+        pass
+
+    def run(self):
+        """Starts detection and blocks until stop() is called (SIGINT/SIGTERM)."""
+        self.app.start_detection()
+        while not self.stop_event.wait(1.0):
+            pass
+
+    def stop(self, *args):
+        self.stop_event.set()
+
+    def update_status(self, text, color=None):
+        print(f"Status: {text}")
+
+    def update_detection_buttons(self):
+        pass
+
+    def update_stats_display(self):
+        pass
+
+    def update_session_timer_display(self):
+        pass
+
+    def show_message_box(self, title, message, msg_type="info"):
+        print(f"[{title}] {message}")
+
+    def ask_yes_no(self, title, question):
+        print(f"[Question] {title}: {question} (Auto-answering No)")
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MultiScope detection as a headless service.")
+    parser.add_argument("--config", help="path to the config file (default: config.json in the config directory)")
+    parser.add_argument("--config-dir", help="directory for config, logs and error logs (default: AppData/MultiScope)")
+    parser.add_argument("--logs-dir", help="Roblox player logs directory (default: config 'roblox_logs_dir' or LocalAppData/Roblox/logs)")
+    parser.add_argument("--verbose", action="store_true", help="print every application log message")
+    args = parser.parse_args(argv)
+
+    if args.config_dir:
+        utils.set_config_dir(args.config_dir)
+    if args.config:
+        utils.set_config_file(args.config)
+    if args.logs_dir:
+        utils.set_roblox_logs_dir(args.logs_dir)
+
+    from app import MultiScopeApp
+
+    print(f"Starting {utils.APP_NAME} headless service (config dir: {utils.CONFIG_DIR})")
+    app = MultiScopeApp(gui_manager_class=HeadlessGuiManager, headless=True, roblox_logs_dir=args.logs_dir)
+    app.echo_logs = args.verbose
+    print(f"Watching Roblox logs in {app.roblox_logs_dir} for {len(app.accounts)} account(s).")
+
+    signal.signal(signal.SIGINT, app.gui_manager.stop)
+    signal.signal(signal.SIGTERM, app.gui_manager.stop)
+    app.run()
+    app.on_close()
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Biome and merchant event history in an embedded SQLite database (history.db).
+
+Detection threads call EventStore.record(), which only puts the event on a
+bounded queue; a single writer thread owns the write connection and inserts
+events in batches. The database runs in WAL mode, so stats views and exports
+read it from their own connections while detection keeps writing.
+
+An event is identified by (account, timestamp, event_type, name), so recording
+the same log line twice (live detection and a later backfill of that log)
+keeps one row.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from utils import error_logging
+
+HISTORY_DB_FILENAME = "history.db"
+HISTORY_BATCH_SIZE = 500
+HISTORY_FLUSH_INTERVAL = 1.0 # Longest an event waits in the queue before being written
+HISTORY_QUEUE_MAX = 10000
+HISTORY_STOP_TIMEOUT = 5.0
+HISTORY_READ_CHUNK = 1000
+HISTORY_SCHEMA_VERSION = 1 # PRAGMA user_version; 0 is a database from before account names were matched case-insensitively
+
+EVENT_BIOME_START = "biome_start"
+EVENT_BIOME_END = "biome_end"
+EVENT_MERCHANT = "merchant"
+
+EVENT_COLUMNS = ("timestamp", "account", "name", "event_type", "log_path", "log_offset")
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY,
+        timestamp REAL NOT NULL,
+        account TEXT NOT NULL,
+        name TEXT NOT NULL,
+        event_type TEXT NOT NULL,
+        log_path TEXT,
+        log_offset INTEGER
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS events_identity ON events (account COLLATE NOCASE, timestamp, event_type, name)",
+    "CREATE INDEX IF NOT EXISTS events_account_time ON events (account COLLATE NOCASE, timestamp)",
+    "CREATE INDEX IF NOT EXISTS events_name_time ON events (name, timestamp)",
+    "CREATE INDEX IF NOT EXISTS events_time ON events (timestamp)",
+)
+
+def create_schema(connection):
+    """Creates the history tables and indexes, upgrading a database written by an older version first."""
+    with connection:
+        connection.execute("BEGIN IMMEDIATE") # Serialises the upgrade with a backfill opening the same database
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        has_events = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events'").fetchone()
+        if version < 1 and has_events:
+            # The identity and account indexes compared account names case-sensitively: keep the
+            # oldest of each event recorded under several spellings, then rebuild the indexes below.
+            connection.execute(
+                "DELETE FROM events WHERE id NOT IN "
+                "(SELECT MIN(id) FROM events GROUP BY account COLLATE NOCASE, timestamp, event_type, name)"
+            )
+            connection.execute("DROP INDEX IF EXISTS events_identity")
+            connection.execute("DROP INDEX IF EXISTS events_account_time")
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute(f"PRAGMA user_version = {HISTORY_SCHEMA_VERSION}")
+
+def connect(db_path):
+    """Opens a connection to the history database with the pragmas every reader and writer uses."""
+    connection = sqlite3.connect(db_path, timeout=10.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+def _where(account=None, name=None, event_types=None, since=None, until=None):
+    """Builds the WHERE clause and parameters shared by the history queries."""
+    clauses, params = [], []
+    if isinstance(account, (list, tuple, set)):
+        clauses.append(f"account COLLATE NOCASE IN ({', '.join('?' for _ in account)})")
+        params.extend(account)
+    elif account:
+        clauses.append("account = ? COLLATE NOCASE")
+        params.append(account)
+    if name:
+        clauses.append("name = ?")
+        params.append(name)
+    if event_types:
+        clauses.append(f"event_type IN ({', '.join('?' for _ in event_types)})")
+        params.extend(event_types)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+class EventStore:
+    """Records detection events from any thread and answers indexed history queries."""
+    def __init__(self, db_path, batch_size=HISTORY_BATCH_SIZE, flush_interval=HISTORY_FLUSH_INTERVAL,
+                 queue_max=HISTORY_QUEUE_MAX):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_max)
+        self.written = 0
+        self.dropped = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Creates the schema and starts the writer thread."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        connection = connect(self.db_path)
+        try:
+            create_schema(connection)
+        finally:
+            connection.close()
+        self._thread = threading.Thread(target=self._write_forever, name="HistoryWriter", daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, timestamp, account, name, event_type, log_path=None, log_offset=None):
+        """Queues an event for writing. Never blocks; events are dropped (and counted) if the writer falls behind."""
+        try:
+            self.queue.put_nowait((timestamp, account, name, event_type, log_path, log_offset))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=HISTORY_STOP_TIMEOUT):
+        """Waits until every event queued so far is written (or `timeout` passes)."""
+        flushed = threading.Event()
+        try:
+            self.queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return False
+        return flushed.wait(timeout)
+
+    def close(self, timeout=HISTORY_STOP_TIMEOUT):
+        """Writes what is queued and stops the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _write_forever(self):
+        try:
+            connection = connect(self.db_path)
+        except sqlite3.Error as e:
+            error_logging(e, f"Error opening event history {self.db_path}")
+            return
+        try:
+            while not (self._stop.is_set() and self.queue.empty()):
+                batch, waiters = self._next_batch()
+                if batch:
+                    self._insert(connection, batch)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
+
+    def _next_batch(self):
+        """Collects up to batch_size events, waiting at most flush_interval after the first one."""
+        batch, waiters = [], []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = self.flush_interval if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                break # Write what we have now so flush() returns promptly
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch, waiters
+
+    def _insert(self, connection, batch):
+        try:
+            with connection:
+                cursor = connection.executemany(
+                    f"INSERT OR IGNORE INTO events ({', '.join(EVENT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+            self.written += max(cursor.rowcount, 0)
+        except sqlite3.Error as e:
+            error_logging(e, f"Error writing {len(batch)} events to history")
+
+    def iter_events(self, account=None, name=None, event_types=None, since=None, until=None, chunk_size=HISTORY_READ_CHUNK):
+        """Yields event rows (EVENT_COLUMNS order) oldest first, fetching `chunk_size` rows at a time.
+
+        `account` is one account or a list of them; times are Unix timestamps, `until` exclusive.
+        """
+        where, params = _where(account, name, event_types, since, until)
+        connection = connect(self.db_path)
+        try:
+            cursor = connection.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM events{where} ORDER BY timestamp, id", params
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            connection.close()
+
+    def count_by_name(self, account=None, event_types=(EVENT_BIOME_START,), since=None, until=None):
+        """{name: events} for the matching events, e.g. biome starts per biome for one account."""
+        where, params = _where(account, None, event_types, since, until)
+        connection = connect(self.db_path)
+        try:
+            return dict(connection.execute(f"SELECT name, COUNT(*) FROM events{where} GROUP BY name", params).fetchall())
+        finally:
+            connection.close()
@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Pipeline stages in the order an event passes through them. "log" is the time
+# Roblox wrote the line (parsed from its ISO prefix), the rest are wall-clock
+# times recorded by MultiScope as the event moves towards Discord.
+LATENCY_STAGES = ("log", "read", "parsed", "decided", "enqueued", "sent", "acked")
+LATENCY_TOTAL_KEY = "total"
+LATENCY_MAX_SAMPLES = 1000
+LATENCY_PERCENTILES = (50, 95, 99)
+LATENCY_STATS_FILENAME = "latency_stats.json"
+
+def parse_log_line_timestamp(content, index):
+    """Returns the epoch time of the Roblox log line containing `index` (in text or a bytes buffer), or None.
+
+    Roblox prefixes every line with an ISO-8601 UTC timestamp such as
+    `2025-11-29T12:34:56.789Z,`.
+    """
+    try:
+        line_start = content.rfind("\n" if isinstance(content, str) else b"\n", 0, index) + 1
+        stamp = content[line_start:line_start + 24]
+        if not isinstance(stamp, str):
+            stamp = stamp.decode("ascii", errors="ignore")
+        if len(stamp) < 20 or stamp[4] != "-" or stamp[10] != "T":
+            return None
+        stamp = stamp.split(",", 1)[0].replace("Z", "+00:00")
+        return datetime.fromisoformat(stamp).timestamp()
+    except (ValueError, TypeError):
+        return None
+
+class LatencyTrace:
+    """Timestamps of a single detection event as it moves through the pipeline."""
+    __slots__ = ("username", "stamps", "_time")
+
+    def __init__(self, username, log_time=None, time_func=time.time):
+        self.username = username
+        self.stamps = {}
+        self._time = time_func
+        if log_time is not None:
+            self.stamps["log"] = log_time
+
+    def mark(self, stage, timestamp=None):
+        self.stamps[stage] = self._time() if timestamp is None else timestamp
+        return self
+
+    def copy(self):
+        trace = LatencyTrace(self.username, time_func=self._time)
+        trace.stamps = dict(self.stamps)
+        return trace
+
+class LatencyTracker:
+    """Aggregates completed traces into per-stage and per-account latency samples.
+
+    Each stage sample is the time spent getting from the previous recorded stage
+    to that one, so the stage percentiles show where the seconds go. The `total`
+    key is the end-to-end time from the first to the last recorded stage.
+    """
+    def __init__(self, max_samples=LATENCY_MAX_SAMPLES, clock=None):
+        self.max_samples = max_samples
+        self._time = clock.time if clock else time.time
+        self._lock = threading.Lock()
+        self._stage_samples = {}
+        self._account_samples = {}
+        self.recorded_traces = 0
+
+    def start_trace(self, username, log_time=None):
+        return LatencyTrace(username, log_time, self._time)
+
+    def record(self, trace):
+        """Adds the stage deltas of a trace to the histograms."""
+        if trace is None:
+            return
+        stamps = [(stage, trace.stamps[stage]) for stage in LATENCY_STAGES if stage in trace.stamps]
+        if len(stamps) < 2:
+            return
+        deltas = []
+        for (_, previous_time), (stage, stage_time) in zip(stamps, stamps[1:]):
+            deltas.append((stage, max(0.0, stage_time - previous_time)))
+        deltas.append((LATENCY_TOTAL_KEY, max(0.0, stamps[-1][1] - stamps[0][1])))
+
+        with self._lock:
+            account_samples = self._account_samples.setdefault(trace.username.lower(), {})
+            for stage, delta in deltas:
+                self._sample_deque(self._stage_samples, stage).append(delta)
+                self._sample_deque(account_samples, stage).append(delta)
+            self.recorded_traces += 1
+
+    def _sample_deque(self, samples_by_stage, stage):
+        samples = samples_by_stage.get(stage)
+        if samples is None:
+            samples = samples_by_stage[stage] = deque(maxlen=self.max_samples)
+        return samples
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        result = {"count": len(ordered)}
+        for pct in LATENCY_PERCENTILES:
+            rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+            result[f"p{pct}"] = ordered[rank]
+        return result
+
+    def stage_percentiles(self):
+        """Returns {stage: {"count", "p50", "p95", "p99"}} for every stage with samples."""
+        with self._lock:
+            snapshot = {stage: list(samples) for stage, samples in self._stage_samples.items()}
+        return self._ordered_summary(snapshot)
+
+    def account_percentiles(self):
+        """Returns {username: {stage: {"count", "p50", "p95", "p99"}}}."""
+        with self._lock:
+            snapshot = {
+                username: {stage: list(samples) for stage, samples in stages.items()}
+                for username, stages in self._account_samples.items()
+            }
+        return {username: self._ordered_summary(stages) for username, stages in snapshot.items()}
+
+    def _ordered_summary(self, samples_by_stage):
+        summary = {}
+        for stage in LATENCY_STAGES[1:] + (LATENCY_TOTAL_KEY,):
+            stats = self._percentiles(samples_by_stage.get(stage))
+            if stats:
+                summary[stage] = stats
+        return summary
+
+    def summary(self):
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "recorded_traces": self.recorded_traces,
+            "stages": self.stage_percentiles(),
+            "accounts": self.account_percentiles(),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stage_samples = {}
+            self._account_samples = {}
+            self.recorded_traces = 0
@@ -0,0 +1,61 @@
+"""Per-account client liveness, derived from the log mtimes the poll scheduler already has.
+
+A Roblox client writes to its player log constantly while it's in game, so a
+log that hasn't changed for STALE_LOG_THRESHOLD seconds means the client froze,
+disconnected or was closed. Nothing here touches the filesystem.
+"""
+import threading
+import time
+
+from polling import STALE_LOG_THRESHOLD
+
+LIVENESS_UNKNOWN = "unknown" # No log seen for the account yet
+LIVENESS_ALIVE = "alive"
+LIVENESS_STALE = "stale"
+LIVENESS_CHECK_INTERVAL = 5.0
+
+class LivenessTracker:
+    """Tracks when each account's log last changed and reports alive/stale transitions."""
+    def __init__(self, stale_after=STALE_LOG_THRESHOLD):
+        self.stale_after = stale_after
+        self.last_activity = {}
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def observe(self, username, mtime):
+        """Records a log change for the account (`mtime` is the log's wall-clock mtime)."""
+        if mtime is None:
+            return
+        with self._lock:
+            if mtime > self.last_activity.get(username, 0):
+                self.last_activity[username] = mtime
+
+    def _state(self, username, now):
+        last = self.last_activity.get(username)
+        if last is None:
+            return LIVENESS_UNKNOWN, None
+        idle = max(0.0, now - last)
+        return (LIVENESS_STALE if idle >= self.stale_after else LIVENESS_ALIVE), idle
+
+    def evaluate(self, usernames, now=None):
+        """Updates the state of each account. Returns [(username, old_state, new_state, idle_seconds)] for changes."""
+        now = time.time() if now is None else now
+        changes = []
+        with self._lock:
+            for username in list(self.states):
+                if username not in usernames:
+                    del self.states[username]
+                    self.last_activity.pop(username, None)
+            for username in usernames:
+                state, idle = self._state(username, now)
+                old_state = self.states.get(username, LIVENESS_UNKNOWN)
+                self.states[username] = state
+                if state != old_state:
+                    changes.append((username, old_state, state, idle))
+        return changes
+
+    def status(self, now=None):
+        """{username: (state, idle_seconds or None)} as of the last evaluate(), for display."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return {username: (state, self._state(username, now)[1]) for username, state in self.states.items()}
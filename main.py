@@ -5,12 +5,14 @@ import os
 import tkinter as tk
 import ttkbootstrap as ttk
 from tkinter import messagebox, filedialog
-from PIL import Image, ImageTk 
-import webbrowser
 from datetime import datetime, timezone
 import ctypes 
+import multiprocessing
 
-from utils import create_tooltip, error_logging 
+from utils import error_logging
+from gui_utils import create_tooltip
+from stats import STATS_RARE_BIOME, format_duration
+from export import parse_time, parquet_available
 
 APP_NAME = "MultiScope"
 APP_VERSION = "0.9.9.1-Stable"
@@ -35,6 +37,11 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def open_url(url):
+    """Opens a link in the default browser. webbrowser is only imported on first click."""
+    import webbrowser
+    webbrowser.open(url)
+
 class GuiManager:
     def __init__(self, app_instance):
         """Initialize the GUI Manager.
@@ -369,6 +376,36 @@ class GuiManager:
         self.session_label = ttk.Label(left_frame, text="Running Session: 00:00:00"); self.session_label.pack(fill="x", pady=5)
         self.update_stats_display()
 
+        rolling_container = ttk.LabelFrame(left_frame, text="Recent Activity"); rolling_container.pack(fill="x", pady=(5, 5))
+        self.rolling_stats_tree = ttk.Treeview(rolling_container, columns=("1h", "24h", "avg"), height=5)
+        self.rolling_stats_tree.heading("#0", text="Biome / Account"); self.rolling_stats_tree.column("#0", width=110, stretch=True)
+        for col, heading in (("1h", "1h"), ("24h", "24h"), ("avg", "Avg / Now")):
+            self.rolling_stats_tree.heading(col, text=heading); self.rolling_stats_tree.column(col, width=70 if col == "avg" else 40, anchor="e", stretch=False)
+        self.rolling_stats_tree.pack(fill="x", padx=5, pady=(5, 0))
+        create_tooltip(self.rolling_stats_tree, "Biomes started in the last hour and day, with the average length of those that ended. Account rows count every biome and show the account's current biome.")
+        self.rare_biome_label = ttk.Label(rolling_container, text=f"Last {STATS_RARE_BIOME}: -"); self.rare_biome_label.pack(fill="x", padx=5, pady=(2, 0))
+        ttk.Button(rolling_container, text="Export History", command=self.open_history_export, style="info.TButton").pack(fill="x", padx=5, pady=5)
+        self.update_rolling_stats_display()
+
+        liveness_container = ttk.LabelFrame(left_frame, text="Client Status"); liveness_container.pack(fill="x", pady=(5, 5))
+        self.liveness_tree = ttk.Treeview(liveness_container, columns=("status", "idle"), height=4)
+        self.liveness_tree.heading("#0", text="Account"); self.liveness_tree.column("#0", width=110, stretch=True)
+        self.liveness_tree.heading("status", text="Status"); self.liveness_tree.column("status", width=60, anchor="center", stretch=False)
+        self.liveness_tree.heading("idle", text="Last Log"); self.liveness_tree.column("idle", width=70, anchor="e", stretch=False)
+        self.liveness_tree.tag_configure("stale", foreground="#FF5555"); self.liveness_tree.tag_configure("alive", foreground="#55FF55")
+        self.liveness_tree.pack(fill="x", padx=5, pady=5)
+        create_tooltip(self.liveness_tree, "An account is stale when its Roblox log hasn't changed for 5 minutes, which usually means the client froze or disconnected.")
+        self.update_liveness_display()
+
+        latency_container = ttk.LabelFrame(left_frame, text="Detection Latency (s)"); latency_container.pack(fill="both", expand=True, pady=(5, 0))
+        self.latency_tree = ttk.Treeview(latency_container, columns=("p50", "p95", "p99"), height=8)
+        self.latency_tree.heading("#0", text="Stage / Account"); self.latency_tree.column("#0", width=110, stretch=True)
+        for col in ("p50", "p95", "p99"):
+            self.latency_tree.heading(col, text=col); self.latency_tree.column(col, width=50, anchor="e", stretch=False)
+        self.latency_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        create_tooltip(self.latency_tree, "Time spent in each stage from the Roblox log line to Discord acknowledging the webhook. Account rows show the end-to-end total.")
+        self.update_latency_display()
+
         logs_container = ttk.LabelFrame(right_frame, text="Application Logs"); logs_container.pack(fill="both", expand=True)
         search_entry = ttk.Entry(logs_container); search_entry.pack(fill="x", padx=5, pady=(5, 0)); search_entry.insert(0, "Filter logs...")
         search_entry.bind("<FocusIn>", lambda e: e.widget.delete(0, tk.END) if e.widget.get() == "Filter logs..." else None)
@@ -389,6 +426,44 @@ class GuiManager:
             if label.winfo_exists(): label.config(text=str(self.app.biome_counts.get(biome, 0)))
         if self.total_biomes_label and self.total_biomes_label.winfo_exists(): self.total_biomes_label.config(text=f"Total Biomes Found: {total_biomes}")
 
+    def update_rolling_stats_display(self):
+        """Refreshes the 1h/24h activity table from the app's rolling stats."""
+        tree = getattr(self, 'rolling_stats_tree', None)
+        if not tree or not tree.winfo_exists(): return
+        stats = getattr(self.app, 'stats', None)
+        if not stats: return
+        tree.delete(*tree.get_children())
+        for biome, biome_stats in sorted(stats.biome_summary().items(), key=lambda item: -item[1]["24h"]):
+            if biome_stats["24h"]: tree.insert("", "end", text=biome, values=(biome_stats["1h"], biome_stats["24h"], format_duration(biome_stats["avg_seconds"])))
+        for username, account_stats in sorted(stats.account_summary().items()):
+            tree.insert("", "end", text=username, values=(account_stats["1h"], account_stats["24h"], account_stats["biome"] or "-"))
+        since = stats.seconds_since(STATS_RARE_BIOME)
+        self.rare_biome_label.config(text=f"Last {STATS_RARE_BIOME}: {'-' if since is None else format_duration(since) + ' ago'}")
+
+    def update_latency_display(self):
+        """Refreshes the latency percentiles table from the detection manager's tracker."""
+        tree = getattr(self, 'latency_tree', None)
+        if not tree or not tree.winfo_exists(): return
+        tracker = getattr(getattr(self.app, 'detection_manager', None), 'latency', None)
+        if not tracker: return
+        fmt = lambda stats: tuple(f"{stats[f'p{p}']:.2f}" for p in (50, 95, 99))
+        tree.delete(*tree.get_children())
+        for stage, stats in tracker.stage_percentiles().items():
+            tree.insert("", "end", text=stage, values=fmt(stats))
+        for username, stages in sorted(tracker.account_percentiles().items()):
+            if "total" in stages: tree.insert("", "end", text=f"{username} (total)", values=fmt(stages["total"]))
+
+    def update_liveness_display(self):
+        """Refreshes the client status table from the detection manager's liveness tracker."""
+        tree = getattr(self, 'liveness_tree', None)
+        if not tree or not tree.winfo_exists(): return
+        tracker = getattr(getattr(self.app, 'detection_manager', None), 'liveness', None)
+        if not tracker: return
+        tree.delete(*tree.get_children())
+        for username, (state, idle) in sorted(tracker.status().items()):
+            idle_text = "-" if idle is None else (f"{int(idle)}s ago" if idle < 120 else f"{int(idle // 60)}m ago")
+            tree.insert("", "end", text=username, values=(state.capitalize(), idle_text), tags=(state,))
+
     def update_session_timer_display(self):
         """Updates the session timer label specifically."""
         if self.session_label and self.session_label.winfo_exists(): self.session_label.config(text=f"Running Session: {self.app.get_formatted_session_time()}")
@@ -435,11 +510,11 @@ class GuiManager:
 
         support_frame = ttk.LabelFrame(frame, text="Support & Links", padding=10); support_frame.pack(fill="x", pady=10)
         dc_label = ttk.Label(support_frame, text="Discord Server: Join Here", cursor="hand2", foreground="#007bff")
-        dc_label.pack(anchor="w", padx=10, pady=5); dc_label.bind("<Button-1>", lambda e: webbrowser.open("https://discord.gg/6cuCu6ymkX")); create_tooltip(dc_label, "Join Discord")
+        dc_label.pack(anchor="w", padx=10, pady=5); dc_label.bind("<Button-1>", lambda e: open_url("https://discord.gg/6cuCu6ymkX")); create_tooltip(dc_label, "Join Discord")
         gh_label = ttk.Label(support_frame, text="GitHub Repository: View Source", cursor="hand2", foreground="#007bff")
-        gh_label.pack(anchor="w", padx=10, pady=5); gh_label.bind("<Button-1>", lambda e: webbrowser.open("https://github.com/cresqnt-sys/MultiScope")); create_tooltip(gh_label, "View Source")
+        gh_label.pack(anchor="w", padx=10, pady=5); gh_label.bind("<Button-1>", lambda e: open_url("https://github.com/cresqnt-sys/MultiScope")); create_tooltip(gh_label, "View Source")
         scope_dev_label = ttk.Label(support_frame, text="Scope Development Website: scopedevelopment.tech", cursor="hand2", foreground="#007bff")
-        scope_dev_label.pack(anchor="w", padx=10, pady=5); scope_dev_label.bind("<Button-1>", lambda e: webbrowser.open("https://scopedevelopment.tech")); create_tooltip(scope_dev_label, "Visit Scope Development")
+        scope_dev_label.pack(anchor="w", padx=10, pady=5); scope_dev_label.bind("<Button-1>", lambda e: open_url("https://scopedevelopment.tech")); create_tooltip(scope_dev_label, "Visit Scope Development")
         ttk.Label(frame, text="© 2024-2025 cresqnt. All rights reserved.").pack(side="bottom", pady=(10, 5), anchor='s')
 
     def show_message_box(self, title, message, msg_type="info"):
@@ -454,6 +529,36 @@ class GuiManager:
          if self.root: return messagebox.askyesno(title, question, parent=self.root)
          else: print(f"[Question] {title}: {question} (Auto-answering No)"); return False
 
+    def open_history_export(self):
+        """Opens the history export window: account and time range, then where to save the CSV/Parquet file."""
+        if not getattr(self.app, 'history', None):
+            self.show_message_box("Export History", "Event history is turned off (history_enabled in config.json).", "warning"); return
+        win = ttk.Toplevel(self.root); win.title("Export History"); win.transient(self.root); win.grab_set(); win.resizable(False, False)
+        form = ttk.Frame(win, padding=10); form.pack(fill="both", expand=True)
+        all_accounts = "All accounts"; accounts = [all_accounts] + sorted(acc.get("username") for acc in self.app.accounts if acc.get("username"))
+        ranges = {"All time": None, "Last 24 hours": "24h", "Last 7 days": "7d", "Last 30 days": "30d"}
+        account_var = tk.StringVar(value=all_accounts); range_var = tk.StringVar(value="Last 7 days")
+        ttk.Label(form, text="Account:").grid(row=0, column=0, sticky="w", padx=(0, 5), pady=2)
+        ttk.Combobox(form, textvariable=account_var, values=accounts, state="readonly", width=24).grid(row=0, column=1, sticky="ew", pady=2)
+        ttk.Label(form, text="Time range:").grid(row=1, column=0, sticky="w", padx=(0, 5), pady=2)
+        ttk.Combobox(form, textvariable=range_var, values=list(ranges), state="readonly", width=24).grid(row=1, column=1, sticky="ew", pady=2)
+        if not parquet_available(): ttk.Label(form, text="Install pyarrow to export Parquet.", foreground="gray").grid(row=2, column=0, columnspan=2, sticky="w", pady=(5, 0))
+        def on_done(rows, error):
+            if error: self.show_message_box("Export Failed", f"Could not export history: {error}", "error")
+            else: self.show_message_box("Export History", f"Exported {rows} events.", "info")
+        def export():
+            filetypes = [("CSV", "*.csv")] + ([("Parquet", "*.parquet")] if parquet_available() else [])
+            path = filedialog.asksaveasfilename(parent=win, title="Export History", defaultextension=".csv", filetypes=filetypes,
+                                                initialfile=f"multiscope_history_{datetime.now().strftime('%Y%m%d')}.csv")
+            if not path: return
+            account = None if account_var.get() == all_accounts else account_var.get()
+            since = parse_time(ranges[range_var.get()])
+            win.destroy()
+            self.app.export_history_in_background(path, account, since, on_complete=on_done)
+        bf = ttk.Frame(win, padding=(10, 0, 10, 10)); bf.pack(fill='x')
+        ttk.Button(bf, text="Export...", command=export, style="success.TButton", width=10).pack(side='right', padx=5)
+        ttk.Button(bf, text="Cancel", command=win.destroy, style="danger.TButton", width=10).pack(side='right', padx=5)
+
     def open_biome_notification_settings(self):
         """Opens the window to configure biome notification settings."""
         win = ttk.Toplevel(self.root); win.title("Biome Notification Settings"); win.geometry("400x450"); win.transient(self.root); win.grab_set(); win.resizable(False, False)
@@ -492,6 +597,7 @@ class GuiManager:
                     ns[biome_name] = False
             self.app.config["biome_notification_enabled"] = ns
             self.app.config_changed = True
+            self.app.reload_detection_settings()
             win.destroy()
             self.show_message_box("Success", "Settings saved!", "info")
         # Get biomes that aren't force_notify or never_notify for select all/none
@@ -912,6 +1018,7 @@ try:
     from app import MultiScopeApp 
 
     if __name__ == "__main__":
+        multiprocessing.freeze_support() # Sharded detection workers in the packaged exe
         print(f"Starting {APP_NAME} v{APP_VERSION}...")
         try:
 
@@ -928,7 +1035,7 @@ except ImportError as e:
     print(f"Failed to import necessary modules: {e}")
     traceback.print_exc()
     print("---------------------")
-    print("Please ensure all required files (main.py, app.py, detection.py, utils.py, antiafk.py [optional]) are present.")
+    print("Please ensure all required files (main.py, app.py, detection.py, utils.py, gui_utils.py, antiafk.py [optional]) are present.")
     input("Import error occurred. Press Enter to exit.")
 
 except Exception as e:
@@ -0,0 +1,170 @@
+import threading
+
+from utils import error_logging
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9464
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class MetricsRegistry:
+    """Thread-safe counters and gauges rendered in the Prometheus text format.
+
+    Updates are a dict lookup and an addition under a lock so they can be called
+    from the detection threads on every cycle. Gauges that are expensive or only
+    meaningful at read time (RSS, thread count) are registered as callbacks and
+    evaluated when the endpoint is scraped.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}  # name -> [type, help]
+        self._values = {}   # (name, labels) -> value
+        self._callbacks = {}  # name -> callable returning a number
+
+    def describe(self, name, metric_type, help_text):
+        with self._lock:
+            self._metrics.setdefault(name, [metric_type, help_text])
+
+    def inc(self, name, amount=1, labels=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name, value, labels=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, name, labels=None):
+        with self._lock:
+            return self._values.get((name, _label_key(labels)), 0)
+
+    def gauge_callback(self, name, help_text, func):
+        """Registers a gauge whose value is computed by `func()` at scrape time.
+
+        `func` returns a number, or a list of (labels, value) for a labelled gauge.
+        """
+        self.describe(name, "gauge", help_text)
+        with self._lock:
+            self._callbacks[name] = func
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+
+        for name, func in callbacks.items():
+            try:
+                value = func()
+                if isinstance(value, list):
+                    for labels, labelled_value in value:
+                        values[(name, _label_key(labels))] = labelled_value
+                else:
+                    values[(name, ())] = value
+            except Exception as e:
+                error_logging(e, f"Error computing metric {name}")
+
+        by_name = {}
+        for (name, labels), value in values.items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = metrics.get(name, ["untyped", ""])
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(by_name[name]):
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+def hit_ratio(hits, misses):
+    """hits / (hits + misses), or 0 before the first lookup."""
+    total = hits + misses
+    return round(hits / total, 4) if total else 0.0
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe("multiscope_detection_cycles_total", "counter", "Detection cycles completed.")
+REGISTRY.describe("multiscope_detection_cycle_seconds", "gauge", "Duration of the last detection cycle.")
+REGISTRY.describe("multiscope_detection_cycle_seconds_total", "counter", "Total time spent in detection cycles.")
+REGISTRY.describe("multiscope_accounts_scanned", "gauge", "Accounts scanned in the last detection cycle.")
+REGISTRY.describe("multiscope_accounts_scanned_total", "counter", "Account log checks performed.")
+REGISTRY.describe("multiscope_cycle_bytes_read", "gauge", "Log bytes read in the last detection cycle.")
+REGISTRY.describe("multiscope_log_stat_checks_total", "counter", "Account log stat() checks made by the adaptive poller.")
+REGISTRY.describe("multiscope_log_reads_total", "counter", "Account log tail reads (the log changed since its last check).")
+REGISTRY.describe("multiscope_log_bytes_read_total", "counter", "Log bytes read since startup.")
+REGISTRY.describe("multiscope_rpc_parse_failures_total", "counter", "BloxstrapRPC messages that could not be parsed.")
+REGISTRY.describe("multiscope_rpc_memo_hits_total", "counter", "RPC records skipped because they were the account's last handled record.")
+REGISTRY.describe("multiscope_rpc_memo_misses_total", "counter", "RPC records parsed and run through the notification policy.")
+REGISTRY.describe("multiscope_webhook_sends_total", "counter", "Webhooks delivered successfully, by kind.")
+REGISTRY.describe("multiscope_webhook_failures_total", "counter", "Webhook deliveries that failed, by kind.")
+REGISTRY.describe("multiscope_webhook_rate_limited_total", "counter", "HTTP 429 responses received from Discord.")
+REGISTRY.describe("multiscope_webhook_queue_depth", "gauge", "Webhook notifications waiting to be delivered.")
+REGISTRY.describe("multiscope_accounts_stale", "gauge", "Accounts whose log has not changed for STALE_LOG_THRESHOLD seconds.")
+REGISTRY.describe("multiscope_detection_shards", "gauge", "Worker processes running the sharded detection engine.")
+
+def _make_request_handler(registry):
+    # http.server is only imported when the exporter is enabled; detection imports this module on every start.
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Scrapes every few seconds would flood the console
+
+    return MetricsRequestHandler
+
+class MetricsServer:
+    """Serves a MetricsRegistry on a local HTTP endpoint from a daemon thread."""
+    def __init__(self, registry=REGISTRY, host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_request_handler(self.registry))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        print(f"Metrics exporter listening on http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def start_metrics_server(config, registry=REGISTRY):
+    """Starts the exporter if `metrics_exporter_enabled` is set in the config. Returns the server or None."""
+    if not config.get("metrics_exporter_enabled", False):
+        return None
+    try:
+        return MetricsServer(
+            registry,
+            host=config.get("metrics_exporter_host", DEFAULT_METRICS_HOST),
+            port=int(config.get("metrics_exporter_port", DEFAULT_METRICS_PORT))
+        ).start()
+    except Exception as e:
+        error_logging(e, "Failed to start metrics exporter")
+        return None
@@ -0,0 +1,97 @@
+"""Adaptive per-account polling for the detection engines.
+
+Every account's log is stat()ed each POLL_MIN_INTERVAL, which costs next to
+nothing, so a change is noticed within one interval however long the log was
+quiet. Only a change in size or mtime (or a new log file for the account) makes
+the engine read and parse the log tail, so reads follow actual activity and
+closed or idle clients cost almost no I/O. Accounts without a log file have
+nothing to stat and back off exponentially until one appears.
+"""
+import os
+import time
+
+POLL_MIN_INTERVAL = 0.5
+POLL_BACKOFF_FACTOR = 2.0
+POLL_NO_LOG_MAX_INTERVAL = 30.0 # No log file found for the account
+STALE_LOG_THRESHOLD = 300 # Client considered frozen or closed (see liveness.py)
+
+class AdaptivePollScheduler:
+    """Decides which accounts are due for a check and whether their log changed.
+
+    `clock` drives the schedule (the virtual clock in replays).
+    """
+    def __init__(self, clock=None, min_interval=POLL_MIN_INTERVAL):
+        self.clock = clock
+        self.min_interval = min_interval
+        self.accounts = {}
+        self.stat_checks = 0
+        self.wakes = 0
+
+    def _now(self):
+        return self.clock.time() if self.clock else time.time()
+
+    def due(self, accounts):
+        """Returns the accounts from `accounts` ({username: log_path or None}) whose check is due.
+
+        An account whose log path changed since its last check is always due.
+        """
+        now = self._now()
+        due = []
+        for username, log_path in accounts.items():
+            state = self.accounts.get(username)
+            if state is None or state["path"] != log_path or now >= state["next"]:
+                due.append(username)
+        return due
+
+    def check(self, username, log_path):
+        """Stats the account's log and reschedules it. Returns True if the log changed and must be read."""
+        now = self._now()
+        state = self.accounts.get(username)
+        if state is None or state["path"] != log_path:
+            state = {"path": log_path, "size": -1, "mtime_ns": None, "interval": self.min_interval, "next": now}
+            self.accounts[username] = state
+
+        st = None
+        if log_path:
+            self.stat_checks += 1
+            try:
+                st = os.stat(log_path)
+            except OSError:
+                pass
+
+        if st is None:
+            state["interval"] = min(state["interval"] * POLL_BACKOFF_FACTOR, POLL_NO_LOG_MAX_INTERVAL)
+            state["next"] = now + state["interval"]
+            return False
+
+        state["interval"] = self.min_interval
+        state["next"] = now + state["interval"]
+        if st.st_size != state["size"] or st.st_mtime_ns != state["mtime_ns"]:
+            state["size"] = st.st_size
+            state["mtime_ns"] = st.st_mtime_ns
+            self.wakes += 1
+            return True
+        return False
+
+    def last_mtime(self, username):
+        """Wall-clock mtime of the account's log as of its last check, or None."""
+        state = self.accounts.get(username)
+        if state is None or state["mtime_ns"] is None:
+            return None
+        return state["mtime_ns"] / 1e9
+
+    def forget(self, keep):
+        """Drops schedules for accounts not in `keep`."""
+        for username in list(self.accounts):
+            if username not in keep:
+                del self.accounts[username]
+
+    def reset(self):
+        """Makes every account due and re-read on its next check."""
+        self.accounts = {}
+
+    def next_due_in(self):
+        """Seconds until the next scheduled account is due (0 if one is already due)."""
+        if not self.accounts:
+            return self.min_interval
+        return max(0.0, min(state["next"] for state in self.accounts.values()) - self._now())
@@ -0,0 +1,256 @@
+"""Deterministic accelerated replay of recorded Roblox logs.
+
+Feeds a directory of captured player logs through DetectionManager on a virtual
+clock, writing each line into a scratch logs directory once the clock passes its
+timestamp. Webhooks go to a recording sink instead of Discord, so missed or
+duplicate notifications can be reproduced and hours of real data replayed in
+seconds without running the game.
+
+    python replay.py CAPTURED_LOGS_DIR --speed 60 --out replay_webhooks.json
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from clock import ReplayClock
+from detection import DetectionManager, LOG_READ_SIZE
+from utils import error_logging, get_ps_link_for_user
+
+REPLAY_CYCLE_INTERVAL = 1.0
+REPLAY_DUPLICATE_WINDOW = 10.0
+REPLAY_PLACEHOLDER_WEBHOOK = "replay://webhook"
+_LINE_TIMESTAMP_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?)Z")
+_USERNAME_RE = re.compile(r"Players\.([^.]+)\.PlayerGui")
+
+class _RecordedResponse:
+    status_code = 204
+
+    def raise_for_status(self):
+        pass
+
+class RecordingWebhookSink:
+    """Stands in for requests.post and records every webhook with the virtual time it was sent."""
+    def __init__(self, clock):
+        self.clock = clock
+        self.records = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        payload = json or {}
+        embed = (payload.get("embeds") or [{}])[0]
+        record = {
+            "time": self.clock.time(),
+            "time_iso": self.clock.now().isoformat(timespec="milliseconds"),
+            "url": url,
+            "title": embed.get("title", ""),
+            "account": _embed_account(embed),
+            "content": payload.get("content", ""),
+            "payload": payload,
+        }
+        with self._lock:
+            self.records.append(record)
+        return _RecordedResponse()
+
+    def duplicates(self, window=REPLAY_DUPLICATE_WINDOW):
+        """Returns records that repeat the same (account, title, url) within `window` seconds of the previous one."""
+        last_seen = {}
+        duplicates = []
+        for record in sorted(self.records, key=lambda r: r["time"]):
+            key = (record["account"], record["title"], record["url"])
+            if key in last_seen and record["time"] - last_seen[key] <= window:
+                duplicates.append(record)
+            last_seen[key] = record["time"]
+        return duplicates
+
+def _embed_account(embed):
+    match = re.search(r"\*\*Account:\*\* `([^`]*)`", embed.get("description", ""))
+    return match.group(1) if match else ""
+
+def load_recorded_log(path):
+    """Returns [(epoch, line)] for a recorded log. Lines without a timestamp inherit the previous one."""
+    entries = []
+    last_time = None
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            match = _LINE_TIMESTAMP_RE.match(line)
+            if match:
+                try:
+                    last_time = datetime.fromisoformat(match.group(1) + "+00:00").timestamp()
+                except ValueError:
+                    pass
+            if last_time is not None:
+                entries.append((last_time, line))
+    return entries
+
+class ReplayApp:
+    """The subset of MultiScopeApp that DetectionManager needs, driven by a ReplayClock."""
+    def __init__(self, config, logs_dir, clock, sink, verbose=False):
+        self.version = "replay"
+        self.config = config
+        self.accounts = config.get("accounts", [])
+        self.biome_counts = config.get("biome_counts", {})
+        self.config_changed = False
+        self.logs = []
+        self.gui_manager = None
+        self.verbose = verbose
+        self.roblox_logs_dir = logs_dir
+        self.clock = clock
+        self.http_post = sink.post
+        self.detection_max_workers = 1 # Serial account checks keep the replay deterministic
+
+    def append_log(self, message):
+        if message.startswith("Debug:"):
+            return
+        entry = {"timestamp": self.clock.now().strftime("%Y-%m-%d %H:%M:%S"), "message": message}
+        self.logs.append(entry)
+        if self.verbose:
+            print(f"[{entry['timestamp']}] {message}")
+
+    def get_ps_link_for_user(self, username):
+        return get_ps_link_for_user(username, self.accounts, self.config.get("private_server_link", ""))
+
+class LogReplayer:
+    """Replays every log in `source_dir` through a DetectionManager."""
+    def __init__(self, source_dir, speed=0.0, interval=REPLAY_CYCLE_INTERVAL, config=None, verbose=False):
+        self.source_dir = source_dir
+        self.speed = speed
+        self.interval = interval
+        self.config = dict(config or {})
+        self.verbose = verbose
+
+    def _load_sources(self):
+        sources = []
+        for name in sorted(os.listdir(self.source_dir)):
+            path = os.path.join(self.source_dir, name)
+            if not os.path.isfile(path):
+                continue
+            entries = load_recorded_log(path)
+            if entries:
+                sources.append({"name": name, "entries": entries, "position": 0})
+        return sources
+
+    def _discover_usernames(self, sources):
+        usernames = []
+        for source in sources:
+            head = "".join(line for _, line in source["entries"][:2000])[:LOG_READ_SIZE]
+            match = _USERNAME_RE.search(head)
+            if match and match.group(1) not in usernames:
+                usernames.append(match.group(1))
+        return usernames
+
+    def _prepare_config(self, sources):
+        config = self.config
+        if not config.get("accounts"):
+            config["accounts"] = [{"username": name, "ps_link": "", "active": True} for name in self._discover_usernames(sources)]
+        if not config.get("webhooks"):
+            config["webhooks"] = [{"url": REPLAY_PLACEHOLDER_WEBHOOK}]
+        if not config.get("merchant_webhook_url"):
+            config["merchant_webhook_url"] = REPLAY_PLACEHOLDER_WEBHOOK
+        return config
+
+    def _write_due_lines(self, sources, logs_dir, now):
+        written = 0
+        for source in sources:
+            entries, position = source["entries"], source["position"]
+            end = position
+            while end < len(entries) and entries[end][0] <= now:
+                end += 1
+            if end == position:
+                continue
+            chunk = "".join(line for _, line in entries[position:end])
+            with open(os.path.join(logs_dir, source["name"]), "a", encoding="utf-8") as f:
+                f.write(chunk)
+            source["position"] = end
+            written += len(chunk)
+        return written
+
+    def run(self):
+        sources = self._load_sources()
+        if not sources:
+            raise ValueError(f"No timestamped Roblox logs found in {self.source_dir}")
+
+        start = min(source["entries"][0][0] for source in sources)
+        end = max(source["entries"][-1][0] for source in sources)
+        clock = ReplayClock(start, self.speed)
+        sink = RecordingWebhookSink(clock)
+        logs_dir = tempfile.mkdtemp(prefix="multiscope_replay_")
+        config = self._prepare_config(sources)
+
+        try:
+            self._write_due_lines(sources, logs_dir, clock.time())
+            app = ReplayApp(config, logs_dir, clock, sink, self.verbose)
+            manager = DetectionManager(app)
+
+            real_start = time.perf_counter()
+            bytes_replayed = 0
+            cycles = 0
+            while True:
+                bytes_replayed += self._write_due_lines(sources, logs_dir, clock.time())
+                manager.check_all_accounts_biomes()
+                cycles += 1
+                if all(source["position"] >= len(source["entries"]) for source in sources):
+                    break
+                clock.sleep(self.interval)
+            # Accounts that weren't due on the last cycle haven't read their final lines yet.
+            manager.poll_scheduler.reset()
+            manager.check_all_accounts_biomes()
+            cycles += 1
+            real_seconds = time.perf_counter() - real_start
+        finally:
+            shutil.rmtree(logs_dir, ignore_errors=True)
+
+        virtual_seconds = max(0.0, clock.time() - start)
+        return {
+            "logs": len(sources),
+            "accounts": [acc.get("username") for acc in config["accounts"]],
+            "recorded_span_seconds": round(end - start, 3),
+            "virtual_seconds": round(virtual_seconds, 3),
+            "real_seconds": round(real_seconds, 3),
+            "speedup": round(virtual_seconds / real_seconds, 1) if real_seconds else None,
+            "cycles": cycles,
+            "bytes_replayed": bytes_replayed,
+            "biome_changes_detected": sum(app.biome_counts.values()),
+            "webhooks": len(sink.records),
+            "webhooks_by_title": dict(Counter(record["title"] for record in sink.records)),
+            "duplicate_webhooks": len(sink.duplicates()),
+            "records": sink.records,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded Roblox logs through MultiScope's detection pipeline.")
+    parser.add_argument("source_dir", help="directory of captured Roblox player logs")
+    parser.add_argument("--speed", type=float, default=0.0, help="N× real time; 0 replays as fast as possible (default)")
+    parser.add_argument("--interval", type=float, default=REPLAY_CYCLE_INTERVAL, help="virtual seconds between detection cycles")
+    parser.add_argument("--config", help="config.json to take accounts and notification settings from")
+    parser.add_argument("--out", help="write the recorded webhooks and summary to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="print application log messages")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        try:
+            with open(args.config, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except Exception as e:
+            error_logging(e, f"Failed to load replay config {args.config}")
+            return 1
+
+    result = LogReplayer(args.source_dir, args.speed, args.interval, config, args.verbose).run()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=4)
+        print(f"Recorded webhooks written to {args.out}")
+
+    summary = {k: v for k, v in result.items() if k != "records"}
+    print(json.dumps(summary, indent=4))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
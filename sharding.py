@@ -0,0 +1,317 @@
+"""Multi-process sharded detection engine (`"detection_engine": "sharded"` in config).
+
+Accounts are split across worker processes. Each worker owns the LogTailers and
+parse state for its accounts and sends compact event records (never log text)
+to the coordinator, which runs inside DetectionManager.check_all_accounts_biomes
+and applies them through the usual handlers, so notifications, stats and the
+GUI behave exactly as with the thread engine. Accounts are rebalanced across
+workers whenever accounts are added or removed.
+"""
+import math
+import multiprocessing
+import os
+import queue
+import time
+
+from metrics import REGISTRY as metrics
+from polling import AdaptivePollScheduler, POLL_MIN_INTERVAL
+from tailer import LogTailer, RpcRecordMemo, scan_log_tail, parse_biome_from_rpc, latest_merchant_events
+from utils import error_logging
+
+SHARD_TARGET_ACCOUNTS = 50 # Accounts per worker when `detection_shards` is 0 (auto)
+SHARD_POLL_INTERVAL = 0.5 # Longest a worker waits between polls; accounts follow their adaptive schedule
+SHARD_STOP_TIMEOUT = 5.0
+
+# Records sent from workers to the coordinator:
+#   (EVENT_BIOME, username, biome, log_time, read_time, parsed_time, log_path, log_offset)
+#   (EVENT_MERCHANT, username, [(merchant_name, event_time_utc, log_line)], log_path)
+#   (EVENT_STATS, shard_id, accounts, bytes_read, parse_failures, stat_checks, log_reads, memo_hits, memo_misses,
+#    {username: log_mtime})
+#   (EVENT_RESET, shard_id) once a worker has applied COMMAND_RESET
+EVENT_BIOME = "biome"
+EVENT_MERCHANT = "merchant"
+EVENT_STATS = "stats"
+EVENT_RESET = "reset"
+
+# Commands sent from the coordinator to a worker:
+#   (COMMAND_ASSIGN, {username: log_path})
+#   (COMMAND_RESET,)
+#   (COMMAND_STOP,)
+COMMAND_ASSIGN = "assign"
+COMMAND_RESET = "reset"
+COMMAND_STOP = "stop"
+
+def balance_accounts(assignment, usernames, shard_count):
+    """Returns {username: shard} for `usernames`, keeping existing placements where possible
+    and moving as few accounts as needed so shard sizes differ by at most one."""
+    wanted = set(usernames)
+    balanced = {name: shard for name, shard in assignment.items() if name in wanted and shard < shard_count}
+    loads = [0] * shard_count
+    for shard in balanced.values():
+        loads[shard] += 1
+
+    for name in sorted(wanted - set(balanced)):
+        shard = loads.index(min(loads))
+        balanced[name] = shard
+        loads[shard] += 1
+
+    while max(loads) - min(loads) > 1:
+        source, target = loads.index(max(loads)), loads.index(min(loads))
+        name = max(name for name, shard in balanced.items() if shard == source)
+        balanced[name] = target
+        loads[source] -= 1
+        loads[target] += 1
+    return balanced
+
+def _apply_assignment(accounts, assignment):
+    for username in list(accounts):
+        if username not in assignment:
+            del accounts[username]
+    for username, log_path in assignment.items():
+        state = accounts.get(username)
+        if state is None:
+            accounts[username] = {"tailer": LogTailer(log_path), "biome": None, "merchants": {}}
+        elif state["tailer"].log_path != log_path:
+            # New Roblox session: keep the last biome so an unchanged biome isn't re-sent.
+            state["tailer"] = LogTailer(log_path)
+
+def _reset_accounts(accounts):
+    """Forgets every account's biome, merchants and read position, so the next scans are cold ones."""
+    for username, state in accounts.items():
+        accounts[username] = {"tailer": LogTailer(state["tailer"].log_path), "biome": None, "merchants": {}}
+
+def _scan_account(username, state, memo, event_queue):
+    """Reads one account's log tail and queues its biome/merchant events.
+
+    Returns (bytes_read, parse_failures, memo_hits, memo_misses).
+    """
+    tailer = state["tailer"]
+    scan = scan_log_tail(tailer, force=True) # The worker's poll scheduler has already seen the change
+    if scan is None:
+        return 0, 0, 0, 0
+    bytes_read, read_time, rpc_records, merchant_events, parse_failures = scan
+    memo_hits = memo_misses = 0
+
+    for rpc, log_time, log_offset, payload in rpc_records: # Every change since the last scan, oldest first
+        if memo.seen(username, tailer.log_path, rpc, log_time):
+            memo_hits += 1
+            continue
+        memo_misses += 1
+        try:
+            biome = parse_biome_from_rpc(payload)
+        except ValueError:
+            biome = None
+            parse_failures += 1
+        if biome and biome != state["biome"]:
+            state["biome"] = biome
+            event_queue.put((EVENT_BIOME, username, biome, log_time, read_time, time.time(), tailer.log_path, log_offset))
+
+    new_merchants = [
+        event for event in latest_merchant_events(merchant_events)
+        if state["merchants"].get(event[0]) != event[2]
+    ]
+    if new_merchants:
+        for name, _, log_line in new_merchants:
+            state["merchants"][name] = log_line
+        event_queue.put((EVENT_MERCHANT, username, new_merchants, tailer.log_path))
+    return bytes_read, parse_failures, memo_hits, memo_misses
+
+def _shard_worker(shard_id, command_queue, event_queue, poll_interval):
+    """Worker process entry point: polls its accounts on their adaptive schedules (waking at least every
+    `poll_interval` seconds for commands) until told to stop."""
+    accounts = {}
+    scheduler = AdaptivePollScheduler()
+    memo = RpcRecordMemo()
+    try:
+        running = True
+        while running:
+            cycle_start = time.time()
+            bytes_read = parse_failures = memo_hits = memo_misses = 0
+            log_paths = {username: state["tailer"].log_path for username, state in accounts.items()}
+            scheduler.forget(log_paths)
+            checks_before = scheduler.stat_checks
+            changed = [username for username in scheduler.due(log_paths) if scheduler.check(username, log_paths[username])]
+            for username in changed:
+                state = accounts[username]
+                try:
+                    account_bytes, account_failures, account_hits, account_misses = _scan_account(username, state, memo, event_queue)
+                    bytes_read += account_bytes
+                    parse_failures += account_failures
+                    memo_hits += account_hits
+                    memo_misses += account_misses
+                except OSError:
+                    continue
+            activity = {username: scheduler.last_mtime(username) for username in changed}
+            event_queue.put((EVENT_STATS, shard_id, len(accounts), bytes_read, parse_failures,
+                             scheduler.stat_checks - checks_before, len(changed), memo_hits, memo_misses, activity))
+
+            wait = min(poll_interval, max(POLL_MIN_INTERVAL / 5, scheduler.next_due_in()))
+            while running:
+                timeout = cycle_start + wait - time.time()
+                try:
+                    command = command_queue.get(timeout=timeout) if timeout > 0 else command_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if command[0] == COMMAND_STOP:
+                    running = False
+                elif command[0] == COMMAND_ASSIGN:
+                    _apply_assignment(accounts, command[1])
+                    memo.forget(accounts)
+                elif command[0] == COMMAND_RESET:
+                    _reset_accounts(accounts)
+                    memo.reset()
+                    scheduler.reset()
+                    event_queue.put((EVENT_RESET, shard_id))
+                    break # Poll every account now
+    except KeyboardInterrupt:
+        pass # The coordinator handles shutdown
+
+class ShardedDetectionEngine:
+    """Coordinates the worker processes for DetectionManager."""
+    def __init__(self, manager, shards=0, poll_interval=SHARD_POLL_INTERVAL):
+        self.manager = manager
+        self.requested_shards = shards
+        self.poll_interval = poll_interval
+        # spawn everywhere: it is the only start method on Windows, so behaviour matches across platforms.
+        self._context = multiprocessing.get_context("spawn")
+        self.event_queue = None
+        self.shards = []
+        self.assignment = {}
+        self.shard_stats = {}
+        self.resetting = set() # Shards whose events predate the last reset until their EVENT_RESET arrives
+
+    def _wanted_shard_count(self, account_count):
+        if self.requested_shards:
+            return max(1, int(self.requested_shards))
+        return max(1, min(os.cpu_count() or 1, math.ceil(account_count / SHARD_TARGET_ACCOUNTS)))
+
+    def _start_shard(self, shard_id):
+        commands = self._context.Queue()
+        process = self._context.Process(
+            target=_shard_worker, args=(shard_id, commands, self.event_queue, self.poll_interval),
+            name=f"MultiScopeShard-{shard_id}", daemon=True
+        )
+        process.start()
+        return {"process": process, "commands": commands, "sent": None}
+
+    def _ensure_shards(self, account_count):
+        if self.event_queue is None:
+            self.event_queue = self._context.Queue()
+        wanted = self._wanted_shard_count(account_count)
+        while len(self.shards) < wanted:
+            self.shards.append(self._start_shard(len(self.shards)))
+            self.manager.app.append_log(f"Debug: Started detection shard {len(self.shards) - 1}.")
+        if len(self.shards) > wanted:
+            # Their accounts move to the remaining shards when the assignment is rebalanced.
+            surplus, self.shards = self.shards[wanted:], self.shards[:wanted]
+            self._stop_shards(surplus)
+            for shard_id in range(wanted, wanted + len(surplus)):
+                self.shard_stats.pop(shard_id, None)
+                self.resetting.discard(shard_id)
+            self.manager.app.append_log(f"Debug: Stopped {len(surplus)} surplus detection shard(s).")
+        for shard_id, shard in enumerate(self.shards):
+            if not shard["process"].is_alive():
+                self.manager.app.append_log(f"Warning: Detection shard {shard_id} exited unexpectedly, restarting it.")
+                self.shards[shard_id] = self._start_shard(shard_id)
+                self.resetting.discard(shard_id) # A new worker starts cold
+        metrics.set("multiscope_detection_shards", len(self.shards))
+
+    def _sync_assignment(self):
+        usernames = list(self.manager.accounts)
+        self._ensure_shards(len(usernames))
+        self.assignment = balance_accounts(self.assignment, usernames, len(self.shards))
+
+        per_shard = [{} for _ in self.shards]
+        for username, shard_id in self.assignment.items():
+            log_path = self.manager.username_log_map.get(username.lower())
+            if log_path:
+                per_shard[shard_id][username] = log_path
+        for shard, accounts in zip(self.shards, per_shard):
+            if accounts != shard["sent"]:
+                shard["commands"].put((COMMAND_ASSIGN, accounts))
+                shard["sent"] = accounts
+
+    def _drain_events(self):
+        manager = self.manager
+        while True:
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                return
+            kind = event[0]
+            if kind == EVENT_STATS:
+                _, shard_id, account_count, bytes_read, parse_failures, stat_checks, log_reads, memo_hits, memo_misses, activity = event
+                for username, log_mtime in activity.items():
+                    manager.liveness.observe(username, log_mtime)
+                self.shard_stats[shard_id] = account_count
+                metrics.inc("multiscope_log_bytes_read_total", bytes_read)
+                metrics.inc("multiscope_log_stat_checks_total", stat_checks)
+                metrics.inc("multiscope_log_reads_total", log_reads)
+                metrics.inc("multiscope_rpc_memo_hits_total", memo_hits)
+                metrics.inc("multiscope_rpc_memo_misses_total", memo_misses)
+                if parse_failures:
+                    metrics.inc("multiscope_rpc_parse_failures_total", parse_failures)
+                continue
+            if kind == EVENT_RESET:
+                self.resetting.discard(event[1])
+                continue
+
+            username = event[1]
+            if username not in self.assignment:
+                continue # Account was removed while the event was in flight
+            if self.assignment[username] in self.resetting:
+                continue # Found before the reset; the worker reports the current biome again after it
+            try:
+                if kind == EVENT_BIOME:
+                    _, _, biome, log_time, read_time, parsed_time, log_path, log_offset = event
+                    trace = manager.latency.start_trace(username, log_time)
+                    trace.mark("read", read_time).mark("parsed", parsed_time)
+                    manager.handle_account_biome_detection(username, biome, trace=trace, source=(log_path, log_offset))
+                elif kind == EVENT_MERCHANT:
+                    _, _, merchant_events, log_path = event
+                    manager.dispatch_merchant_events(username, merchant_events, log_path)
+            except Exception as e:
+                error_logging(e, f"Error handling {kind} event from detection shard for {username}")
+
+    def next_poll_delay(self):
+        # Workers poll on their own schedules; the coordinator only has to keep draining their events.
+        return self.poll_interval
+
+    def run_cycle(self):
+        """Pushes account changes to the workers and applies the events they reported since the last cycle."""
+        self._sync_assignment()
+        self._drain_events()
+
+    def reset(self):
+        """Tells the workers to drop their per-account state, so current biomes are reported again."""
+        for shard_id, shard in enumerate(self.shards):
+            try:
+                shard["commands"].put((COMMAND_RESET,))
+                self.resetting.add(shard_id)
+            except Exception as e:
+                error_logging(e, "Error resetting detection shard")
+
+    def _stop_shards(self, shards):
+        for shard in shards:
+            try:
+                shard["commands"].put((COMMAND_STOP,))
+            except Exception:
+                pass
+        deadline = time.time() + SHARD_STOP_TIMEOUT
+        for shard in shards:
+            process = shard["process"]
+            process.join(max(0.0, deadline - time.time()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+
+    def stop(self):
+        self._stop_shards(self.shards)
+        if self.event_queue is not None:
+            self._drain_events()
+        self.shards = []
+        self.assignment = {}
+        self.shard_stats = {}
+        self.resetting = set()
+        self.event_queue = None
+        metrics.set("multiscope_detection_shards", 0)
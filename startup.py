@@ -0,0 +1,130 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import error_logging
+
+STARTUP_MAX_WORKERS = 4
+
+class StartupTask:
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.skipped = False
+        self.done = threading.Event()
+
+    @property
+    def seconds(self):
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+class StartupGraph:
+    """Runs named startup tasks on a thread pool, each as soon as its dependencies have finished.
+
+    A task whose dependency failed is skipped. `wait()` lets the caller block only on the
+    tasks it needs (e.g. config before the window is built) while the rest keep running.
+    """
+    def __init__(self, max_workers=STARTUP_MAX_WORKERS, on_complete=None):
+        self.tasks = {}
+        self.on_complete = on_complete
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Startup")
+        self._lock = threading.Lock()
+        self._submitted = set()
+        self._remaining = 0
+        self._started_at = None
+        self._finished_at = None
+        self.all_done = threading.Event()
+
+    def add(self, name, func, deps=()):
+        for dep in deps:
+            if dep not in self.tasks:
+                raise ValueError(f"Startup task '{name}' depends on unknown task '{dep}'")
+        self.tasks[name] = StartupTask(name, func, deps)
+        return self
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._remaining = len(self.tasks)
+        if not self.tasks:
+            self._finish()
+            return self
+        self._schedule_ready()
+        return self
+
+    def wait(self, names=None, timeout=None):
+        """Blocks until the given tasks (default: all) are done. Returns True if none of them failed."""
+        tasks = [self.tasks[name] for name in names] if names else list(self.tasks.values())
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for task in tasks:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not task.done.wait(remaining):
+                return False
+        return all(task.error is None and not task.skipped for task in tasks)
+
+    def _schedule_ready(self):
+        ready = []
+        with self._lock:
+            for task in self.tasks.values():
+                if task.name in self._submitted:
+                    continue
+                deps = [self.tasks[dep] for dep in task.deps]
+                if all(dep.done.is_set() for dep in deps):
+                    self._submitted.add(task.name)
+                    ready.append((task, any(dep.error is not None or dep.skipped for dep in deps)))
+        for task, skip in ready:
+            if skip:
+                task.skipped = True
+                self._task_done(task)
+            else:
+                self._executor.submit(self._run_task, task)
+
+    def _run_task(self, task):
+        task.started = time.perf_counter()
+        try:
+            task.func()
+        except Exception as e:
+            task.error = e
+            error_logging(e, f"Startup task '{task.name}' failed")
+        task.finished = time.perf_counter()
+        self._task_done(task)
+
+    def _task_done(self, task):
+        task.done.set()
+        with self._lock:
+            self._remaining -= 1
+            finished = self._remaining == 0
+        if finished:
+            self._finish()
+        else:
+            self._schedule_ready()
+
+    def _finish(self):
+        self._finished_at = time.perf_counter()
+        self._executor.shutdown(wait=False)
+        self.all_done.set()
+        if self.on_complete:
+            try:
+                self.on_complete(self)
+            except Exception as e:
+                error_logging(e, "Error in startup completion callback")
+
+    def timings(self):
+        """{task name: seconds} for the tasks that ran."""
+        return {name: task.seconds for name, task in self.tasks.items() if task.seconds is not None}
+
+    def summary(self):
+        total = (self._finished_at or time.perf_counter()) - (self._started_at or time.perf_counter())
+        parts = []
+        for name, task in self.tasks.items():
+            if task.skipped:
+                parts.append(f"{name} skipped")
+            elif task.error is not None:
+                parts.append(f"{name} failed")
+            elif task.seconds is not None:
+                parts.append(f"{name} {task.seconds * 1000:.0f}ms")
+        return f"{total * 1000:.0f}ms total ({', '.join(parts)})"
@@ -0,0 +1,181 @@
+"""Rolling per-account and per-biome statistics, updated as events are detected.
+
+RollingStats.record() takes the same events as history.EventStore.record() and
+adds them to time-bucketed counters, so the Stats tab, status webhooks and the
+metrics exporter read counts for the last hour and day, average biome
+durations and the time since the last GLITCHED in constant time however long
+MultiScope has been running.
+"""
+import threading
+import time
+
+from history import EVENT_BIOME_START, EVENT_BIOME_END, EVENT_MERCHANT
+
+STATS_SHORT_WINDOW = 3600
+STATS_LONG_WINDOW = 24 * 3600
+STATS_WINDOWS = (STATS_SHORT_WINDOW, STATS_LONG_WINDOW)
+STATS_BUCKETS = 60 # Per window: one-minute buckets for the hour, 24-minute buckets for the day
+STATS_RARE_BIOME = "GLITCHED"
+
+class RollingCounter:
+    """A sum over the last `window` seconds, kept in a ring of `buckets` time buckets.
+
+    Adding and reading only clear the buckets that expired since the last call, so
+    both are O(1) amortised. The window slides a bucket at a time, so a total
+    covers between `window` less one bucket and `window` seconds.
+    """
+    __slots__ = ("bucket_seconds", "counts", "newest", "total")
+
+    def __init__(self, window, buckets=STATS_BUCKETS):
+        self.bucket_seconds = window / buckets
+        self.counts = [0] * buckets
+        self.newest = None # Index of the latest bucket (timestamp // bucket_seconds)
+        self.total = 0
+
+    def _advance(self, bucket):
+        if self.newest is None:
+            self.newest = bucket
+            return
+        size = len(self.counts)
+        for expired in range(self.newest + 1, min(bucket, self.newest + size) + 1):
+            slot = expired % size
+            self.total -= self.counts[slot]
+            self.counts[slot] = 0
+        self.newest = max(self.newest, bucket)
+
+    def add(self, timestamp, amount=1):
+        bucket = int(timestamp // self.bucket_seconds)
+        self._advance(bucket)
+        if bucket <= self.newest - len(self.counts):
+            return # Older than the window
+        self.counts[bucket % len(self.counts)] += amount
+        self.total += amount
+
+    def value(self, now):
+        self._advance(int(now // self.bucket_seconds))
+        return self.total
+
+class WindowedCounts:
+    """A RollingCounter for each of STATS_WINDOWS."""
+    __slots__ = ("counters",)
+
+    def __init__(self):
+        self.counters = {window: RollingCounter(window) for window in STATS_WINDOWS}
+
+    def add(self, timestamp, amount=1):
+        for counter in self.counters.values():
+            counter.add(timestamp, amount)
+
+    def values(self, now):
+        """{window: total} for each window."""
+        return {window: counter.value(now) for window, counter in self.counters.items()}
+
+class RollingStats:
+    """Rolling counts of biome starts per account and per biome, merchant arrivals,
+    biome durations (from start/end pairs) and when each biome was last seen."""
+    def __init__(self, time_func=time.time):
+        self._time = time_func
+        self._lock = threading.Lock()
+        self.account_counts = {} # account -> WindowedCounts of biome starts
+        self.biome_counts = {}   # biome -> WindowedCounts of starts
+        self.biome_seconds = {}  # biome -> WindowedCounts of seconds spent in it (added when it ends)
+        self.biome_ended = {}    # biome -> WindowedCounts of ends matched to a start
+        self.merchant_counts = {} # merchant -> WindowedCounts of arrivals
+        self.last_seen = {}      # biome or merchant -> latest start/arrival time
+        self.account_last_seen = {} # (account, name) -> latest start/arrival time
+        self.current = {}        # account -> (biome, start time)
+
+    def record(self, timestamp, account, name, event_type, log_path=None, log_offset=None):
+        """Adds one event. Takes the same arguments as history.EventStore.record()."""
+        with self._lock:
+            if event_type != EVENT_BIOME_END and self.account_last_seen.get((account, name)) == timestamp:
+                return # Already counted, e.g. loaded from the history and then found again by the first log scan
+            if event_type == EVENT_BIOME_START:
+                self.account_counts.setdefault(account, WindowedCounts()).add(timestamp)
+                self.biome_counts.setdefault(name, WindowedCounts()).add(timestamp)
+                self.current[account] = (name, timestamp)
+            elif event_type == EVENT_BIOME_END:
+                current = self.current.get(account)
+                if current and current[0] == name and timestamp >= current[1]:
+                    self.biome_seconds.setdefault(name, WindowedCounts()).add(timestamp, timestamp - current[1])
+                    self.biome_ended.setdefault(name, WindowedCounts()).add(timestamp)
+                    del self.current[account]
+                return
+            elif event_type == EVENT_MERCHANT:
+                self.merchant_counts.setdefault(name, WindowedCounts()).add(timestamp)
+            else:
+                return
+            if timestamp > self.last_seen.get(name, 0):
+                self.last_seen[name] = timestamp
+            if timestamp > self.account_last_seen.get((account, name), 0):
+                self.account_last_seen[(account, name)] = timestamp
+
+    def seconds_since(self, name, account=None, now=None):
+        """Seconds since `name` (a biome or merchant) last started, for one account or any; None if never seen."""
+        with self._lock:
+            seen = self.last_seen.get(name) if account is None else self.account_last_seen.get((account, name))
+        if seen is None:
+            return None
+        return max(0.0, (self._time() if now is None else now) - seen)
+
+    def _windowed(self, counts_by_key, now):
+        return {key: counts.values(now) for key, counts in counts_by_key.items()}
+
+    def biome_summary(self, now=None):
+        """{biome: {"1h": starts, "24h": starts, "avg_seconds": mean duration of those that ended in 24h, or None}}."""
+        now = self._time() if now is None else now
+        with self._lock:
+            summary = {}
+            for biome, counts in self.biome_counts.items():
+                starts = counts.values(now)
+                ended = self.biome_ended[biome].counters[STATS_LONG_WINDOW].value(now) if biome in self.biome_ended else 0
+                seconds = self.biome_seconds[biome].counters[STATS_LONG_WINDOW].value(now) if ended else 0
+                summary[biome] = {
+                    "1h": starts[STATS_SHORT_WINDOW],
+                    "24h": starts[STATS_LONG_WINDOW],
+                    "avg_seconds": seconds / ended if ended else None,
+                }
+            return summary
+
+    def account_summary(self, now=None):
+        """{account: {"1h": biome starts, "24h": biome starts, "biome": current biome or None}}."""
+        now = self._time() if now is None else now
+        with self._lock:
+            return {
+                account: {
+                    "1h": starts[STATS_SHORT_WINDOW],
+                    "24h": starts[STATS_LONG_WINDOW],
+                    "biome": self.current.get(account, (None,))[0],
+                }
+                for account, starts in self._windowed(self.account_counts, now).items()
+            }
+
+    def merchant_summary(self, now=None):
+        """{merchant: {"1h": arrivals, "24h": arrivals}}."""
+        now = self._time() if now is None else now
+        with self._lock:
+            return {
+                name: {"1h": arrivals[STATS_SHORT_WINDOW], "24h": arrivals[STATS_LONG_WINDOW]}
+                for name, arrivals in self._windowed(self.merchant_counts, now).items()
+            }
+
+    def load(self, events):
+        """Replays history rows (history.EVENT_COLUMNS order, oldest first), e.g. the last day from the EventStore."""
+        count = 0
+        for row in events:
+            self.record(*row)
+            count += 1
+        return count
+
+def format_duration(seconds):
+    """Short human form of a duration for the Stats tab and webhooks: 45s, 12m, 3h 05m, 2d 4h."""
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    if seconds < 86400:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
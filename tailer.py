@@ -0,0 +1,475 @@
+"""Log tail reading and the pure parsing used by every detection engine.
+
+Nothing here touches the app, the GUI or the network, so the functions can run
+in detection threads, asyncio executors and sharded worker processes alike.
+
+Tails are read with readinto() into pooled, reused bytearrays and searched in
+place; the search functions accept text or such a buffer (valid up to `end`),
+and from a buffer only the matched records are copied out and decoded.
+"Latest record" lookups walk the log backwards in blocks (ReverseLogReader) and
+stop at the first match, so their cost doesn't grow with the log; after the
+first scan of a log only the lines appended since are searched, and every RPC
+record among them is returned so no biome change between polls is missed.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from latency import parse_log_line_timestamp
+
+LOG_READ_SIZE = 1048576
+LOG_TAIL_READ_BYTES = 2 * 1024 * 1024
+RPC_MARKER = "[BloxstrapRPC]"
+RPC_MARKER_BYTES = RPC_MARKER.encode()
+RPC_MAX_RECORD_BYTES = 16 * 1024 # Longest RPC payload decoded; longer records are treated as malformed
+RPC_MAX_SKIPPED_RECORDS = 32 # Unusable records passed over when looking for the latest good one
+RPC_CACHE_MAX_SIZE = 200
+RPC_MEMO_LOGS_PER_ACCOUNT = 4
+TAIL_BUFFER_POOL_MAX = 16 # Free buffers kept for reuse; more concurrent reads allocate temporary ones
+REVERSE_READ_BLOCK = 64 * 1024
+REVERSE_READ_MIN_BLOCK = 4096 # Smallest backwards read, for scans that only need the last few lines
+MERCHANT_MARKER_BYTES = b"[Merchant]: "
+MERCHANT_NAMES = ("Jester", "Mari")
+
+USERNAME_PATTERN = re.compile(r"Players\.([^.]+)\.PlayerGui")
+MERCHANT_PATTERN = re.compile(
+    r"^(?P<full_line>"
+    r"(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z),"
+    r".*?"
+    r"\[Merchant\]: (?P<merchant_name>Jester|Mari) has arrived on the island"
+    r".*)$"
+    , re.MULTILINE
+)
+MERCHANT_PATTERN_BYTES = re.compile(MERCHANT_PATTERN.pattern.encode(), re.MULTILINE)
+JSON_DECODER = json.JSONDecoder()
+MISSING = object()
+
+class TailBufferPool:
+    """Reusable tail read buffers, so steady-state polling allocates nothing per read."""
+    def __init__(self, size=LOG_TAIL_READ_BYTES, max_free=TAIL_BUFFER_POOL_MAX):
+        self.size = size
+        self.max_free = max_free
+        self.created = 0
+        self._free = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def borrow(self):
+        with self._lock:
+            buffer = self._free.pop() if self._free else None
+        if buffer is None:
+            buffer = bytearray(self.size)
+            self.created += 1
+        try:
+            yield buffer
+        finally:
+            with self._lock:
+                if len(self._free) < self.max_free:
+                    self._free.append(buffer)
+
+TAIL_BUFFERS = TailBufferPool()
+
+def read_log_tail(log_path, max_bytes=LOG_TAIL_READ_BYTES, file_size=None):
+    """Returns the last `max_bytes` of a log as text (undecodable bytes dropped)."""
+    if file_size is None:
+        file_size = os.path.getsize(log_path)
+    with open(log_path, "r", encoding='utf-8', errors='ignore') as file:
+        if file_size > max_bytes:
+            file.seek(file_size - max_bytes)
+        return file.read(max_bytes)
+
+def _readinto_at(file, view, offset):
+    """Fills `view` from `offset` in a raw binary file. Returns the number of bytes read."""
+    file.seek(offset)
+    length = 0
+    while length < len(view):
+        count = file.readinto(view[length:])
+        if not count:
+            break
+        length += count
+    return length
+
+def read_tail_into(log_path, buffer, file_size=None):
+    """Reads the last len(buffer) bytes of a log into `buffer`. Returns the number of bytes read."""
+    if file_size is None:
+        file_size = os.path.getsize(log_path)
+    max_bytes = len(buffer)
+    length = 0
+    with open(log_path, "rb", buffering=0) as file:
+        if file_size > max_bytes:
+            file.seek(file_size - max_bytes)
+        with memoryview(buffer) as view:
+            while length < max_bytes:
+                count = file.readinto(view[length:])
+                if not count:
+                    break
+                length += count
+    return length
+
+def extract_username(content):
+    """Returns the Roblox username from the head of a player log, or None."""
+    match = USERNAME_PATTERN.search(content)
+    return match.group(1) if match else None
+
+def extract_rpc_record(content, start, end=None):
+    """Decodes the RPC record whose marker is at `start` in text or a buffer (valid up to `end`).
+
+    The payload is read with JSONDecoder.raw_decode and never past the end of its
+    line or RPC_MAX_RECORD_BYTES, so the cost is bounded whatever follows the
+    marker. Returns (rpc_message, payload), or None when the record runs into `end`
+    unfinished (a partial write: more bytes may complete it). Raises ValueError for
+    a malformed record.
+    """
+    if end is None:
+        end = len(content)
+    is_text = isinstance(content, str)
+    payload_start = start + len(RPC_MARKER)
+    limit = min(end, payload_start + RPC_MAX_RECORD_BYTES)
+    line_end = content.find("\n" if is_text else b"\n", payload_start, limit)
+    open_ended = line_end == -1 and limit == end
+    if line_end != -1:
+        limit = line_end
+    brace = content.find("{" if is_text else b"{", payload_start, limit)
+    if brace == -1:
+        if open_ended:
+            return None
+        raise ValueError("RPC record has no JSON payload")
+    text = content[brace:limit]
+    prefix = content[start:brace]
+    if not is_text:
+        text = text.decode('utf-8', errors='ignore')
+        prefix = prefix.decode('utf-8', errors='ignore')
+    try:
+        payload, length = JSON_DECODER.raw_decode(text)
+    except json.JSONDecodeError:
+        if open_ended:
+            return None
+        raise
+    except RecursionError:
+        raise ValueError("RPC payload is nested too deeply")
+    if not isinstance(payload, dict):
+        raise ValueError("RPC payload is not a JSON object")
+    return prefix + text[:length], payload
+
+def find_last_rpc(content, end=None):
+    """Returns (rpc_message, start_index) for the latest complete BloxstrapRPC record, or (None, -1).
+
+    Records still being written and malformed ones are passed over for the one
+    before, up to RPC_MAX_SKIPPED_RECORDS of them.
+    """
+    if not content or end == 0:
+        return None, -1
+    if end is None:
+        end = len(content)
+    marker = RPC_MARKER if isinstance(content, str) else RPC_MARKER_BYTES
+    search_end = end
+    for _ in range(RPC_MAX_SKIPPED_RECORDS + 1):
+        start = content.rfind(marker, 0, search_end)
+        if start == -1:
+            return None, -1
+        try:
+            record = extract_rpc_record(content, start, end)
+        except ValueError:
+            record = None
+        if record:
+            return record[0], start
+        search_end = start
+    return None, -1
+
+def parse_biome_from_rpc(rpc):
+    """Returns the biome (largeImage hoverText) from an RPC record, or None.
+
+    `rpc` is the payload extract_rpc_record() already decoded, or an RPC message,
+    which is decoded here (raising json.JSONDecodeError for a malformed one so
+    callers can count it).
+    """
+    if isinstance(rpc, dict):
+        rpc_data = rpc
+    else:
+        if not isinstance(rpc, str) or not rpc:
+            return None
+        json_start_index = rpc.find('{')
+        if json_start_index == -1:
+            return None
+        rpc_data = json.loads(rpc[json_start_index:])
+    data = rpc_data.get('data') if isinstance(rpc_data, dict) else None
+    if not isinstance(data, dict): # Other commands (e.g. SetLaunchData) carry a string or nothing
+        return None
+    large_image_data = data.get('largeImage')
+    if not large_image_data or not isinstance(large_image_data, dict):
+        return None
+    found_biome = large_image_data.get('hoverText')
+    if not found_biome or not isinstance(found_biome, str):
+        return None
+    return found_biome
+
+def find_merchant_events(content, end=None):
+    """Returns [(merchant_name, event_time_utc, log_line)] for merchant arrivals in the content, oldest first."""
+    events = []
+    if end is None:
+        end = len(content)
+    is_text = isinstance(content, str)
+    pattern = MERCHANT_PATTERN if is_text else MERCHANT_PATTERN_BYTES
+    for match in pattern.finditer(content, 0, end):
+        name, stamp, line = match.group("merchant_name", "timestamp", "full_line")
+        if not is_text:
+            name, stamp, line = name.decode(), stamp.decode(), line.decode('utf-8', errors='ignore')
+        try:
+            event_time_utc = datetime.fromisoformat(stamp.replace('Z', '+00:00'))
+        except ValueError:
+            continue
+        events.append((name, event_time_utc, line.strip()))
+    events.sort(key=lambda event: event[1])
+    return events
+
+def latest_merchant_events(events):
+    """Reduces find_merchant_events() output to the latest event per merchant."""
+    latest = {}
+    for event in events:
+        latest[event[0]] = event
+    return list(latest.values())
+
+class RpcRecordCache:
+    """LRU of decoded RPC records keyed by (log_path, line offset, line length), so lines that are
+    scanned again (a log's first scan after a reset, get_last_rpc_msg) aren't decoded again."""
+    def __init__(self, max_size=RPC_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached (rpc_message, log_time, payload), None for a malformed line, or MISSING."""
+        with self._lock:
+            record = self._records.get(key, MISSING)
+            if record is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._records.move_to_end(key)
+            return record
+
+    def put(self, key, record):
+        with self._lock:
+            self._records[key] = record
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+
+RPC_RECORDS = RpcRecordCache()
+
+class RpcRecordMemo:
+    """The last RPC record handled from each of an account's recent logs.
+
+    A record is fingerprinted by its log line time and a hash of its text. Seeing
+    it again (the log map switching back to an older log, a rescan of the same
+    log) means it was already parsed and run through the notification policy.
+    """
+    def __init__(self, logs_per_account=RPC_MEMO_LOGS_PER_ACCOUNT):
+        self.logs_per_account = logs_per_account
+        self.accounts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def seen(self, username, log_path, rpc_message, log_time):
+        """Returns True if the record is the last one handled from this log for the account, else records it."""
+        fingerprint = (log_time, len(rpc_message), hash(rpc_message))
+        logs = self.accounts.setdefault(username, {})
+        if logs.get(log_path) == fingerprint:
+            self.hits += 1
+            return True
+        logs.pop(log_path, None) # Re-inserted last, so the least recently handled log is dropped first
+        logs[log_path] = fingerprint
+        while len(logs) > self.logs_per_account:
+            del logs[next(iter(logs))]
+        self.misses += 1
+        return False
+
+    def forget(self, keep):
+        """Drops the records of accounts not in `keep`."""
+        for username in list(self.accounts):
+            if username not in keep:
+                del self.accounts[username]
+
+    def reset(self):
+        self.accounts = {}
+
+class ReverseLogReader:
+    """Finds the latest lines containing a marker by reading a log backwards in blocks.
+
+    Blocks are read into a pooled tail buffer from its end towards its start, so a
+    line cut by a block boundary is completed in place by the next (earlier) block
+    and only matching lines are copied out. Lookups stop at the first match they
+    need: the current biome of a 100 MB log costs a few kilobytes of reads.
+    `bytes_read` and `malformed_records` accumulate over every lookup made with the reader.
+    """
+    def __init__(self, log_path, file_size=None, block_size=REVERSE_READ_BLOCK):
+        self.log_path = log_path
+        self.file_size = os.path.getsize(log_path) if file_size is None else file_size
+        self.block_size = block_size
+        self.bytes_read = 0
+        self.malformed_records = 0
+
+    def lines(self, marker, stop_before=0):
+        """Yields (line, offset) for complete lines containing `marker`, latest first.
+
+        Stops at lines that ended before file offset `stop_before`, or at a line longer
+        than a tail buffer. The last line is skipped until its newline is written.
+        """
+        pos = self.file_size
+        if pos <= stop_before:
+            return
+        with TAIL_BUFFERS.borrow() as buffer, open(self.log_path, "rb", buffering=0) as file:
+            capacity = len(buffer)
+            # buffer[lo:capacity] holds the file from `pos` on; lines from buffer[searched] on are done.
+            lo = searched = capacity
+            while pos > 0 and pos + (searched - lo) > stop_before:
+                size = min(pos, max(min(self.block_size, pos - stop_before), REVERSE_READ_MIN_BLOCK))
+                if size > lo:
+                    carry = searched - lo # The unsearched start of the earliest line read so far
+                    if carry == capacity:
+                        return
+                    buffer[capacity - carry:capacity] = buffer[lo:searched]
+                    lo, searched = capacity - carry, capacity
+                    size = min(size, lo)
+                with memoryview(buffer) as view:
+                    length = _readinto_at(file, view[lo - size:lo], pos - size)
+                self.bytes_read += length
+                if length < size:
+                    return # Truncated under us; the next scan starts over
+                lo -= size
+                pos -= size
+
+                if pos > 0:
+                    newline = buffer.find(b"\n", lo, searched)
+                    if newline == -1:
+                        continue # Still inside one line, read further back
+                    start = newline + 1
+                else:
+                    start = lo
+                end = searched
+                while True:
+                    index = buffer.rfind(marker, start, end)
+                    if index == -1:
+                        break
+                    line_start = buffer.rfind(b"\n", start, index) + 1 or start
+                    line_end = buffer.find(b"\n", index, searched)
+                    if line_end != -1:
+                        if pos + (line_end - lo) < stop_before:
+                            return
+                        yield bytes(buffer[line_start:line_end]), pos + (line_start - lo)
+                    end = line_start
+                searched = start
+
+    def rpc_records(self, stop_before=0):
+        """Yields (rpc_message, log_time, offset, payload) for the complete RPC lines, latest first, and None
+        for malformed ones (also counted in `malformed_records`). `offset` is where the line starts in the log;
+        `payload` is the decoded JSON, for parse_biome_from_rpc."""
+        for line, offset in self.lines(RPC_MARKER_BYTES, stop_before):
+            key = (self.log_path, offset, len(line))
+            record = RPC_RECORDS.get(key)
+            if record is MISSING:
+                try:
+                    index = line.rfind(RPC_MARKER_BYTES)
+                    rpc = extract_rpc_record(line, index)
+                    record = (rpc[0], parse_log_line_timestamp(line, index), rpc[1]) if rpc else None
+                except ValueError:
+                    record = None
+                RPC_RECORDS.put(key, record)
+            if record is None:
+                self.malformed_records += 1
+                yield None
+            else:
+                yield record[0], record[1], offset, record[2]
+
+    def find_latest_rpc(self, stop_before=0, with_biome=False):
+        """Returns (rpc_message, log_time, offset, payload) for the latest complete RPC record (that names a biome,
+        with `with_biome`), or (None, None, None, None) if there is none within RPC_MAX_SKIPPED_RECORDS."""
+        skipped = 0
+        for record in self.rpc_records(stop_before):
+            if record is not None and not with_biome:
+                return record
+            try:
+                if record is not None and parse_biome_from_rpc(record[3]):
+                    return record
+            except ValueError:
+                pass
+            skipped += 1
+            if skipped > RPC_MAX_SKIPPED_RECORDS:
+                break
+        return None, None, None, None
+
+    def find_rpc_records(self, stop_before=0):
+        """Returns [(rpc_message, log_time, offset, payload)] for every complete RPC record in lines ending from `stop_before` on, oldest first."""
+        records = [record for record in self.rpc_records(stop_before) if record is not None]
+        records.reverse()
+        return records
+
+    def find_latest_merchant_events(self, stop_before=0):
+        """Returns the latest find_merchant_events() event per merchant, oldest first."""
+        latest = {}
+        for line, offset in self.lines(MERCHANT_MARKER_BYTES, stop_before):
+            for event in find_merchant_events(line):
+                if event[0] not in latest:
+                    latest[event[0]] = (offset, event)
+            if len(latest) == len(MERCHANT_NAMES):
+                break
+        return [event for _, event in sorted(latest.values(), key=lambda item: item[0])]
+
+class LogTailer:
+    """Follows one player log, skipping the scan when its size and mtime haven't changed."""
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.size = -1
+        self.mtime_ns = None
+        self.scanned_size = None # Log size covered by the last scan; None until the first one
+        self.reads = 0
+        self.skipped = 0
+        self.bytes_read = 0
+
+    def changed(self, force=False):
+        """Returns the log's os.stat() result, or None if it is unchanged (or gone)."""
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return None
+        if not force and st.st_size == self.size and st.st_mtime_ns == self.mtime_ns:
+            self.skipped += 1
+            return None
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        return st
+
+def scan_log_tail(tailer, force=False, time_func=time.time):
+    """Finds the RPC records and merchant events a tailer's log gained since its last scan.
+
+    The first scan (or the first after the log shrank) walks back to the latest RPC
+    record however old it is and takes merchant events from the last
+    LOG_TAIL_READ_BYTES; later scans return every RPC record in the lines completed
+    since the previous one. Returns None if the log is unchanged, else (bytes_read,
+    read_time, [(rpc_message, rpc_log_time, offset)] oldest first, merchant_events,
+    malformed_records).
+    """
+    st = tailer.changed(force)
+    if st is None:
+        return None
+    cold = tailer.scanned_size is None or st.st_size < tailer.scanned_size
+    reader = ReverseLogReader(tailer.log_path, st.st_size)
+    if cold:
+        record = reader.find_latest_rpc(with_biome=True)
+        rpc_records = [record] if record[0] else []
+    else:
+        rpc_records = reader.find_rpc_records(tailer.scanned_size)
+    merchant_start = max(0, st.st_size - LOG_TAIL_READ_BYTES) if cold else tailer.scanned_size
+    merchant_events = reader.find_latest_merchant_events(merchant_start)
+    read_time = time_func()
+    tailer.scanned_size = st.st_size
+    tailer.reads += 1
+    tailer.bytes_read += reader.bytes_read
+    return reader.bytes_read, read_time, rpc_records, merchant_events, reader.malformed_records
@@ -3,56 +3,225 @@ import os
 import sys
 import time
 import traceback
-import shutil
-import requests
-import webbrowser
-import locale
-import winreg
+import queue
+import threading
+import atexit
 from datetime import datetime, timedelta
-from tkinter import filedialog, messagebox
-import ttkbootstrap as ttk
-import tkinter as tk 
 
 APP_NAME = "MultiScope"
-CONFIG_DIR = os.path.join(os.getenv('APPDATA'), APP_NAME)
+
+def _default_config_dir():
+    """AppData/MultiScope on Windows. MULTISCOPE_CONFIG_DIR overrides it, ~/.config is used where APPDATA is unset."""
+    override = os.getenv('MULTISCOPE_CONFIG_DIR')
+    if override:
+        return override
+    return os.path.join(os.getenv('APPDATA') or os.path.join(os.path.expanduser("~"), ".config"), APP_NAME)
+
+CONFIG_DIR = _default_config_dir()
 ERROR_LOG_FILENAME = "error_logs.txt"
 LOGS_FILENAME = "biome_logs.json"
 CONFIG_FILENAME = "config.json"
 BIOMES_DATA_FILENAME = "biomes_data.json"
 AURAS_FILENAME = "auras.json"
 MAX_ERROR_LOG_SIZE = 3 * 1024 * 1024 
+ERROR_LOG_QUEUE_MAX = 1000
+ERROR_LOG_REPEAT_WINDOW = 60.0 # Identical errors within this many seconds are counted, not written
+ERROR_LOG_SITE_LIMIT = 10 # Entries one call site may write per ERROR_LOG_SITE_WINDOW
+ERROR_LOG_SITE_WINDOW = 60.0
+ERROR_LOG_RECENT_MAX = 1000 # Distinct errors tracked for repeat counting before expired ones are pruned
+ERROR_LOG_FLUSH_TIMEOUT = 2.0
 
 _error_log_path = os.path.join(CONFIG_DIR, ERROR_LOG_FILENAME)
 
-def error_logging(exception, custom_message=None, max_log_size=MAX_ERROR_LOG_SIZE):
-    """Log errors to a file in the AppData directory."""
-    try:
-        os.makedirs(CONFIG_DIR, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def set_config_dir(path):
+    """Points config, logs and error logs at `path` instead of the AppData directory."""
+    global CONFIG_DIR, _error_log_path
+    CONFIG_DIR = os.path.abspath(path)
+    _error_log_path = os.path.join(CONFIG_DIR, ERROR_LOG_FILENAME)
+
+def set_config_file(path):
+    """Uses `path` as the main configuration file instead of config.json in the config directory."""
+    global CONFIG_FILENAME
+    CONFIG_FILENAME = os.path.abspath(path)
+
+class ErrorLogWriter:
+    """Writes error_logging() entries from a background thread.
+
+    The calling thread only records the call site and exception and queues the
+    entry (bounded; overflow is counted). Identical errors (same call site,
+    message and exception) within ERROR_LOG_REPEAT_WINDOW are counted instead of
+    written, and each call site writes at most ERROR_LOG_SITE_LIMIT entries per
+    ERROR_LOG_SITE_WINDOW; what was held back is written as a count afterwards.
+    The file is rotated by renaming it once it passes its size limit.
+    """
+    def __init__(self, queue_max=ERROR_LOG_QUEUE_MAX, repeat_window=ERROR_LOG_REPEAT_WINDOW,
+                 site_limit=ERROR_LOG_SITE_LIMIT, site_window=ERROR_LOG_SITE_WINDOW):
+        self.queue = queue.Queue(maxsize=queue_max)
+        self.repeat_window = repeat_window
+        self.site_limit = site_limit
+        self.site_window = site_window
+        self.written = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._recent = {} # (site, message, exception) -> [last written time, repeats since]
+        self._sites = {}  # site -> [window start, entries, held back]
+        self._thread = None
+        self._pending_dropped = 0
+
+    def submit(self, exception, custom_message, max_log_size, site):
+        now = time.time()
+        key = (site, custom_message, type(exception).__name__, str(exception))
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent and now - recent[0] < self.repeat_window:
+                recent[1] += 1
+                self.suppressed += 1
+                return
+            counts = self._sites.get(site)
+            if counts is None or now - counts[0] >= self.site_window:
+                counts = self._sites[site] = [now, 0, counts[2] if counts else 0]
+            if counts[1] >= self.site_limit:
+                counts[2] += 1
+                self.suppressed += 1
+                return
+            counts[1] += 1
+            repeats = recent[1] if recent else 0
+            held_back, counts[2] = counts[2], 0
+            self._recent[key] = [now, 0]
+            if len(self._recent) > ERROR_LOG_RECENT_MAX:
+                self._forget_old(now)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_forever, name="ErrorLogWriter", daemon=True)
+                self._thread.start()
+        exc_info = sys.exc_info()
+        if exc_info[1] is None and isinstance(exception, BaseException):
+            exc_info = (type(exception), exception, exception.__traceback__)
+        try:
+            self.queue.put_nowait((now, exception, custom_message, exc_info, repeats, held_back, max_log_size))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._pending_dropped += 1
+
+    def _forget_old(self, now):
+        """Drops expired repeat counters with nothing left to report."""
+        for key in [key for key, recent in self._recent.items() if not recent[1] and now - recent[0] >= self.repeat_window]:
+            del self._recent[key]
+
+    def _summaries(self, final=False):
+        """Lines for repeats and rate-limited entries that no later entry reported, once their window is over."""
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        lines = []
+        with self._lock:
+            for key, recent in list(self._recent.items()):
+                if recent[1] and (final or now - recent[0] >= self.repeat_window):
+                    site, custom_message, exception_type, exception_text = key
+                    lines.append(f"[{timestamp}] {custom_message if custom_message else 'ERROR'}: {exception_text} "
+                                 f"(repeated {recent[1]} more time(s) in {now - recent[0]:.0f}s, not logged)\n")
+                    del self._recent[key]
+            for site, counts in self._sites.items():
+                if counts[2] and (final or now - counts[0] >= self.site_window):
+                    place = f"{os.path.basename(site[0])}:{site[1]}" if site else "unknown"
+                    lines.append(f"[{timestamp}] {counts[2]} error(s) from {place} not logged, over the rate limit\n")
+                    counts[2] = 0
+            dropped, self._pending_dropped = self._pending_dropped, 0
+        if dropped:
+            lines.append(f"[{timestamp}] {dropped} error(s) not logged, the error log queue was full\n")
+        return "".join(lines)
+
+    def _format(self, entry):
+        logged_at, exception, custom_message, exc_info, repeats, held_back, _ = entry
+        timestamp = datetime.fromtimestamp(logged_at).strftime("%Y-%m-%d %H:%M:%S")
         error_message = f"[{timestamp}] {custom_message if custom_message else 'ERROR'}: {str(exception)}\n"
-        error_message += f"Traceback:\n{traceback.format_exc()}\n"
-
-        print(error_message) 
+        if repeats:
+            error_message += f"(Repeated {repeats} more time(s) since it was last logged)\n"
+        if held_back:
+            error_message += f"({held_back} error(s) from the same place were not logged, over the rate limit)\n"
+        error_message += f"Traceback:\n{''.join(traceback.format_exception(*exc_info)) if exc_info[1] is not None else 'NoneType: None'}\n"
+        return error_message
+
+    def _write_forever(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=min(self.repeat_window, self.site_window))]
+            except queue.Empty:
+                self._write([]) # Only the counts whose window ended
+                continue
+            while True: # Everything queued meanwhile goes out in the same write
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, batch):
+        entries = [entry for entry in batch if entry is not None]
+        try:
+            text = "".join(self._format(entry) for entry in entries)
+            text += self._summaries(final=len(entries) < len(batch)) # None is flush()'s request for every count
+            if not text:
+                return
+            print(text)
+
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            max_log_size = max((entry[6] for entry in entries), default=MAX_ERROR_LOG_SIZE)
+            log_path = _error_log_path
+            try:
+                if os.path.exists(log_path) and os.path.getsize(log_path) > max_log_size:
+                    backup_path = os.path.join(os.path.dirname(log_path), f"error_logs_backup_{int(time.time())}.txt")
+                    suffix = 1
+                    while os.path.exists(backup_path): # Don't replace a backup rotated in the same second
+                        backup_path = os.path.join(os.path.dirname(log_path), f"error_logs_backup_{int(time.time())}_{suffix}.txt")
+                        suffix += 1
+                    os.replace(log_path, backup_path)
+                    text = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Log file rotated due to size limit\n" + text
+                with open(log_path, "a", encoding='utf-8') as f:
+                    f.write(text)
+                self.written += len(entries)
+            except Exception as log_error:
+                print(f"CRITICAL: Failed to write to error log: {str(log_error)}")
+        except Exception as e:
+            print(f"CRITICAL: Error in the error log writer itself: {str(e)}")
+            traceback.print_exc()
 
+    def flush(self, timeout=ERROR_LOG_FLUSH_TIMEOUT):
+        """Waits (up to `timeout`) for the queued entries and every pending count to be written. Called at exit."""
+        if self._thread is None:
+            return True
         try:
-            if os.path.exists(_error_log_path) and os.path.getsize(_error_log_path) > max_log_size:
-                backup_path = os.path.join(CONFIG_DIR, f"error_logs_backup_{int(time.time())}.txt")
-                shutil.copy2(_error_log_path, backup_path)
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return False
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+ERROR_LOG = ErrorLogWriter()
+atexit.register(ERROR_LOG.flush)
 
-                with open(_error_log_path, "w", encoding='utf-8') as f:
-                    f.write(f"[{timestamp}] Log file rotated due to size limit\n")
-                    f.write(error_message)
-            else:
-                with open(_error_log_path, "a", encoding='utf-8') as f:
-                    f.write(error_message)
-        except Exception as log_error:
-            print(f"CRITICAL: Failed to write to error log: {str(log_error)}")
+def error_logging(exception, custom_message=None, max_log_size=MAX_ERROR_LOG_SIZE):
+    """Log errors to a file in the AppData directory.
 
+    Returns immediately: the entry is written by ERROR_LOG's background thread,
+    and repeats of the same error are counted rather than written each time.
+    """
+    try:
+        frame = sys._getframe(1)
+        site = (frame.f_code.co_filename, frame.f_lineno)
+    except ValueError:
+        site = None
+    try:
+        ERROR_LOG.submit(exception, custom_message, max_log_size, site)
     except Exception as e:
-
         print(f"CRITICAL: Error in error_logging function itself: {str(e)}")
         print(f"Original error: {custom_message} - {str(exception)}")
-        traceback.print_exc()
 
 def load_json_data(filename, default_data=None, legacy_paths=None):
     """Loads JSON data from AppData, handles migration from legacy paths, and returns default if needed."""
@@ -192,142 +361,11 @@ def save_config(config_data):
     """Saves the main configuration file."""
     save_json_data(CONFIG_FILENAME, config_data)
 
-BIOMES_REMOTE_URL = "https://raw.githubusercontent.com/cresqnt-sys/MultiScope/refs/heads/main/assets/biomes.json"
-
-def _get_assets_biomes_path():
-    """Get the path to the biomes.json file in the assets folder."""
-    # Try to find assets/biomes.json relative to the script or in PyInstaller bundle
-    try:
-        # For PyInstaller bundled app
-        base_path = sys._MEIPASS
-    except AttributeError:
-        # For development - use the script's directory
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, "assets", "biomes.json")
-
-def _fetch_remote_biomes():
-    """Fetch biomes data from the remote GitHub URL."""
-    try:
-        response = requests.get(BIOMES_REMOTE_URL, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        print(f"Fetched {len(data)} biomes from remote URL")
-        return data
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to fetch remote biomes: {e}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse remote biomes JSON: {e}")
-        return None
-    except Exception as e:
-        error_logging(e, "Error fetching remote biomes")
-        return None
-
 def load_biome_data():
-    """Loads biome data. Fetches from remote GitHub URL first, falls back to local assets/biomes.json, then hardcoded defaults."""
-    # Hardcoded fallback defaults (minimal set in case all else fails)
-    fallback_defaults = {
-        "WINDY": {"emoji": "🌀", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/WINDY.png"},
-        "RAINY": {"emoji": "🌧️", "color": "0x55925F", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/RAINY.png"},
-        "SNOWY": {"emoji": "❄️", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/SNOWY.png"},
-        "SAND STORM": {"emoji": "🏜️", "color": "0xFFA500", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/SAND%20STORM.png"},
-        "HELL": {"emoji": "🔥", "color": "0xFB4F29", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/HELL.png"},
-        "STARFALL": {"emoji": "🌠", "color": "0xFFFFFF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/STARFALL.png"},
-        "CORRUPTION": {"emoji": "🌑", "color": "0x800080", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/CORRUPTION.png"},
-        "NULL": {"emoji": "🌫️", "color": "0x808080", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/NULL.png"},
-        "GLITCHED": {"emoji": "⚠️", "color": "0xFFFF00", "thumbnail_url": "https://i.postimg.cc/mDzwFfX1/GLITCHED.png", "force_notify": True, "ping_everyone": True},
-        "DREAMSPACE": {"emoji": "💤", "color": "0xFF00FF", "thumbnail_url": "https://maxstellar.github.io/biome_thumb/DREAMSPACE.png", "force_notify": True, "ping_everyone": True},
-        "CYBERSPACE": {"emoji": "🤖", "color": "0x00FFFF", "thumbnail_url": "https://raw.githubusercontent.com/cresqnt-sys/MultiScope/refs/heads/main/assets/cyberspace.png"},
-        "NORMAL": {"emoji": "🌳", "color": "0x00FF00", "thumbnail_url": "", "never_notify": True}
-    }
-    
-    # Try to fetch from remote URL first (allows auto-updating biomes without app update)
-    remote_data = _fetch_remote_biomes()
-    
-    # Try to load from local assets/biomes.json as fallback
-    assets_biomes_path = _get_assets_biomes_path()
-    local_data = {}
-    
-    if os.path.exists(assets_biomes_path):
-        try:
-            with open(assets_biomes_path, "r", encoding='utf-8') as f:
-                local_data = json.load(f)
-            print(f"Loaded {len(local_data)} biomes from local assets/biomes.json")
-        except json.JSONDecodeError as e:
-            error_logging(e, f"Error parsing local assets/biomes.json.")
-            local_data = {}
-        except Exception as e:
-            error_logging(e, f"Error reading local assets/biomes.json.")
-            local_data = {}
-    
-    # Priority: remote > local > fallback defaults
-    # Start with fallback defaults
-    data = fallback_defaults.copy()
-    
-    # Override with local data if available
-    for biome, info in local_data.items():
-        if biome.startswith("_"):  # Skip comment keys
-            continue
-        data[biome] = info.copy()
-    
-    # Override with remote data if available (highest priority)
-    if remote_data:
-        for biome, info in remote_data.items():
-            if biome.startswith("_"):  # Skip comment keys
-                continue
-            data[biome] = info.copy()
-    
-    # Also load user's AppData biomes_data.json to preserve any user stats/customizations
-    appdata_biomes = load_json_data(BIOMES_DATA_FILENAME, {}, [BIOMES_DATA_FILENAME])
-    
-    # Merge AppData customizations (but assets/biomes.json defines the available biomes)
-    # This preserves user's color customizations if they've modified them
-    appdata_updated = False
-    for biome, info in data.items():
-        if biome not in appdata_biomes:
-            print(f"Adding new biome '{biome}' to user's biome data configuration.")
-            appdata_biomes[biome] = info.copy()
-            appdata_updated = True
-    
-    # Update data with any user customizations from AppData
-    for biome, info in appdata_biomes.items():
-        if biome in data:
-            # User may have customized some fields, merge them
-            for key in ["emoji", "color", "thumbnail_url"]:
-                if key in info and info[key]:
-                    data[biome][key] = info[key]
-
-    # Ensure all biomes have required fields with proper formatting
-    for biome, info in data.items():
-        # Ensure emoji exists
-        if "emoji" not in info or not info["emoji"]:
-            info["emoji"] = "🌍"  # Default emoji for unknown biomes
-
-        # Ensure color is properly formatted
-        color = info.get("color", "0xFFFFFF")
-        if isinstance(color, str):
-            if not color.startswith("0x"):
-                try:
-                    info["color"] = f"0x{int(color):06X}"
-                except (ValueError, TypeError):
-                    info["color"] = "0xFFFFFF"
-        elif isinstance(color, int):
-            info["color"] = f"0x{color:06X}"
-        else:
-            info["color"] = "0xFFFFFF"
-        
-        # Ensure thumbnail_url exists
-        if "thumbnail_url" not in info:
-            info["thumbnail_url"] = ""
-
-    # Save the updated data to AppData if new biomes were added
-    if appdata_updated:
-        print("Saving updated biome data to AppData with new biomes.")
-        save_json_data(BIOMES_DATA_FILENAME, data)
-
-    return data
-    
+    """Returns the current biome catalogue from the shared registry (see biomes.py). Never touches the network."""
+    from biomes import BIOMES
+    return BIOMES.data
+
 def load_auras_json():
     """Loads auras data."""
     return load_json_data(AURAS_FILENAME, {}, [AURAS_FILENAME])
@@ -363,15 +401,31 @@ def save_logs(logs_data):
         error_logging(e, "Failed to sort and save logs.")
         save_json_data(LOGS_FILENAME, logs_data) 
 
-ROBLOX_LOGS_DIR = os.path.join(os.getenv('LOCALAPPDATA'), 'Roblox', 'logs')
+def _default_roblox_logs_dir():
+    """LocalAppData/Roblox/logs on Windows. MULTISCOPE_ROBLOX_LOGS_DIR overrides it."""
+    override = os.getenv('MULTISCOPE_ROBLOX_LOGS_DIR')
+    if override:
+        return override
+    return os.path.join(os.getenv('LOCALAPPDATA') or os.path.expanduser("~"), 'Roblox', 'logs')
+
+ROBLOX_LOGS_DIR = _default_roblox_logs_dir()
+
+def set_roblox_logs_dir(path):
+    """Reads Roblox player logs from `path` instead of LocalAppData."""
+    global ROBLOX_LOGS_DIR
+    ROBLOX_LOGS_DIR = os.path.abspath(path)
+
+def get_roblox_logs_dir():
+    return ROBLOX_LOGS_DIR
 
 log_file_cache = {}
 log_file_cache_expiry = 30 
 
-def get_log_files(logs_dir=ROBLOX_LOGS_DIR, silent=False, force_refresh=False):
+def get_log_files(logs_dir=None, silent=False, force_refresh=False):
     """Get Roblox player log files, sorted by modification time (newest first), with caching."""
     global log_file_cache
     current_time = time.time()
+    logs_dir = logs_dir or ROBLOX_LOGS_DIR
 
     if not force_refresh and 'timestamp' in log_file_cache and (current_time - log_file_cache.get('timestamp', 0) < log_file_cache_expiry):
          if 'paths' in log_file_cache:
@@ -437,7 +491,7 @@ def get_log_files(logs_dir=ROBLOX_LOGS_DIR, silent=False, force_refresh=False):
         error_logging(e, "Error getting log files")
         return []
 
-def get_latest_log_file(logs_dir=ROBLOX_LOGS_DIR):
+def get_latest_log_file(logs_dir=None):
     """Gets the path to the most relevant (usually most recent 'player...last') log file."""
     log_files = get_log_files(logs_dir, silent=True) 
     if not log_files:
@@ -445,106 +499,149 @@ def get_latest_log_file(logs_dir=ROBLOX_LOGS_DIR):
 
     return log_files[0]
 
-def apply_roblox_fastflags(update_status_callback=None):
-    """Apply Roblox FastFlag settings for logging"""
-    local_app_data = os.getenv('LOCALAPPDATA')
-    if not local_app_data:
-        if update_status_callback:
-            update_status_callback("Error: LOCALAPPDATA environment variable not found.")
-        return
-
-    required_flags = {
-        "FStringDebugLuaLogLevel": "trace",
-        "FStringDebugLuaLogPattern": "ExpChat/mountClientApp"
-    }
-    applied_count = 0
-    updated_count = 0
-
-    def update_json_file(json_file_path, launcher_info_str):
-        nonlocal applied_count, updated_count
-        current_settings = {}
-        needs_update = False
-        file_existed = False
-        file_dir = os.path.dirname(json_file_path)
+FASTFLAGS_CACHE_FILENAME = "fastflags_cache.json"
+FASTFLAGS_MAX_WORKERS = 4
+REQUIRED_FASTFLAGS = {
+    "FStringDebugLuaLogLevel": "trace",
+    "FStringDebugLuaLogPattern": "ExpChat/mountClientApp"
+}
 
-        try:
-            os.makedirs(file_dir, exist_ok=True)
-
-            if os.path.exists(json_file_path):
-                file_existed = True
-                try:
-                    with open(json_file_path, 'r') as f:
-                        content = f.read()
-                        if content.strip(): 
-                            current_settings = json.loads(content)
-                        else:
-                            current_settings = {} 
-                except json.JSONDecodeError:
-                    if update_status_callback:
-                        update_status_callback(f"Warning: Corrupt JSON found at {json_file_path}. Overwriting for {launcher_info_str}.")
-                    current_settings = {}
-                    needs_update = True
-                except Exception as read_err:
-                    if update_status_callback:
-                        update_status_callback(f"Warning: Error reading {json_file_path}: {read_err}. Overwriting for {launcher_info_str}.")
-                    current_settings = {}
-                    needs_update = True
-            else:
-                needs_update = True
-
-            for key, value in required_flags.items():
-                if key not in current_settings or current_settings[key] != value:
-                    current_settings[key] = value
-                    needs_update = True
-
-            if needs_update:
-                with open(json_file_path, 'w') as f:
-                    json.dump(current_settings, f, indent=2)
-                if file_existed:
-                    updated_count += 1
-                    if update_status_callback:
-                        update_status_callback(f"Updated FastFlags in {launcher_info_str} file")
-                else:
-                    applied_count += 1
-                    if update_status_callback:
-                        update_status_callback(f"Applied FastFlags to new file in {launcher_info_str}")
-
-        except Exception as e:
-            if update_status_callback:
-                update_status_callback(f"Error processing FastFlags for {launcher_info_str}: {e}")
+def _file_fingerprint(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
 
+def _find_fastflags_targets(local_app_data, update_status_callback=None):
+    """Returns [(json_file_path, launcher_info_str)] for every ClientAppSettings.json that should carry the flags."""
+    targets = []
     mod_launchers_config_files = {
         'Bloxstrap': os.path.join(local_app_data, 'Bloxstrap', 'Modifications', 'ClientSettings', 'ClientAppSettings.json'),
         'Fishstrap': os.path.join(local_app_data, 'Fishstrap', 'Modifications', 'ClientSettings', 'ClientAppSettings.json')
     }
-
     for launcher_name, target_json_path in mod_launchers_config_files.items():
         launcher_base_dir = os.path.dirname(os.path.dirname(os.path.dirname(target_json_path)))
         if os.path.isdir(launcher_base_dir):
-            update_json_file(target_json_path, f"{launcher_name} Modifications")
+            targets.append((target_json_path, f"{launcher_name} Modifications"))
 
     roblox_versions_path = os.path.join(local_app_data, 'Roblox', 'Versions')
     if os.path.isdir(roblox_versions_path):
         try:
-            for item_name in os.listdir(roblox_versions_path):
-                item_path = os.path.join(roblox_versions_path, item_name)
+            for entry in os.scandir(roblox_versions_path):
+                if entry.name.startswith("version-") and entry.is_dir():
+                    json_file_path = os.path.join(entry.path, 'ClientSettings', 'ClientAppSettings.json')
+                    targets.append((json_file_path, f"Roblox/{entry.name}"))
+        except OSError as e:
+            if update_status_callback:
+                update_status_callback(f"Error accessing Roblox versions directory: {e}")
+    return targets
 
-                if os.path.isdir(item_path) and item_name.startswith("version-"): # Modified to match user's code
-                    version_folder_path = item_path
-                    client_settings_path = os.path.join(version_folder_path, 'ClientSettings')
-                    json_file_path = os.path.join(client_settings_path, 'ClientAppSettings.json')
+def _apply_fastflags_to_file(json_file_path, launcher_info_str, update_status_callback=None):
+    """Makes sure one ClientAppSettings.json has the required flags.
+    Returns "applied", "updated", "unchanged" or "error"."""
+    current_settings = {}
+    needs_update = False
+    file_existed = False
+    file_dir = os.path.dirname(json_file_path)
 
-                    update_json_file(json_file_path, f"Roblox/{item_name}")
-        except OSError as e: # Modified to match user's code
+    try:
+        os.makedirs(file_dir, exist_ok=True)
+
+        if os.path.exists(json_file_path):
+            file_existed = True
+            try:
+                with open(json_file_path, 'r') as f:
+                    content = f.read()
+                    if content.strip(): 
+                        current_settings = json.loads(content)
+                    else:
+                        current_settings = {} 
+            except json.JSONDecodeError:
+                if update_status_callback:
+                    update_status_callback(f"Warning: Corrupt JSON found at {json_file_path}. Overwriting for {launcher_info_str}.")
+                current_settings = {}
+                needs_update = True
+            except Exception as read_err:
+                if update_status_callback:
+                    update_status_callback(f"Warning: Error reading {json_file_path}: {read_err}. Overwriting for {launcher_info_str}.")
+                current_settings = {}
+                needs_update = True
+        else:
+            needs_update = True
+
+        for key, value in REQUIRED_FASTFLAGS.items():
+            if key not in current_settings or current_settings[key] != value:
+                current_settings[key] = value
+                needs_update = True
+
+        if not needs_update:
+            return "unchanged"
+
+        with open(json_file_path, 'w') as f:
+            json.dump(current_settings, f, indent=2)
+        if file_existed:
             if update_status_callback:
-                update_status_callback(f"Error accessing Roblox versions directory: {e}")
+                update_status_callback(f"Updated FastFlags in {launcher_info_str} file")
+            return "updated"
+        if update_status_callback:
+            update_status_callback(f"Applied FastFlags to new file in {launcher_info_str}")
+        return "applied"
 
-    if applied_count > 0 or updated_count > 0:
+    except Exception as e:
         if update_status_callback:
-            update_status_callback(f"Finished applying/updating FastFlags ({applied_count} new, {updated_count} updated)." )
-    else:
+            update_status_callback(f"Error processing FastFlags for {launcher_info_str}: {e}")
+        return "error"
+
+def apply_roblox_fastflags(update_status_callback=None):
+    """Apply Roblox FastFlag settings for logging.
+
+    Files whose (mtime, size) fingerprint matches the last run that left them with the
+    required flags are skipped without being opened; the rest are checked in parallel.
+    Returns a summary dict of counts per outcome.
+    """
+    started = time.perf_counter()
+    summary = {"applied": 0, "updated": 0, "unchanged": 0, "cached": 0, "error": 0}
+    local_app_data = os.getenv('LOCALAPPDATA')
+    if not local_app_data:
         if update_status_callback:
-            update_status_callback("FastFlags check complete. No changes needed or relevant folders found.")
+            update_status_callback("Error: LOCALAPPDATA environment variable not found.")
+        return summary
+
+    cache = load_json_data(FASTFLAGS_CACHE_FILENAME, {})
+    cached_files = cache.get("files", {}) if cache.get("flags") == REQUIRED_FASTFLAGS else {}
+
+    pending = []
+    for json_file_path, launcher_info_str in _find_fastflags_targets(local_app_data, update_status_callback):
+        fingerprint = _file_fingerprint(json_file_path)
+        if fingerprint is not None and cached_files.get(json_file_path) == fingerprint:
+            summary["cached"] += 1
+        else:
+            pending.append((json_file_path, launcher_info_str))
+
+    if pending:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(FASTFLAGS_MAX_WORKERS, len(pending)), thread_name_prefix="FastFlags") as executor:
+            results = list(executor.map(lambda target: _apply_fastflags_to_file(*target, update_status_callback), pending))
+
+        files = {path: fingerprint for path, fingerprint in cached_files.items() if os.path.exists(path)}
+        for (json_file_path, _), result in zip(pending, results):
+            summary[result] += 1
+            fingerprint = _file_fingerprint(json_file_path) if result != "error" else None
+            if fingerprint is not None:
+                files[json_file_path] = fingerprint
+            else:
+                files.pop(json_file_path, None)
+        save_json_data(FASTFLAGS_CACHE_FILENAME, {"flags": REQUIRED_FASTFLAGS, "files": files})
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    if update_status_callback:
+        if summary["applied"] > 0 or summary["updated"] > 0:
+            update_status_callback(f"Finished applying/updating FastFlags ({summary['applied']} new, {summary['updated']} updated, {summary['cached']} unchanged since last check) in {summary['seconds']}s.")
+        else:
+            update_status_callback(f"FastFlags check complete. No changes needed or relevant folders found ({summary['cached']} skipped via cache) in {summary['seconds']}s.")
+    return summary
 
 def parse_session_time(session_time_str):
     """Parse session time from H:M:S string format to seconds."""
@@ -571,21 +668,70 @@ def format_session_time(total_seconds):
     minutes, seconds = divmod(remainder, 60)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
-def check_for_updates(current_version, repo_url="https://api.github.com/repos/cresqnt-sys/MultiScope/releases"):
-    """Checks GitHub releases for a newer version by comparing against the latest tag. Returns release info or None."""
-    print(f"Checking for updates... Current version: {current_version}")
+UPDATE_CACHE_FILENAME = "update_cache.json"
+UPDATE_CHECK_TTL = 6 * 3600 # Seconds a cached release check is trusted before GitHub is asked again
+
+def _fetch_latest_release(repo_url, cache):
+    """Asks GitHub for the newest release, revalidating the cached copy with ETag/Last-Modified.
+    Returns the cache dict to store (unchanged release on 304), or None on a network error."""
+    import requests
+    headers = {"Accept": "application/vnd.github+json"}
+    if cache.get("etag"):
+        headers["If-None-Match"] = cache["etag"]
+    if cache.get("last_modified"):
+        headers["If-Modified-Since"] = cache["last_modified"]
 
     try:
-        response = requests.get(repo_url, timeout=10) 
-        response.raise_for_status() 
+        response = requests.get(repo_url, params={"per_page": 1}, headers=headers, timeout=10)
+        if response.status_code == 304:
+            print("Release list unchanged since last check.")
+            return dict(cache, checked_at=time.time())
+        response.raise_for_status()
         all_releases = response.json()
+    except requests.exceptions.RequestException as e:
+        print(f"Update check failed: Network error ({e})")
+        return None
 
-        if not all_releases:
+    latest = all_releases[0] if all_releases else None
+    if latest:
+        # Only what the update prompt needs; the full release list is large.
+        latest = {
+            "tag_name": latest.get("tag_name", "0.0.0"),
+            "body": latest.get("body", ""),
+            "assets": [{"name": a.get("name", ""), "browser_download_url": a.get("browser_download_url", "")} for a in latest.get("assets", [])],
+        }
+    return {
+        "checked_at": time.time(),
+        "etag": response.headers.get("ETag", ""),
+        "last_modified": response.headers.get("Last-Modified", ""),
+        "latest_release": latest,
+    }
+
+def check_for_updates(current_version, repo_url="https://api.github.com/repos/cresqnt-sys/MultiScope/releases", max_age=UPDATE_CHECK_TTL):
+    """Checks GitHub releases for a newer version by comparing against the latest tag. Returns release info or None.
+
+    The result is cached in update_cache.json; within `max_age` seconds no request is made,
+    after that the cached release is revalidated with a conditional request.
+    """
+    print(f"Checking for updates... Current version: {current_version}")
+
+    try:
+        cache = load_json_data(UPDATE_CACHE_FILENAME, {})
+        if cache.get("checked_at") and time.time() - cache["checked_at"] < max_age:
+            print("Using cached update check result.")
+        else:
+            fetched = _fetch_latest_release(repo_url, cache)
+            if fetched is None:
+                return None
+            cache = fetched
+            save_json_data(UPDATE_CACHE_FILENAME, cache)
+
+        latest_release_info = cache.get("latest_release")
+        if not latest_release_info:
             print("No releases found on GitHub.")
             return None
 
-        # Get the latest release (first in the list)
-        latest_release_info = all_releases[0]
+        latest_release_info = dict(latest_release_info)
         latest_tag_name = latest_release_info.get('tag_name', '0.0.0')
         if latest_tag_name.startswith('v'):
             latest_tag_name = latest_tag_name[1:]
@@ -600,9 +746,6 @@ def check_for_updates(current_version, repo_url="https://api.github.com/repos/cr
             print("Current version is up to date or newer than the latest tag.")
             return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"Update check failed: Network error ({e})")
-        return None
     except Exception as e:
         error_logging(e, "Error during update check")
         return None
@@ -640,81 +783,9 @@ def compare_versions(version1_str, version2_str):
 
     return 0
 
-def download_update(download_url, root_window):
-    """Downloads an update file, showing progress."""
-    try:
-
-        file_name = os.path.basename(download_url)
-        if not file_name or not file_name.endswith(('.exe', '.zip', '.msi')): 
-            file_name = f'{APP_NAME}_Update.exe' 
-
-        save_path = filedialog.asksaveasfilename(
-            defaultextension=".exe", 
-            filetypes=[("Executable files", "*.exe"), ("Zip archives", "*.zip"), ("All files", "*.*")],
-            initialfile=file_name,
-            title="Save MultiScope Update As"
-        )
-
-        if not save_path:
-            print("Update download cancelled by user.")
-            return None 
-
-        print(f"Downloading update to: {save_path}")
-
-        progress_window = ttk.Toplevel(root_window)
-        progress_window.title("Downloading Update")
-        progress_window.geometry("350x150")
-        progress_window.transient(root_window) 
-        progress_window.grab_set() 
-        progress_window.resizable(False, False)
-
-        ttk.Label(progress_window, text="Downloading update...").pack(pady=10)
-        progress_bar = ttk.Progressbar(progress_window, length=300, mode='determinate')
-        progress_bar.pack(pady=10)
-        size_label = ttk.Label(progress_window, text="0 MB / 0 MB (0%)")
-        size_label.pack(pady=5)
-        progress_window.update_idletasks() 
-
-        response = requests.get(download_url, stream=True, timeout=30) 
-        response.raise_for_status()
-
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded_size = 0
-        block_size = 8192 
-
-        with open(save_path, 'wb') as f:
-            for data in response.iter_content(block_size):
-                f.write(data)
-                downloaded_size += len(data)
-
-                if total_size > 0:
-                    percentage = (downloaded_size / total_size) * 100
-                    progress_bar['value'] = percentage
-                    size_label.config(text=f"{downloaded_size/1024/1024:.1f} MB / {total_size/1024/1024:.1f} MB ({percentage:.1f}%)")
-                else: 
-                     progress_bar['mode'] = 'indeterminate'
-                     progress_bar.start()
-                     size_label.config(text=f"{downloaded_size/1024/1024:.1f} MB downloaded")
-
-                progress_window.update() 
-
-        progress_window.destroy()
-        print("Update downloaded successfully.")
-        return save_path 
-
-    except requests.exceptions.RequestException as e:
-        messagebox.showerror("Download Failed", f"Failed to download update: {str(e)}", parent=root_window)
-        error_logging(e, "Failed to download update")
-        if 'progress_window' in locals() and progress_window.winfo_exists(): progress_window.destroy()
-        return None
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred during download: {str(e)}", parent=root_window)
-        error_logging(e, "Error downloading update")
-        if 'progress_window' in locals() and progress_window.winfo_exists(): progress_window.destroy()
-        return None
-
 def setup_locale():
     """Sets the application locale, trying common fallbacks."""
+    import locale
     common_locales = ['en_US.UTF-8', 'en_US', 'C', ''] 
     for loc in common_locales:
         try:
@@ -732,80 +803,6 @@ def setup_locale():
 
     return False
 
-class ToolTip:
-    """
-    Create a tooltip for a given widget.
-    """
-    def __init__(self, widget, text='widget info'):
-        self.widget = widget
-        self.text = text
-        self.tooltip_window = None
-        self.id = None
-        self.x = self.y = 0
-        self.widget.bind("<Enter>", self.enter)
-        self.widget.bind("<Leave>", self.leave)
-        self.widget.bind("<ButtonPress>", self.leave) 
-
-    def enter(self, event=None):
-        self.schedule()
-
-    def leave(self, event=None):
-        self.unschedule()
-        self.hidetip()
-
-    def schedule(self):
-        self.unschedule()
-        self.id = self.widget.after(500, self.showtip) 
-
-    def unschedule(self):
-        id_ = self.id
-        self.id = None
-        if id_:
-            self.widget.after_cancel(id_)
-
-    def showtip(self, event=None):
-        x, y, _, _ = self.widget.bbox("insert") 
-        x += self.widget.winfo_rootx() + 25 
-        y += self.widget.winfo_rooty() + 20
-
-        self.tooltip_window = tk.Toplevel(self.widget)
-
-        self.tooltip_window.wm_overrideredirect(True)
-        self.tooltip_window.wm_geometry(f"+{x}+{y}")
-
-        try:
-            style = ttk.Style.get_instance()
-            bg = style.lookup('Tooltip.TLabel', 'background', default='lightyellow')
-            fg = style.lookup('Tooltip.TLabel', 'foreground', default='black')
-            relief = style.lookup('Tooltip.TLabel', 'relief', default='solid')
-            borderwidth = style.lookup('Tooltip.TLabel', 'borderwidth', default=1)
-            font = style.lookup('Tooltip.TLabel', 'font') 
-
-            label = ttk.Label(self.tooltip_window, text=self.text, justify='left',
-                              background=bg, foreground=fg, relief=relief, borderwidth=borderwidth,
-                              padding=(5, 2), font=font)
-        except: 
-             label = tk.Label(self.tooltip_window, text=self.text, justify='left',
-                             background="#ffffe0", relief='solid', borderwidth=1,
-                             font=("tahoma", "8", "normal"))
-
-        label.pack(ipadx=1)
-
-    def hidetip(self):
-        tw = self.tooltip_window
-        self.tooltip_window = None
-        if tw:
-            tw.destroy()
-
-def create_tooltip(widget, text):
-    """Factory function to easily create tooltips."""
-
-    if not hasattr(widget, "_tooltip_handler"):
-         widget._tooltip_handler = ToolTip(widget, text)
-    else:
-
-         widget._tooltip_handler.text = text
-
 def get_ps_link_for_user(username, accounts_list, default_link=""):
     """Gets the private server link for a user from the accounts list."""
     if not username or not accounts_list: